@@ -0,0 +1,301 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional
+
+from resume_ai.app.classes.job_manager import JobManager
+from resume_ai.app.funcs import get_output_folder_name
+
+API_QUEUED = "queued"
+API_RUNNING = "running"
+API_FINISHED = "finished"
+API_FAILED = "failed"
+
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEP_ALIVE = 15
+
+
+@dataclass
+class ApiJob:
+    """
+    A job submitted through the API, with the progress events of its processing.
+    """
+    id: str
+    title: str
+    url: Optional[str] = None
+    description: Optional[str] = None
+    status: str = API_QUEUED
+    result: dict = field(default_factory=dict)
+    events: list[dict] = field(default_factory=list)
+    output_dir: Optional[Path] = None
+    created_ts: float = field(default_factory=time.time)
+    finished_ts: Optional[float] = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def add_event(self, event: str, **data) -> None:
+        """Records an event and wakes up everyone waiting for progress. Must be called on the event loop."""
+        self.events.append({"event": event, "ts": time.time(), **data})
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    @property
+    def is_done(self) -> bool:
+        return self.status in (API_FINISHED, API_FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "url": self.url,
+            "status": self.status,
+            "result": self.result,
+            "created_ts": self.created_ts,
+            "events": self.events,
+        }
+
+
+class JobService:
+    """
+    Processes jobs submitted through the API with a fixed number of concurrent workers.
+    All jobs share the job manager, so LLM clients, the parsed resume and caches stay loaded between requests.
+    New jobs are rejected while `max_queue` jobs are waiting. Finished jobs can be looked up for `finished_ttl`
+    seconds, and only the last `max_finished` of them are kept, so a long-running server does not grow without limit.
+    """
+
+    def __init__(
+            self,
+            job_mgr: JobManager,
+            concurrency: int = 2,
+            max_queue: int = 100,
+            finished_ttl: float = 3600,
+            max_finished: int = 1000
+    ) -> None:
+        self.job_mgr = job_mgr
+        self.context = job_mgr.context
+        self.concurrency = concurrency
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.jobs: dict[str, ApiJob] = {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await asyncio.to_thread(self.job_mgr.finish_background_work)
+
+    def submit(self, title: str, url: str = None, description: str = None) -> ApiJob:
+        """
+        Queues a job.
+
+        :raises asyncio.QueueFull: If too many jobs are waiting.
+        """
+        self.evict_finished()
+        job = ApiJob(id=uuid.uuid4().hex, title=title, url=url, description=description)
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        job.add_event(API_QUEUED, position=self.queue.qsize())
+        return job
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status = API_RUNNING
+            job.add_event(API_RUNNING)
+
+            def on_progress(stage: str, status: str, job=job):
+                loop.call_soon_threadsafe(lambda: job.add_event("stage", stage=stage, status=status))
+
+            try:
+                job.result = await asyncio.to_thread(self._process, job, on_progress)
+                job.status = API_FINISHED if job.result.get("success") else API_FAILED
+            except Exception as e:
+                logging.exception("API job %s failed: %s", job.id, e)
+                job.result = {"success": False, "error": str(e)}
+                job.status = API_FAILED
+            finally:
+                job.finished_ts = time.time()
+                job.add_event(job.status, **job.result)
+                self.queue.task_done()
+                self.evict_finished()
+
+    def evict_finished(self) -> None:
+        """
+        Forgets finished jobs older than `finished_ttl` seconds, and the oldest ones beyond `max_finished`.
+        Their files stay in the output directory.
+        """
+        cutoff = time.time() - self.finished_ttl
+        finished = sorted((job for job in self.jobs.values() if job.is_done), key=lambda job: job.finished_ts or 0)
+        expired = [job for job in finished if (job.finished_ts or 0) < cutoff]
+        expired += finished[len(expired):max(len(finished) - self.max_finished, len(expired))]
+        for job in expired:
+            del self.jobs[job.id]
+        if expired:
+            logging.debug("Forgot %s finished API jobs.", len(expired))
+
+    def _process(self, job: ApiJob, on_progress) -> dict:
+        """Processes a job in a worker thread, like a job of a regular run."""
+        self.context.db_client.clear_job_data()
+        self.context.llm_client.budget.start_job()
+
+        try:
+            if job.url:
+                from resume_ai.app.classes.url_crawler import URLCrawler
+                docs = URLCrawler(self.context.llm_client, self.context.config_data).crawl_urls([job.url])
+                if not docs:
+                    raise RuntimeError(f"Could not crawl {job.url}")
+                job_identifier = job.url
+                success = self.job_mgr.process_link_job(
+                    job.url, docs[0].metadata.get("title", job.title), docs[0].page_content, on_progress
+                )
+            else:
+                # the id keeps the output of jobs with the same title apart
+                job_identifier = f"{job.title} {job.id[:8]}"
+                self.context.report.start_job(job.title)
+                success = self.job_mgr.process_job(job_identifier, job.title, job.description, on_progress)
+        finally:
+            self.context.report.end_job(self.context.db_client.job_data.get("status"))
+
+        job.output_dir = Path(get_output_folder_name(job_identifier)).resolve()
+        return {
+            "success": bool(success),
+            "job_status": self.context.db_client.job_data.get("status"),
+            "llm_cost_usd": self.context.db_client.job_data.get("llm_cost_usd"),
+        }
+
+    def artifacts(self, job: ApiJob) -> list[str]:
+        """Returns the names of the files created for a job."""
+        if job.output_dir is None or not job.output_dir.is_dir():
+            return []
+        return sorted(path.name for path in job.output_dir.iterdir() if path.is_file())
+
+
+def create_app(service: JobService):
+    """
+    Creates the aiohttp application of the API:
+
+    - `POST /jobs` with `{"url": ...}` or `{"title": ..., "description": ...}` queues a job, 503 if the queue is full.
+    - `GET /jobs/{id}` returns the status, result and progress events of a job.
+    - `GET /jobs/{id}/events` streams the progress events as server-sent events until the job is done.
+    - `GET /jobs/{id}/artifacts` lists the created files, `GET /jobs/{id}/artifacts/{name}` downloads one.
+    - `GET /health` returns the number of queued and running jobs.
+    """
+    from aiohttp import web
+
+    def get_job(request) -> ApiJob:
+        job = service.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text="Unknown job id")
+        return job
+
+    async def submit(request):
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Body must be JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Body must be a JSON object")
+
+        invalid = [key for key in ("url", "title", "description") if body.get(key) is not None and not isinstance(body[key], str)]
+        if invalid:
+            raise web.HTTPBadRequest(text=f"Fields must be strings: {', '.join(invalid)}")
+
+        url, description = body.get("url"), body.get("description")
+        if not url and not (body.get("title") and description):
+            raise web.HTTPBadRequest(text="Send a job 'url', or a 'title' and a 'description'")
+
+        try:
+            job = service.submit(body.get("title") or url, url=url, description=description)
+        except asyncio.QueueFull:
+            raise web.HTTPServiceUnavailable(text="Too many queued jobs, try again later", headers={"Retry-After": "30"})
+
+        return web.json_response(job.to_dict(), status=202, headers={"Location": f"/jobs/{job.id}"})
+
+    async def status(request):
+        return web.json_response(get_job(request).to_dict())
+
+    async def events(request):
+        job = get_job(request)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+
+        sent = 0
+        while True:
+            changed = job.changed
+            for event in job.events[sent:]:
+                await response.write(f"event: {event['event']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+            sent = len(job.events)
+            if job.is_done:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), SSE_KEEP_ALIVE)
+            except asyncio.TimeoutError:
+                await response.write(b": keep-alive\n\n")
+
+        await response.write_eof()
+        return response
+
+    async def artifacts(request):
+        job = get_job(request)
+        return web.json_response({"id": job.id, "artifacts": service.artifacts(job)})
+
+    async def artifact(request):
+        job = get_job(request)
+        name = request.match_info["name"]
+        if name not in service.artifacts(job):
+            raise web.HTTPNotFound(text="Unknown artifact")
+        return web.FileResponse(job.output_dir / name)
+
+    async def health(request):
+        running = sum(1 for job in service.jobs.values() if job.status == API_RUNNING)
+        return web.json_response({"queued": service.queue.qsize(), "running": running})
+
+    async def on_startup(app):
+        await service.start()
+
+    async def on_cleanup(app):
+        await service.stop()
+
+    app = web.Application()
+    app.add_routes([
+        web.post("/jobs", submit),
+        web.get("/jobs/{job_id}", status),
+        web.get("/jobs/{job_id}/events", events),
+        web.get("/jobs/{job_id}/artifacts", artifacts),
+        web.get("/jobs/{job_id}/artifacts/{name}", artifact),
+        web.get("/health", health),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def run_api(
+        job_mgr: JobManager,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        concurrency: int = 2,
+        max_queue: int = 100,
+        finished_ttl: float = 3600,
+        max_finished: int = 1000
+) -> None:
+    """
+    Serves the API until interrupted.
+    """
+    from aiohttp import web
+
+    async def make_app():
+        # the service queue must be created on the event loop of the server
+        return create_app(JobService(job_mgr, concurrency, max_queue, finished_ttl, max_finished))
+
+    logging.info("Serving the API on http://%s:%s", host, port)
+    web.run_app(make_app(), host=host, port=port)
@@ -0,0 +1,294 @@
+import logging
+import datetime
+from pathlib import Path
+from typing import Optional
+from dataclasses import dataclass, field
+
+# Local imports
+from resume_ai.app.classes.job_manager import JobManager
+from resume_ai.app.classes.cover_letter_creator import CoverLetterCreator
+from resume_ai.app.clients.base_llm_client import LlmRequest
+from resume_ai.app.clients.batch_client import BaseBatchClient
+from resume_ai.app.funcs import get_output_folder_name, get_clean_user_name
+
+
+@dataclass(eq=False)
+class BatchJob:
+    """
+    A job processed in batch mode.
+
+    :param source: File name or URL the job came from. Used to move the job to processed.
+    :param identifier: Job title for text files and URL for links. Used for the output folder.
+    :param title: Title of the job.
+    :param description: The job description text. Filled in by the page check for links.
+    :param page_content: The crawled page text for links that still have to be checked.
+
+    Jobs are compared by identity, so they can be used as keys of the batch requests.
+    """
+    source: str
+    identifier: str
+    title: str
+    description: Optional[str] = None
+    page_content: Optional[str] = None
+    results: dict = field(default_factory=dict)
+
+
+class BatchRunner:
+    """
+    Processes many jobs through a provider batch API instead of synchronous LLM calls.
+
+    Every stage collects the requests of all jobs into one JSONL batch file, submits it,
+    waits for the results and feeds them into the next stage:
+    page check (links only) -> analysis -> resume creation -> resume scoring and cover letters.
+    Resumes are rendered and logged per job once all batches are finished.
+    """
+
+    def __init__(self, job_mgr: JobManager, batch_client: BaseBatchClient, batch_dir: Path):
+        """
+        :param job_mgr: The job manager that builds the requests and records the results.
+        :param batch_client: Client for the provider batch API.
+        :param batch_dir: Directory where the batch files are written.
+        """
+        self.job_mgr = job_mgr
+        self.context = job_mgr.context
+        self.batch_client = batch_client
+        self.batch_dir = Path(batch_dir) / datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def run(self, jobs: list[BatchJob]) -> list[str]:
+        """
+        Runs all stages for all jobs.
+
+        :param jobs: The jobs to process.
+        :return: The sources of the jobs that were processed without errors.
+        :rtype: list[str]
+        """
+        config = self.context.config_data
+        jobs = self.check_pages(jobs)
+
+        stages = ["get_job_req", "resume_improvements"]
+        if config.get("match_job_to_user_pref"):
+            stages.append("match_job_to_user_req")
+        if config.get("analysis_mode", "split") == "fused":
+            self.run_stage("analysis", {
+                (job, "analyze_job"): self.job_mgr.analyze_job_request(job.title, job.description) for job in jobs
+            })
+            for job in jobs:
+                if "analyze_job" in job.results:
+                    job.results.update(self.job_mgr.split_analysis(job.results["analyze_job"]))
+        else:
+            self.run_stage("analysis", {
+                (job, stage): getattr(self.job_mgr, f"{stage}_request")(job.title, job.description)
+                for job in jobs for stage in stages
+            })
+
+        accepted = [
+            job for job in jobs
+            if "resume_improvements" in job.results
+            and (not config.get("match_job_to_user_pref") or self._passes_user_pref(job))
+        ]
+        self.create_resumes(accepted)
+
+        created = [job for job in accepted if "create_resume" in job.results]
+        requests = {}
+        for job in created:
+            new_resume = job.results["create_resume"]
+            if config.get("resume_scoring", "llm") != "local":
+                requests[(job, "match_resumes_to_job")] = self.job_mgr.match_resumes_to_job_request(job.title, job.description, new_resume)
+            if config.get("write_cover_letter", False):
+                job_requirements = CoverLetterCreator.job_requirements_summary(job.results.get("get_job_req"), job.description)
+                requests[(job, "create_cover_letter")] = self._cover_letter_creator().cover_letter_request(job.title, job_requirements, new_resume)
+        self.run_stage("post_resume", requests)
+
+        return [job.source for job in jobs if self.finalize_job(job)]
+
+    def create_resumes(self, jobs: list[BatchJob]) -> None:
+        """
+        Creates the tailored resumes of the jobs, as whole CVs or by sections depending on `resume_generation_mode`.
+
+        With `cluster_jobs` enabled, similar jobs are clustered first and a resume is only created for the
+        job closest to the centroid of each cluster. The other members get a locally adapted copy of it.
+
+        :param jobs: The jobs that passed the analysis stage.
+        :return: None
+        """
+        config = self.context.config_data
+        by_sections = config.get("resume_generation_mode", "full") == "sections"
+
+        def job_keywords(job: BatchJob) -> list[str]:
+            return (job.results.get("get_job_req") or {}).get("sentence_keywords")
+
+        representatives = {job: job for job in jobs}
+        if config.get("cluster_jobs", False):
+            assignments = self.job_mgr.job_clusterer.cluster([(job.title, job_keywords(job)) for job in jobs])
+            for job, (cluster, representative_index) in zip(jobs, assignments):
+                job.results["cluster_id"] = cluster.cluster_id
+                representatives[job] = jobs[representative_index]
+        leaders = [job for job in jobs if representatives[job] is job]
+
+        requests = {}
+        for job in leaders:
+            resume_improvements = job.results["resume_improvements"].get("resume_improvements")
+            if by_sections:
+                section_requests = self.job_mgr.create_resume_section_requests(job.title, job.description, resume_improvements)
+                for section, request in section_requests.items():
+                    requests[(job, f"section:{section}")] = request
+            else:
+                requests[(job, "create_resume")] = self.job_mgr.create_resume_request(job.title, job.description, resume_improvements)
+
+        self.run_stage("create_resume", requests)
+
+        for job in leaders:
+            if by_sections:
+                sections = {
+                    name.split(":", 1)[1]: result for name, result in job.results.items() if name.startswith("section:")
+                }
+                job.results["create_resume"] = self.job_mgr.merge_resume_sections(sections)
+            elif "create_resume" in job.results:
+                job.results["create_resume"] = self.job_mgr.clean_resume(job.results["create_resume"])
+
+            if "create_resume" in job.results:
+                job.results["create_resume"] = self.job_mgr.repair_resume(job.results["create_resume"])
+
+        for job, representative in representatives.items():
+            if representative is not job and "create_resume" in representative.results:
+                job.results["create_resume"] = self.job_mgr.job_clusterer.adapt_resume(
+                    representative.results["create_resume"], job_keywords(job)
+                )
+
+    def check_pages(self, jobs: list[BatchJob]) -> list[BatchJob]:
+        """
+        Checks the crawled pages of links for active jobs. Inactive jobs are logged and dropped.
+
+        :param jobs: The jobs to check. Jobs without page content are passed through.
+        :return: The jobs with a description.
+        """
+        pages = [job for job in jobs if job.page_content is not None]
+        self.run_stage("check_url_job_active", {
+            (job, "check_url_job_active"): self.job_mgr.check_url_job_active_request(job.source, job.title, job.page_content)
+            for job in pages
+        })
+
+        active = []
+        for job in jobs:
+            if job.page_content is None:
+                active.append(job)
+                continue
+
+            url_check = job.results.get("check_url_job_active")
+            if url_check and url_check.get('is_active') == True:
+                job.title = url_check.get('job_title')
+                job.description = url_check.get('job_description')
+                active.append(job)
+                continue
+
+            self._start_job_log(job)
+            self.context.db_client.add_job_data('job_title', job.title)
+            if url_check is None:
+                self.context.write_output("\nCould not check the job page. Please see logs.")
+            else:
+                self.context.db_client.add_job_data('status', 'inactive job')
+                self.context.write_output("\nJob is Inactive")
+                logging.info(f"Job is Inactive: {job.source}")
+            self.context.db_client.insert_job()
+
+        return active
+
+    def run_stage(self, stage_name: str, requests: dict[tuple[BatchJob, str], LlmRequest]) -> None:
+        """
+        Sends the requests of one stage as a single batch and stores the results on the jobs.
+
+        :param stage_name: Name of the stage, used for the batch file name.
+        :param requests: Dictionary with (job, request name) keys and the requests as values.
+        :return: None
+        """
+        if not requests:
+            return
+
+        keys = {f"{id(job)}:{name}": (job, name) for job, name in requests}
+        batch_requests = {custom_id: requests[key] for custom_id, key in keys.items()}
+
+        logging.info("Running batch stage '%s' with %s requests.", stage_name, len(batch_requests))
+        results = self.batch_client.run(batch_requests, self.batch_dir / f"{stage_name}.jsonl")
+
+        for custom_id, result in results.items():
+            job, name = keys[custom_id]
+            job.results[name] = result
+
+    def finalize_job(self, job: BatchJob) -> bool:
+        """
+        Records the batch results of a job, renders its resume and writes its cover letter.
+
+        :param job: The job to finalize.
+        :return: True if the job was processed without errors.
+        :rtype: bool
+        """
+        config = self.context.config_data
+        results = job.results
+
+        self._start_job_log(job)
+        self.context.db_client.add_job_data('job_title', job.title)
+        self.context.db_client.add_job_data('job_description', job.description)
+
+        if "get_job_req" in results:
+            self.job_mgr.record_job_req(results["get_job_req"])
+        if "cluster_id" in results:
+            self.context.db_client.add_job_data('cluster_id', results["cluster_id"])
+        if results.get("resume_improvements"):
+            self.context.db_client.append_llm_text('resume_improvements', results["resume_improvements"])
+
+        if config.get("match_job_to_user_pref") and "match_job_to_user_req" in results:
+            if not self.job_mgr.check_user_pref_match(results["match_job_to_user_req"]):
+                self.context.db_client.add_job_data('status', 'job does not match profile')
+                self.context.db_client.insert_job()
+                return True # we return True for success because processing was error-free
+
+        success = False
+        output_folder_name = get_output_folder_name(job.identifier)
+
+        if "create_resume" in results:
+            new_resume = results["create_resume"]
+            self.context.db_client.add_job_data('resume_tailored_dir', output_folder_name)
+            self.context.db_client.add_job_data('resume_tailored_text', new_resume)
+
+            if config.get("resume_scoring", "llm") == "local":
+                job_keywords = (results.get("get_job_req") or {}).get("sentence_keywords")
+                self.job_mgr.record_resume_match(self.job_mgr.score_resumes_locally(job.description, new_resume, job_keywords))
+            elif "match_resumes_to_job" in results:
+                self.job_mgr.record_resume_match(results["match_resumes_to_job"])
+
+            try:
+                resume_yaml_filename = self.job_mgr.save_resume(job.title, new_resume)
+                self.job_mgr.render_resume(resume_yaml_filename, output_folder_name)
+                success = True
+            except Exception as e:
+                logging.exception("Error creating resume: %s", e)
+
+            if "create_cover_letter" in results:
+                self._cover_letter_creator().write_cover_letter(results["create_cover_letter"], output_folder_name)
+
+        if success:
+            clickable_link = f"[Click here to open the directory](../{output_folder_name})"
+            self.context.write_output(f" - CV Directory: {clickable_link}")
+            self.context.db_client.add_job_data('status', 'resume created')
+        else:
+            self.context.write_output(f" - Error creating resume. Please see logs.")
+
+        self.context.db_client.insert_job()
+        return success
+
+    def _start_job_log(self, job: BatchJob) -> None:
+        """Resets the job data and starts the report section of the job."""
+        self.context.db_client.clear_job_data()
+        self.context.report.start_job(job.title, job.source if job.page_content is not None else None)
+        if job.page_content is not None:
+            self.context.db_client.add_job_data('url', job.source)
+
+    def _passes_user_pref(self, job: BatchJob) -> bool:
+        response = job.results.get("match_job_to_user_req")
+        return response is not None and self.job_mgr.passes_user_pref(response)
+
+    def _cover_letter_creator(self) -> CoverLetterCreator:
+        return CoverLetterCreator(
+            llm_client=self.context.llm_client,
+            user_name=get_clean_user_name(self.context.config_data.get("name"))
+        )
@@ -0,0 +1,199 @@
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+# Texts shorter than this are stored without compression
+MIN_COMPRESS_SIZE = 128
+
+
+class BlobStore:
+    """
+    Content-addressed storage for large texts in the job database.
+
+    Every text is stored once in the `blobs` table under the SHA-256 hash of its content, so a job description
+    that shows up in many batches takes the space of one. Texts are compressed with zstd if the `zstandard`
+    package is installed, with zlib otherwise. A zstd dictionary trained on earlier texts (see `train_dictionary`)
+    compresses the short, similar job descriptions much better than zstd alone.
+    Blobs keep the codec and dictionary they were written with, so they stay readable when either changes.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, level: int = 9) -> None:
+        """
+        :param connection: Connection to the job database.
+        :param level: Compression level.
+        """
+        self.connection = connection
+        self.level = level
+        self._dicts = {}
+        self._lock = threading.Lock()
+        self._create_tables()
+        self.dict_id = self._latest_dict_id()
+
+    def _create_tables(self) -> None:
+        cursor = self.connection.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL CHECK(codec IN ('raw', 'zlib', 'zstd')),
+            dict_id INTEGER,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        ) WITHOUT ROWID;
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blob_dicts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            data BLOB NOT NULL
+        );
+        """)
+        self.connection.commit()
+
+    def _latest_dict_id(self) -> Optional[int]:
+        row = self.connection.execute("SELECT MAX(id) FROM blob_dicts").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _zstd():
+        try:
+            import zstandard
+            return zstandard
+        except ImportError:
+            return None
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _dictionary(self, dict_id: int):
+        with self._lock:
+            if dict_id not in self._dicts:
+                row = self.connection.execute("SELECT data FROM blob_dicts WHERE id = ?", (dict_id,)).fetchone()
+                if row is None:
+                    raise KeyError(f"Unknown compression dictionary {dict_id}")
+                self._dicts[dict_id] = self._zstd().ZstdCompressionDict(row[0])
+            return self._dicts[dict_id]
+
+    def compress(self, data: bytes) -> tuple[str, Optional[int], bytes]:
+        """
+        Compresses data with the best available codec.
+
+        :return: The codec, the id of the dictionary used (or None) and the compressed data.
+        """
+        if len(data) < MIN_COMPRESS_SIZE:
+            return "raw", None, data
+
+        zstd = self._zstd()
+        if zstd is None:
+            return "zlib", None, zlib.compress(data, self.level)
+
+        dict_id = self.dict_id
+        # compressors are not thread safe, they are cheap to create
+        if dict_id is not None:
+            compressor = zstd.ZstdCompressor(level=self.level, dict_data=self._dictionary(dict_id))
+        else:
+            compressor = zstd.ZstdCompressor(level=self.level)
+        return "zstd", dict_id, compressor.compress(data)
+
+    def decompress(self, codec: str, dict_id: Optional[int], data: bytes) -> bytes:
+        if codec == "raw":
+            return bytes(data)
+        if codec == "zlib":
+            return zlib.decompress(data)
+
+        zstd = self._zstd()
+        if zstd is None:
+            raise RuntimeError("The job log has zstd compressed texts, install the zstandard package to read them.")
+        if dict_id is not None:
+            return zstd.ZstdDecompressor(dict_data=self._dictionary(dict_id)).decompress(data)
+        return zstd.ZstdDecompressor().decompress(data)
+
+    def put(self, text: Optional[str], cursor: Optional[sqlite3.Cursor] = None) -> Optional[str]:
+        """
+        Stores a text unless it is stored already. Does not commit, so it can be part of a larger transaction.
+
+        :param text: The text to store.
+        :param cursor: Cursor of the transaction to store the text in.
+        :return: The hash of the text, None if there is no text.
+        :rtype: Optional[str]
+        """
+        if text is None:
+            return None
+        cursor = cursor or self.connection.cursor()
+        digest = self.content_hash(text)
+        if cursor.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+            return digest
+
+        data = text.encode("utf-8")
+        codec, dict_id, payload = self.compress(data)
+        cursor.execute(
+            "INSERT OR IGNORE INTO blobs (hash, codec, dict_id, size, data) VALUES (?, ?, ?, ?, ?)",
+            (digest, codec, dict_id, len(data), payload)
+        )
+        return digest
+
+    def get(self, digest: Optional[str]) -> Optional[str]:
+        """
+        Returns a stored text by its hash, None if it is not stored.
+        """
+        if digest is None:
+            return None
+        return self.get_many([digest]).get(digest)
+
+    def get_many(self, digests: Iterable[str]) -> dict[str, str]:
+        """
+        Returns several stored texts at once.
+
+        :return: Dictionary with the hashes as keys and the texts as values.
+        :rtype: dict[str, str]
+        """
+        digests = list({digest for digest in digests if digest})
+        texts = {}
+        # stays below the SQLite limit of query parameters
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT hash, codec, dict_id, data FROM blobs WHERE hash IN ({', '.join('?' for _ in chunk)})", chunk
+            ).fetchall()
+            for digest, codec, dict_id, data in rows:
+                texts[digest] = self.decompress(codec, dict_id, data).decode("utf-8")
+        return texts
+
+    def train_dictionary(self, samples: list[str], dict_size: int = 112_640) -> Optional[int]:
+        """
+        Trains a zstd dictionary on sample texts and uses it for the texts stored from now on.
+
+        :param samples: Typical texts, ex: a few thousand job descriptions.
+        :param dict_size: Maximum size of the dictionary in bytes.
+        :return: The id of the new dictionary, None if zstandard is not installed or there are too few samples.
+        :rtype: Optional[int]
+        """
+        zstd = self._zstd()
+        if zstd is None:
+            logging.warning("zstandard is not installed, texts are compressed without a dictionary.")
+            return None
+
+        try:
+            dictionary = zstd.train_dictionary(dict_size, [sample.encode("utf-8") for sample in samples if sample])
+        except zstd.ZstdError as e:
+            logging.warning("Could not train a compression dictionary: %s", e)
+            return None
+
+        cursor = self.connection.cursor()
+        cursor.execute("INSERT INTO blob_dicts (data) VALUES (?)", (dictionary.as_bytes(),))
+        self.connection.commit()
+        self.dict_id = cursor.lastrowid
+        logging.info("Trained compression dictionary %s on %s texts.", self.dict_id, len(samples))
+        return self.dict_id
+
+    def stats(self) -> dict:
+        """
+        Returns the number of stored texts with their size before and after compression, in bytes.
+        """
+        count, size, stored = self.connection.execute(
+            "SELECT COUNT(*), SUM(size), SUM(LENGTH(data)) FROM blobs"
+        ).fetchone()
+        return {"blobs": count, "size": size or 0, "stored_size": stored or 0}
@@ -0,0 +1,308 @@
+import re
+import json
+import html
+import logging
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Optional
+
+# Elements whose text is never part of the main content
+SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "nav", "footer", "aside", "iframe", "button", "select", "head"}
+# Elements that may appear in <head>, any other element starts the body and closes an unclosed <head>
+HEAD_TAGS = {"base", "link", "meta", "noscript", "script", "style", "template", "title"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figure", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul", "br",
+}
+CANDIDATE_TAGS = {"article", "main", "section", "div", "td", "body"}
+
+POSITIVE_HINTS = re.compile(r"job|posting|description|content|article|main|details|vacancy|position|body|text", re.I)
+NEGATIVE_HINTS = re.compile(
+    r"nav|menu|footer|header|cookie|consent|banner|sidebar|related|similar|recommend|share|social|comment|"
+    r"promo|advert|\bads?\b|popup|modal|breadcrumb|login|signup|newsletter|carousel",
+    re.I,
+)
+WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+@dataclass
+class ExtractedContent:
+    """The main content of a page."""
+    title: Optional[str]
+    text: str
+    # how the content was found: `json_ld` or `dom`
+    method: str
+    # share of the page text that was kept
+    ratio: float = 1.0
+
+
+@dataclass(eq=False)
+class _Node:
+    tag: str
+    parent: Optional["_Node"]
+    hints: str = ""
+    start: int = 0
+    end: int = 0
+    text_length: int = 0
+    link_length: int = 0
+    score: float = 0.0
+    own_text: list = field(default_factory=list)
+
+
+class _DomScorer(HTMLParser):
+    """
+    Streaming HTML parser that keeps the page text and scores every block element
+    by how much it looks like the main content, readability style.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.chunks: list[str] = []
+        self.root = _Node("root", None)
+        self.stack: list[_Node] = [self.root]
+        self.candidates: list[_Node] = []
+        self.skip_depth = 0
+        self.link_depth = 0
+        self.in_title = False
+        self.title = ""
+        self.h1 = None
+        self._h1_start = None
+        self.json_ld: list[str] = []
+        self._json_ld_open = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "title":
+            self.in_title = True
+        if tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._json_ld_open = True
+            self.json_ld.append("")
+        if tag not in HEAD_TAGS:
+            self._close_head()
+
+        if tag in VOID_TAGS:
+            if tag == "br" and not self.skip_depth:
+                self.chunks.append("\n")
+            return
+
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        if self.skip_depth:
+            self.stack.append(_Node(tag, self.stack[-1]))
+            return
+
+        if tag == "a":
+            self.link_depth += 1
+        if tag in BLOCK_TAGS:
+            self.chunks.append("\n- " if tag == "li" else "\n")
+        if tag == "h1" and self.h1 is None:
+            self._h1_start = len(self.chunks)
+
+        hints = f"{attrs.get('id') or ''} {attrs.get('class') or ''} {attrs.get('role') or ''}"
+        node = _Node(tag, self.stack[-1], hints=hints, start=len(self.chunks))
+        self.stack.append(node)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.in_title = False
+        if tag == "script":
+            self._json_ld_open = False
+        if tag in VOID_TAGS:
+            return
+
+        # close unclosed children of malformed pages
+        if not any(node.tag == tag for node in self.stack[1:]):
+            return
+        while len(self.stack) > 1:
+            node = self.stack.pop()
+            self._close(node)
+            if node.tag == tag:
+                break
+
+    def _close_head(self) -> None:
+        # pages that never close <head> would otherwise have their whole body skipped
+        if not any(node.tag == "head" for node in self.stack[1:]):
+            return
+        while len(self.stack) > 1:
+            node = self.stack.pop()
+            self._close(node)
+            if node.tag == "head":
+                break
+
+    def _close(self, node: _Node) -> None:
+        if node.tag in SKIP_TAGS:
+            self.skip_depth -= 1
+            return
+        if self.skip_depth:
+            return
+
+        node.end = len(self.chunks)
+        if node.tag == "a":
+            self.link_depth -= 1
+        if node.tag in BLOCK_TAGS:
+            self.chunks.append("\n")
+        if node.tag == "h1" and self.h1 is None and self._h1_start is not None:
+            self.h1 = self._clean("".join(self.chunks[self._h1_start:node.end]))
+
+        parent = node.parent
+        if parent is not None:
+            parent.text_length += node.text_length
+            parent.link_length += node.link_length
+
+        # paragraphs give points to their parent and half as many to their grandparent
+        if node.tag in ("p", "li", "pre", "td", "dd") or node.tag in CANDIDATE_TAGS:
+            own = "".join(node.own_text)
+            if len(own.strip()) >= 25:
+                points = 1 + own.count(",") + min(len(own) / 100, 3)
+                if parent is not None:
+                    parent.score += points
+                    if parent.parent is not None:
+                        parent.parent.score += points / 2
+
+        if node.tag in CANDIDATE_TAGS:
+            self.candidates.append(node)
+
+    def handle_data(self, data):
+        if self._json_ld_open:
+            self.json_ld[-1] += data
+            return
+        if self.in_title:
+            self.title += data
+            return
+        if self.skip_depth or not data.strip():
+            if data and not self.skip_depth:
+                self.chunks.append(" ")
+            return
+
+        self.chunks.append(data)
+        node = self.stack[-1]
+        node.text_length += len(data.strip())
+        node.own_text.append(data)
+        if self.link_depth:
+            node.link_length += len(data.strip())
+
+    def close(self):
+        super().close()
+        while len(self.stack) > 1:
+            self._close(self.stack.pop())
+
+    def text(self, node: Optional[_Node] = None) -> str:
+        if node is None:
+            return self._clean("".join(self.chunks))
+        return self._clean("".join(self.chunks[node.start:node.end]))
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        lines = [WHITESPACE.sub(" ", line).strip() for line in text.split("\n")]
+        text = "\n".join(line for line in lines if line and line != "-")
+        return BLANK_LINES.sub("\n\n", text).strip()
+
+
+class ContentExtractor:
+    """
+    Extracts the job title and the main content of a job page, leaving out navigation, footers,
+    cookie banners, lists of similar jobs and so on.
+
+    A `JobPosting` in the structured data (JSON-LD) of the page is used if there is one. Otherwise the page is
+    parsed as a stream and every block element is scored by the amount of paragraph text it contains,
+    its link density and hints in its id and class; the best block is the main content.
+    `extract` returns None when it is not confident, so the caller can fall back to the full page text.
+    """
+
+    def __init__(self, max_html_chars: int = 2_000_000, max_text_chars: int = 30_000, min_text_chars: int = 400) -> None:
+        """
+        :param max_html_chars: Only this much of a page is parsed.
+        :param max_text_chars: The extracted text is cut off after this many characters.
+        :param min_text_chars: Extracted content shorter than this is not trusted.
+        """
+        self.max_html_chars = max_html_chars
+        self.max_text_chars = max_text_chars
+        self.min_text_chars = min_text_chars
+
+    def extract(self, page: str, chunk_size: int = 65536) -> Optional[ExtractedContent]:
+        """
+        Extracts the main content of a page.
+
+        :param page: The HTML of the page.
+        :param chunk_size: Number of characters fed to the parser at a time.
+        :return: The title and text of the main content, or None if the extraction is not confident.
+        :rtype: Optional[ExtractedContent]
+        """
+        parser = _DomScorer()
+        for offset in range(0, min(len(page), self.max_html_chars), chunk_size):
+            parser.feed(page[offset:min(offset + chunk_size, self.max_html_chars)])
+        parser.close()
+
+        title = parser.h1 or html.unescape(parser.title).strip() or None
+
+        posting = self._job_posting(parser.json_ld)
+        if posting is not None:
+            description = self.html_to_text(posting.get("description") or "")
+            if len(description) >= self.min_text_chars:
+                return ExtractedContent(
+                    title=posting.get("title") or title,
+                    text=description[:self.max_text_chars],
+                    method="json_ld",
+                )
+
+        full_text_length = max(parser.root.text_length, 1)
+        best, best_score = None, 0.0
+        for node in parser.candidates:
+            if node.text_length < self.min_text_chars:
+                continue
+            link_density = node.link_length / node.text_length
+            score = node.score * (1 - link_density)
+            if POSITIVE_HINTS.search(node.hints):
+                score += 25
+            if NEGATIVE_HINTS.search(node.hints):
+                score -= 25
+            if score > best_score:
+                best, best_score = node, score
+
+        if best is None:
+            logging.debug("No main content found, using the full page text.")
+            return None
+
+        text = parser.text(best)
+        if len(text) < self.min_text_chars:
+            return None
+
+        return ExtractedContent(
+            title=title,
+            text=text[:self.max_text_chars],
+            method="dom",
+            ratio=round(best.text_length / full_text_length, 3),
+        )
+
+    @staticmethod
+    def _job_posting(scripts: list[str]) -> Optional[dict]:
+        """Finds a schema.org JobPosting in the JSON-LD scripts of a page."""
+        def find(data):
+            if isinstance(data, list):
+                return next((found for item in data if (found := find(item)) is not None), None)
+            if isinstance(data, dict):
+                types = data.get("@type")
+                types = types if isinstance(types, list) else [types]
+                if "JobPosting" in types:
+                    return data
+                return find(data.get("@graph"))
+            return None
+
+        for script in scripts:
+            try:
+                posting = find(json.loads(script))
+            except json.JSONDecodeError:
+                continue
+            if posting is not None:
+                return posting
+        return None
+
+    @staticmethod
+    def html_to_text(fragment: str) -> str:
+        """Converts an HTML fragment into plain text with line breaks between blocks."""
+        parser = _DomScorer()
+        parser.feed(html.unescape(fragment) if "&lt;" in fragment else fragment)
+        parser.close()
+        return parser.text()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from pathlib import Path
 from resume_ai.app.classes.sqlite_logger import JobLogger
+from resume_ai.app.classes.run_report import RunReport
 from resume_ai.app.clients.openai_client import OpenAIClient
 
 @dataclass
@@ -9,8 +10,15 @@ class RunContext:
     llm_client: OpenAIClient
     run_log_file: Path
     config_data: dict
+    report: RunReport = None
 
+    def __post_init__(self) -> None:
+        if self.report is None:
+            self.report = RunReport(
+                self.run_log_file,
+                fsync_interval=self.config_data.get("report_fsync_interval_seconds", 10)
+            )
 
     def write_output(self, msg: str) -> None:
-        with open(self.run_log_file, "a") as f:
-            f.write(msg + "\n")
\ No newline at end of file
+        """Adds a line to the run report, in the section of the job being processed."""
+        self.report.write(msg)
@@ -1,5 +1,8 @@
+import os
+import yaml
 import logging
 from datetime import datetime
+from typing import Optional
 
 # Third-party imports
 from langchain.prompts import PromptTemplate
@@ -9,7 +12,12 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
 # Local imports
 from resume_ai.app.clients.openai_client import OpenAIClient
+from resume_ai.app.clients.base_llm_client import LlmRequest
 from resume_ai.app.prompts import COVER_LETTER_PROMPT
+from resume_ai.app.funcs import clean_empty
+
+# Fields of the resume that do not help to write the cover letter
+CONTACT_FIELDS = ("email", "phone", "website", "social_networks", "photo", "custom_connections")
 
 
 class CoverLetterCreator:
@@ -24,23 +32,15 @@ class CoverLetterCreator:
         self.llm_client = llm_client
         self.user_name = user_name
 
-    def create_cover_letter(
-            self,
-            job_title: str,
-            job_description: str,
-            resume: dict,
-            output_folder_name: str
-    ) -> None:
+    def cover_letter_request(self, job_title: str, job_requirements: str, resume: dict) -> LlmRequest:
         """
-        Create and save a cover letter as a PDF.
+        Builds the LLM request for the cover letter text.
 
         :param job_title: Title of the job.
-        :param job_description: The job description text.
+        :param job_requirements: The key requirements of the job, see `job_requirements_summary`.
         :param resume: Dict representing the resume data to pull details from.
-        :param output_folder_name: Output directory where the cover letter will be saved.
-        :return: None
+        :return: The request for the LLM.
         """
-        logging.info("Writing cover letter for job: %s", job_title)
         formatted_date = datetime.now().strftime("%B %d, %Y")  # e.g., "March 19, 2024"
 
         prompt_create_cover_letter = PromptTemplate(
@@ -48,22 +48,54 @@ class CoverLetterCreator:
             input_variables=["job"],
             partial_variables={
                 "job_title": job_title,
-                "job_description": job_description,
+                "job_requirements": job_requirements,
                 "current_date": formatted_date,
-                "resume": resume
+                "resume": self.compact_resume(resume)
             },
         )
 
-        response = self.llm_client.invoke_llm(prompt_create_cover_letter, {"job_title": job_title, "job_description": job_description})
-        #logging.info("Cover letter text:\n%s", response.content)
+        return LlmRequest('create_cover_letter', prompt_create_cover_letter, {"job_title": job_title, "job_requirements": job_requirements})
 
-        output_filename = (
-            f"{output_folder_name}/"
-            f"{self.user_name}_Cover_Letter.pdf"
-        )
+    @staticmethod
+    def job_requirements_summary(job_req: Optional[dict], job_description: str, max_chars: int = 4000) -> str:
+        """
+        Returns the key requirements and keywords of a job as found by `get_job_req`,
+        or the beginning of the job description if they are not known.
+
+        :param job_req: The response of `get_job_req`, or None.
+        :param job_description: The job description text.
+        :param max_chars: Length of the job description used instead.
+        :rtype: str
+        """
+        if job_req and job_req.get('job_requirements'):
+            keywords = ', '.join(job_req.get('sentence_keywords') or [])
+            return f"{job_req['job_requirements']}\nKeywords: {keywords}" if keywords else job_req['job_requirements']
+        return job_description[:max_chars]
+
+    @staticmethod
+    def compact_resume(resume: dict) -> str:
+        """
+        Returns the parts of a resume a cover letter is written from as YAML, without contact details and empty fields.
+        """
+        resume = {key: value for key, value in resume.items() if key not in CONTACT_FIELDS}
+        return yaml.safe_dump(clean_empty(resume), sort_keys=False, allow_unicode=True, width=1000)
+
+    def write_cover_letter(self, text: str, output_folder_name: str) -> None:
+        """
+        Save the cover letter text as a PDF in the output folder.
+
+        :param text: The cover letter text.
+        :param output_folder_name: Output directory where the cover letter will be saved.
+        :return: None
+        """
+        output_filename = self.output_filename(output_folder_name)
         logging.info("Writing cover letter to %s", output_filename)
 
-        self.save_text_as_pdf(response.content, output_filename)
+        self.save_text_as_pdf(text, output_filename)
+
+    def output_filename(self, output_folder_name: str) -> str:
+        """Returns the path of the cover letter PDF in the output folder."""
+        return f"{output_folder_name}/{self.user_name}_Cover_Letter.pdf"
 
     @staticmethod
     def save_text_as_pdf(text: str, output_filename: str) -> None:
@@ -74,6 +106,9 @@ class CoverLetterCreator:
         :param output_filename: The path at which to save the PDF.
         :return: None
         """
+        # The cover letter may be written before rendercv has created the output folder
+        os.makedirs(os.path.dirname(output_filename) or ".", exist_ok=True)
+
         doc = SimpleDocTemplate(output_filename, pagesize=letter)
         styles = getSampleStyleSheet()
         style = styles["Normal"]
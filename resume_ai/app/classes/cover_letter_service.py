@@ -0,0 +1,140 @@
+import logging
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional
+
+from resume_ai.app.classes.cover_letter_creator import CoverLetterCreator
+
+
+class CoverLetterService:
+    """
+    Writes cover letters in the background, so they do not add to the time a job takes.
+
+    Jobs hand over their cover letter with `submit` and carry on. The cover letter texts are requested from the LLM
+    by a pool of `concurrency` threads and the PDFs are rendered by a pool of `render_workers` processes.
+    At most `max_queued` cover letters wait or are in progress; `submit` blocks when more are handed over,
+    so cover letters can never fall behind without limit. Call `wait` before the end of a run.
+    """
+
+    def __init__(
+            self,
+            creator: CoverLetterCreator,
+            concurrency: int = 2,
+            render_workers: int = 1,
+            max_queued: int = 20
+    ) -> None:
+        """
+        :param creator: Creates the cover letter requests and PDFs.
+        :param concurrency: Maximum number of cover letter texts requested at once.
+        :param render_workers: Number of processes rendering PDFs.
+        :param max_queued: Maximum number of unfinished cover letters.
+        """
+        self.creator = creator
+        self.concurrency = concurrency
+        self.render_workers = render_workers
+        self._slots = threading.BoundedSemaphore(max_queued)
+        self._llm_pool: Optional[ThreadPoolExecutor] = None
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+
+    def _pools(self) -> tuple[ThreadPoolExecutor, ProcessPoolExecutor]:
+        with self._lock:
+            if self._llm_pool is None:
+                self._llm_pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="cover-letter")
+                # forking a process with running threads is unsafe
+                self._render_pool = ProcessPoolExecutor(self.render_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._llm_pool, self._render_pool
+
+    def submit(self, job_title: str, job_requirements: str, resume: dict, output_folder_name: str) -> Future:
+        """
+        Queues the cover letter of a job.
+
+        :param job_title: Title of the job.
+        :param job_requirements: The key requirements of the job, see `CoverLetterCreator.job_requirements_summary`.
+        :param resume: The tailored resume.
+        :param output_folder_name: Output directory where the cover letter will be saved.
+        :return: Future with the path of the cover letter once it is written.
+        :rtype: Future
+        """
+        self._slots.acquire()
+        llm_pool, _ = self._pools()
+        done = Future()
+        with self._lock:
+            self._pending.add(done)
+        done.add_done_callback(self._finished)
+
+        # the LLM usage is counted for the job that submitted the cover letter, in its job log entry
+        # if the job was inserted before the cover letter is written
+        context = contextvars.copy_context()
+        llm_pool.submit(context.run, self._write, job_title, job_requirements, resume, output_folder_name, done)
+        return done
+
+    def _write(self, job_title: str, job_requirements: str, resume: dict, output_folder_name: str, done: Future) -> None:
+        try:
+            logging.info("Writing cover letter for job: %s", job_title)
+            request = self.creator.cover_letter_request(job_title, job_requirements, resume)
+            text = self.creator.llm_client.invoke_request(request).content
+            output_filename = self.creator.output_filename(output_folder_name)
+        except Exception as e:
+            logging.error("Could not write the cover letter for %s: %s", job_title, e)
+            done.set_exception(e)
+            return
+
+        # the thread is free for the next cover letter while the PDF is rendered
+        try:
+            _, render_pool = self._pools()
+            rendering = render_pool.submit(CoverLetterCreator.save_text_as_pdf, text, output_filename)
+        except Exception as e:
+            logging.error("Could not render the cover letter %s: %s", output_filename, e)
+            done.set_exception(e)
+            return
+
+        def rendered(future: Future) -> None:
+            if future.exception() is not None:
+                logging.error("Could not render the cover letter %s: %s", output_filename, future.exception())
+                done.set_exception(future.exception())
+            else:
+                logging.info("Cover letter written to %s", output_filename)
+                done.set_result(output_filename)
+
+        rendering.add_done_callback(rendered)
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    @property
+    def pending(self) -> int:
+        """Number of unfinished cover letters."""
+        with self._lock:
+            return len(self._pending)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Blocks until all submitted cover letters are written.
+        """
+        with self._lock:
+            pending = list(self._pending)
+        if pending:
+            logging.info("Waiting for %s cover letters.", len(pending))
+        for future in pending:
+            try:
+                future.result(timeout)
+            except Exception:
+                # already logged
+                pass
+
+    def close(self) -> None:
+        """
+        Waits for the submitted cover letters and stops the pools.
+        """
+        self.wait()
+        with self._lock:
+            if self._llm_pool is not None:
+                self._llm_pool.shutdown()
+                self._render_pool.shutdown()
+                self._llm_pool = self._render_pool = None
@@ -0,0 +1,176 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import Optional
+from urllib.parse import urlparse
+
+# HTTP statuses worth retrying after a pause
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class CrawlerTransport:
+    """
+    Fetches many pages concurrently through one pooled HTTP session while staying polite to every site.
+
+    - The session keeps connections alive per host and caches DNS lookups.
+    - At most `concurrency` requests run at once in total, and at most `domain_concurrency` per domain,
+      with at least `domain_delay` seconds between the starts of two requests to the same domain.
+    - URLs are interleaved by domain, so many domains are crawled in parallel and a large job board
+      only ever takes its own share of the slots.
+    - Responses with 429 or 5xx statuses are retried after `Retry-After` or an exponential backoff.
+
+    Limits of single domains can be overridden with `domain_limits`, ex: `{"linkedin.com": {"concurrency": 1, "delay": 3}}`.
+    """
+
+    def __init__(
+            self,
+            concurrency: int = 16,
+            domain_concurrency: int = 2,
+            domain_delay: float = 1.0,
+            domain_limits: Optional[dict] = None,
+            timeout: float = 30,
+            retries: int = 2,
+            max_page_bytes: int = 5_000_000
+    ) -> None:
+        """
+        :param concurrency: Maximum number of requests at once.
+        :param domain_concurrency: Maximum number of requests at once per domain.
+        :param domain_delay: Minimum number of seconds between two requests to the same domain.
+        :param domain_limits: Optional `concurrency` and `delay` per domain.
+        :param timeout: Total timeout of a request in seconds.
+        :param retries: Number of retries of throttled or failed requests.
+        :param max_page_bytes: Pages larger than this are cut off.
+        """
+        self.concurrency = concurrency
+        self.domain_concurrency = domain_concurrency
+        self.domain_delay = domain_delay
+        self.domain_limits = domain_limits or {}
+        self.timeout = timeout
+        self.retries = retries
+        self.max_page_bytes = max_page_bytes
+
+    @staticmethod
+    def domain(url: str) -> str:
+        netloc = urlparse(url).netloc.lower()
+        return netloc[4:] if netloc.startswith("www.") else netloc
+
+    def _limit(self, domain: str, name: str, default: float) -> float:
+        for site, limits in self.domain_limits.items():
+            if domain == site or domain.endswith("." + site):
+                return limits.get(name, default)
+        return default
+
+    @classmethod
+    def interleave(cls, urls: list[str]) -> list[str]:
+        """Orders URLs round-robin by domain, so the first requests go to as many domains as possible."""
+        by_domain = defaultdict(deque)
+        for url in urls:
+            by_domain[cls.domain(url)].append(url)
+
+        ordered = []
+        while by_domain:
+            for domain in list(by_domain):
+                ordered.append(by_domain[domain].popleft())
+                if not by_domain[domain]:
+                    del by_domain[domain]
+        return ordered
+
+    async def _read_body(self, response) -> bytes:
+        """Reads the body of a response until its end or `max_page_bytes`."""
+        chunks, size = [], 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunk = chunk[:self.max_page_bytes - size]
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_page_bytes:
+                logging.warning("Page %s is larger than %s bytes, it is cut off.", response.url, self.max_page_bytes)
+                break
+        return b"".join(chunks)
+
+    def fetch_all(self, urls: list[str]) -> dict[str, str]:
+        """
+        Fetches pages and blocks until all are done.
+
+        :param urls: The URLs to fetch.
+        :return: Dictionary with the URLs that were fetched successfully as keys and their HTML as values.
+        :rtype: dict[str, str]
+        """
+        return asyncio.run(self.fetch_all_async(urls))
+
+    async def fetch_all_async(self, urls: list[str]) -> dict[str, str]:
+        import aiohttp
+
+        urls = self.interleave(list(dict.fromkeys(urls)))
+        global_slots = asyncio.Semaphore(self.concurrency)
+        domain_slots = {}
+        domain_locks = defaultdict(asyncio.Lock)
+        last_start = defaultdict(float)
+
+        for url in urls:
+            domain = self.domain(url)
+            if domain not in domain_slots:
+                domain_slots[domain] = asyncio.Semaphore(int(self._limit(domain, "concurrency", self.domain_concurrency)))
+
+        async def wait_for_turn(domain: str) -> None:
+            # spaces the requests of a domain, without holding a global slot while waiting
+            async with domain_locks[domain]:
+                delay = self._limit(domain, "delay", self.domain_delay)
+                wait = last_start[domain] + delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_start[domain] = time.monotonic()
+
+        async def fetch(session, url: str) -> Optional[str]:
+            domain = self.domain(url)
+            async with domain_slots[domain]:
+                for attempt in range(self.retries + 1):
+                    await wait_for_turn(domain)
+                    async with global_slots:
+                        try:
+                            async with session.get(url) as response:
+                                if response.status in RETRY_STATUSES and attempt < self.retries:
+                                    retry_after = response.headers.get("Retry-After", "")
+                                    backoff = float(retry_after) if retry_after.isdigit() else 2 ** attempt + random.random()
+                                else:
+                                    response.raise_for_status()
+                                    body = await self._read_body(response)
+                                    # get_encoding() needs a body read with read(), it is read in chunks here
+                                    return body.decode(response.charset or "utf-8", errors="replace")
+                        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                            permanent = isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUSES
+                            if permanent or attempt == self.retries:
+                                logging.error("Could not fetch %s: %s", url, e)
+                                return None
+                            backoff = 2 ** attempt + random.random()
+
+                    logging.info("Retrying %s in %.1f seconds.", url, backoff)
+                    await asyncio.sleep(backoff)
+            return None
+
+        async def fetch_page(session, url: str) -> Optional[str]:
+            # one broken page must not stop the crawl of the others
+            try:
+                return await fetch(session, url)
+            except Exception as e:
+                logging.error("Could not fetch %s: %s", url, e)
+                return None
+
+        headers = {"User-Agent": os.environ.get("USER_AGENT", "Mozilla/5.0")}
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            # per domain limits are enforced above, some domains may have higher ones
+            limit_per_host=0,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
+        async with aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as session:
+            pages = await asyncio.gather(*(fetch_page(session, url) for url in urls))
+
+        return {url: page for url, page in zip(urls, pages) if page is not None}
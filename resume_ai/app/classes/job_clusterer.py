@@ -0,0 +1,141 @@
+import copy
+import uuid
+import zlib
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from resume_ai.app.classes.keyword_scorer import KeywordScorer
+
+# Number of dimensions of the hashed keyword vectors
+VECTOR_SIZE = 2 ** 12
+
+
+@dataclass
+class JobCluster:
+    """
+    A group of similar jobs sharing one tailored resume.
+    """
+    cluster_id: str
+    centroid: np.ndarray
+    size: int = 1
+    resume: Optional[dict] = None
+
+
+@dataclass
+class JobClusterer:
+    """
+    Groups jobs with similar titles and keywords, so one tailored resume can be created per group
+    and reused for all of its members.
+
+    Jobs are vectorized by hashing their title and keyword tokens, and assigned to the most similar
+    cluster if the cosine similarity to its centroid is at least `similarity_threshold`, otherwise
+    they start a new cluster. Higher thresholds give tighter clusters.
+    """
+    similarity_threshold: float = 0.8
+    clusters: list[JobCluster] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @staticmethod
+    def vectorize(job_title: str, job_keywords: list[str]) -> np.ndarray:
+        """
+        Turns a job title and keywords into a normalized, hashed bag-of-words vector.
+        """
+        vector = np.zeros(VECTOR_SIZE)
+        tokens = KeywordScorer.tokenize(" ".join([job_title or ""] + list(job_keywords or [])))
+        for token in tokens:
+            vector[zlib.crc32(token.encode("utf-8")) % VECTOR_SIZE] += 1
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def assign(self, job_title: str, job_keywords: list[str]) -> tuple[JobCluster, bool]:
+        """
+        Assigns a job to the most similar cluster or starts a new one.
+
+        :param job_title: Title of the job.
+        :param job_keywords: Keywords of the job from `get_job_req`.
+        :return: A tuple of (cluster, is_new_cluster).
+        """
+        vector = self.vectorize(job_title, job_keywords)
+
+        with self._lock:
+            best, best_similarity = None, -1.0
+            for cluster in self.clusters:
+                similarity = float(vector @ cluster.centroid / (np.linalg.norm(cluster.centroid) or 1))
+                if similarity > best_similarity:
+                    best, best_similarity = cluster, similarity
+
+            if best is not None and best_similarity >= self.similarity_threshold:
+                best.centroid = (best.centroid * best.size + vector) / (best.size + 1)
+                best.size += 1
+                return best, False
+
+            cluster = JobCluster(cluster_id=uuid.uuid4().hex[:12], centroid=vector)
+            self.clusters.append(cluster)
+            return cluster, True
+
+    def cluster(self, jobs: list[tuple[str, list[str]]]) -> list[tuple[JobCluster, int]]:
+        """
+        Clusters a list of jobs at once and picks the member closest to each centroid as its representative.
+
+        :param jobs: A list of (job_title, job_keywords) tuples.
+        :return: A list with the cluster of every job and the index of the representative job of that cluster.
+        """
+        assigned = [self.assign(job_title, job_keywords)[0] for job_title, job_keywords in jobs]
+        vectors = [self.vectorize(job_title, job_keywords) for job_title, job_keywords in jobs]
+
+        representatives = {}
+        for index, cluster in enumerate(assigned):
+            similarity = float(vectors[index] @ cluster.centroid)
+            if cluster.cluster_id not in representatives or similarity > representatives[cluster.cluster_id][1]:
+                representatives[cluster.cluster_id] = (index, similarity)
+
+        return [(cluster, representatives[cluster.cluster_id][0]) for cluster in assigned]
+
+    def publish_resume(self, cluster_id: str, resume: dict) -> bool:
+        """
+        Shares a tailored resume with the other members of a cluster, unless the cluster already has one.
+
+        :param cluster_id: Id of the cluster.
+        :param resume: The tailored resume.
+        :return: True if the resume became the resume of the cluster.
+        """
+        with self._lock:
+            cluster = next((cluster for cluster in self.clusters if cluster.cluster_id == cluster_id), None)
+            if cluster is None or cluster.resume is not None:
+                return False
+            cluster.resume = resume
+            return True
+
+    @staticmethod
+    def adapt_resume(resume: dict, job_keywords: list[str]) -> dict:
+        """
+        Lightly adapts a cluster resume to a member job without an LLM call, by ordering the skills
+        and the highlights of every entry by how many of the job keywords they cover.
+
+        :param resume: The tailored resume of the cluster.
+        :param job_keywords: Keywords of the member job.
+        :return: A copy of the resume, adapted to the job.
+        """
+        keyword_tokens = set(KeywordScorer.tokenize(" ".join(job_keywords or [])))
+
+        def relevance(item) -> int:
+            return -len(keyword_tokens.intersection(KeywordScorer.tokenize(KeywordScorer.resume_to_text(item))))
+
+        adapted = copy.deepcopy(resume)
+        sections = adapted.get("sections", {})
+
+        if isinstance(sections.get("skills"), list):
+            sections["skills"] = sorted(sections["skills"], key=relevance)
+
+        for section in sections.values():
+            if not isinstance(section, list):
+                continue
+            for entry in section:
+                if isinstance(entry, dict) and isinstance(entry.get("highlights"), list):
+                    entry["highlights"] = sorted(entry["highlights"], key=relevance)
+
+        return adapted
@@ -0,0 +1,188 @@
+import json
+import logging
+import itertools
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from resume_ai.app.classes.sqlite_logger import JobLogger, BLOB_COLUMNS
+
+# Tables that can be exported, all with an increasing integer `id`
+EXPORT_TABLES = ("job_log", "llm_usage")
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+class JobExporter:
+    """
+    Exports the job history to Parquet or Arrow IPC files for analysis in pandas, polars, DuckDB etc.
+
+    Rows are read and written in chunks, so exports of any size use little memory, and each export only
+    contains the rows added since the previous one. The files of a table together form a dataset,
+    ex: `pandas.read_parquet("user_data/exports/job_log")`.
+    The large texts of the job log (descriptions, tailored resumes, LLM answers) are left out unless they are
+    selected, so scores and metadata of many jobs can be loaded without them.
+    """
+
+    def __init__(self, db_client: JobLogger, export_dir: Path) -> None:
+        """
+        :param db_client: The job log.
+        :param export_dir: Directory of the exported files, with one subdirectory per table.
+        """
+        self.db_client = db_client
+        self.export_dir = Path(export_dir)
+        self.state_file = self.export_dir / "export_state.json"
+
+    def _load_state(self) -> dict:
+        if self.state_file.exists():
+            with open(self.state_file) as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state: dict) -> None:
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(state, f, indent=2)
+        tmp_file.replace(self.state_file)
+
+    def table_columns(self, table: str) -> dict[str, str]:
+        """
+        Returns the exportable columns of a table with their declared SQLite types.
+        The hashes of the texts in the blob store are internal and never exported.
+        """
+        rows = self.db_client.connection.execute(f"PRAGMA table_info({table})").fetchall()
+        return {row[1]: (row[2] or "TEXT").upper() for row in rows if not row[1].endswith("_hash")}
+
+    @staticmethod
+    def _arrow_type(pa, sqlite_type: str):
+        if "INT" in sqlite_type:
+            return pa.int64()
+        if "REAL" in sqlite_type or "FLOA" in sqlite_type or "DOUB" in sqlite_type:
+            return pa.float64()
+        return pa.string()
+
+    def export(
+            self,
+            table: str = "job_log",
+            file_format: str = "parquet",
+            columns: Optional[list[str]] = None,
+            incremental: bool = True,
+            chunk_size: int = 50_000
+    ) -> Optional[Path]:
+        """
+        Exports the rows of a table to a new file.
+
+        :param table: One of `EXPORT_TABLES`.
+        :param file_format: `parquet` or `arrow` (Arrow IPC / Feather v2).
+        :param columns: The columns to export. Default is all columns except the large texts of the job log.
+        :param incremental: Only export the rows added since the last export of the table, to a new file of its dataset.
+            Otherwise all rows are exported to a single file next to the datasets, ex: `job_log.parquet`.
+        :param chunk_size: Number of rows read and written at a time, one Parquet row group each.
+        :return: The path of the exported file, None if there were no new rows.
+        :rtype: Optional[Path]
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("Exporting needs pyarrow, install the `analytics` extra: poetry install -E analytics")
+
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table {table}, use one of {EXPORT_TABLES}")
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format {file_format}, use one of {tuple(EXPORT_FORMATS)}")
+
+        table_columns = self.table_columns(table)
+        if columns:
+            unknown = [column for column in columns if column not in table_columns]
+            if unknown:
+                raise ValueError(f"Unknown columns of {table}: {unknown}")
+            # the id is needed to continue the next export where this one ended
+            columns = ["id"] + [column for column in columns if column != "id"]
+        else:
+            columns = [column for column in table_columns if table != "job_log" or column not in BLOB_COLUMNS]
+        schema = pa.schema([(column, self._arrow_type(pa, table_columns[column])) for column in columns])
+
+        state = self._load_state()
+        table_state = state.get(table, {}) if incremental else {}
+        if table_state and not any((self.export_dir / table).glob(f"{table}_*")):
+            # the dataset was moved away, a new one starts with all rows
+            table_state = {}
+        last_id = table_state.get("last_id", 0)
+        if incremental:
+            self._check_dataset(table, table_state, file_format, columns)
+
+        chunks = self._read_chunks(table, columns, last_id, chunk_size)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            logging.info("No new rows in %s since the last export.", table)
+            return None
+
+        export_dir = self.export_dir / table if incremental else self.export_dir
+        export_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = export_dir / f".{table}_{last_id + 1}.tmp"
+
+        rows = 0
+        try:
+            with self._writer(pa, file_format, tmp_file, schema) as write:
+                for chunk in itertools.chain([first_chunk], chunks):
+                    write(pa.RecordBatch.from_pylist(chunk, schema=schema))
+                    rows += len(chunk)
+                    last_exported_id = chunk[-1]["id"]
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+        if incremental:
+            path = export_dir / f"{table}_{last_id + 1:09d}_{last_exported_id:09d}{EXPORT_FORMATS[file_format]}"
+        else:
+            path = export_dir / f"{table}{EXPORT_FORMATS[file_format]}"
+        tmp_file.replace(path)
+
+        if incremental:
+            state[table] = {"last_id": last_exported_id, "file": path.name, "format": file_format, "columns": columns}
+            self._save_state(state)
+        logging.info("Exported %s rows of %s to %s.", rows, table, path)
+        return path
+
+    def _check_dataset(self, table: str, table_state: dict, file_format: str, columns: list[str]) -> None:
+        """
+        Makes sure a new file of a dataset has the format and columns of its earlier files, so they can be read together.
+
+        :raises ValueError: If the format or the columns differ from the previous export of the table.
+        """
+        dataset_dir = self.export_dir / table
+        previous_format = table_state.get("format", file_format)
+        previous_columns = table_state.get("columns", columns)
+        if previous_format == file_format and previous_columns == columns:
+            return
+        raise ValueError(
+            f"The {table} dataset in {dataset_dir} was exported as {previous_format} with the columns {previous_columns}. "
+            f"Export it with the same format and columns, use a full export, or move the dataset directory away to start a new dataset."
+        )
+
+    def _read_chunks(self, table: str, columns: list[str], last_id: int, chunk_size: int) -> Iterator[list[dict]]:
+        """Reads the rows after `last_id` in chunks, with the texts of the job log read from the blob store."""
+        text_columns = [column for column in columns if table == "job_log" and column in BLOB_COLUMNS]
+        select = columns + [f"{column}_hash" for column in text_columns]
+
+        cursor = self.db_client.connection.cursor()
+        cursor.execute(f"SELECT {', '.join(select)} FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+        while rows := cursor.fetchmany(chunk_size):
+            rows = [dict(zip(select, row)) for row in rows]
+            if text_columns:
+                texts = self.db_client.blobs.get_many(row[f"{column}_hash"] for row in rows for column in text_columns)
+                rows = [self.db_client.resolve_texts(row, texts) for row in rows]
+            yield rows
+
+    @staticmethod
+    @contextmanager
+    def _writer(pa, file_format: str, path: Path, schema):
+        """Opens a Parquet or Arrow IPC file and yields the function that writes record batches to it."""
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            with pq.ParquetWriter(path, schema, compression="zstd") as parquet_writer:
+                yield parquet_writer.write_batch
+        else:
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as ipc_writer:
+                yield ipc_writer.write_batch
@@ -1,22 +1,42 @@
+import copy
+import re
+import random
 import logging
-import asyncio
+import hashlib
+import threading
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from contextvars import ContextVar
 
 # Third-party imports
 from langchain_core.output_parsers import JsonOutputParser
 from langchain.prompts import PromptTemplate
+from pydantic import create_model
 
 # Local imports
 from resume_ai.app.classes.cover_letter_creator import CoverLetterCreator
+from resume_ai.app.classes.cover_letter_service import CoverLetterService
+from resume_ai.app.classes.resume_selector import ResumeSelector
 from resume_ai.app.classes.context import RunContext
+from resume_ai.app.classes.keyword_scorer import KeywordScorer
+from resume_ai.app.classes.job_clusterer import JobClusterer
+from resume_ai.app.classes.resume_repairer import ResumeRepairer
+from resume_ai.app.classes.stage_scheduler import Stage, StageScheduler, STAGE_DONE
+from resume_ai.app.clients.base_llm_client import LlmRequest
+from resume_ai.app.clients.budget_governor import BudgetExceededError
 from resume_ai.app.prompts import (
     RESUME_TO_JOB_PROMPT,
     MATCH_RESUMES_PROMPT,
     MATCH_USER_REQ_PROMPT,
     EXAMINE_JOB_REQUIREMENTS,
     LIST_RESUME_IMPROVEMENTS,
-    CHECK_SCRAPED_PAGE
+    CHECK_SCRAPED_PAGE,
+    ANALYZE_JOB_PROMPT,
+    ANALYZE_JOB_USER_PREFERENCES_INSTRUCTIONS,
+    ANALYZE_JOB_USER_PREFERENCES,
+    PARSE_RESUME_PROMPT,
+    RESUME_SECTION_TO_JOB_PROMPT
 )
 from resume_ai.app.funcs import (
     load_yaml,
@@ -32,17 +52,25 @@ from resume_ai.app.funcs import (
 )
 from resume_ai.app.constants import (
     RESUMES_NEW_YAML_DIR_PATH,
-    USER_DATA_DIR_PATH
+    USER_DATA_DIR_PATH,
+    BASE_RESUMES_DIR_PATH
 )
 from resume_ai.app.models import (
     CVRoot,
+    ResumeSections,
     ResumeJobMatchScore,
     UserJobMatchScore,
     JobRequirements,
     ResumeImprovements,
-    JobDetails
+    JobDetails,
+    JobAnalysis,
+    JobAnalysisWithMatch
 )
 
+# Base resume selected for the job being processed, see `JobManager.select_resume`
+_job_resume: ContextVar[Optional[str]] = ContextVar("job_resume", default=None)
+
+
 @dataclass
 class JobManager:
     """
@@ -52,27 +80,74 @@ class JobManager:
     context: RunContext
     current_resume: dict
     example_yaml: dict
+    resume_selector: ResumeSelector = None
+    _base_cvs: dict = field(default_factory=dict, init=False, repr=False)
+    _base_cv_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _keyword_scorer: KeywordScorer = field(default=None, init=False, repr=False)
+    _job_clusterer: JobClusterer = field(default=None, init=False, repr=False)
+    _cover_letters: CoverLetterService = field(default=None, init=False, repr=False)
+    _cover_letters_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    # Sections rewritten for every job in `sections` resume generation mode. All other parts of the CV are
+    # copied from the base resume.
+    TAILORED_SECTIONS = ("summary", "experience", "projects", "skills")
+
+    @property
+    def job_resume(self) -> str:
+        """
+        The base resume of the current job, see `select_resume`. `current_resume` if none was selected.
+        """
+        resume = _job_resume.get()
+        return self.current_resume if resume is None else resume
+
+    def select_resume(self, job_title: str, job_description: str) -> None:
+        """
+        Picks the base resume of the job with the `resume_selector` and records it in the job data.
+        Without a selector every job starts from `current_resume`.
+
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :return: None
+        """
+        _job_resume.set(None)
+        if self.resume_selector is None:
+            return
+
+        resume = self.resume_selector.select(f"{job_title}\n{job_description}")
+        if resume is None:
+            return
+
+        _job_resume.set(resume.text)
+        self.context.db_client.add_job_data('resume_filename', resume.filename)
+        self.context.write_output(f" - Base resume: {resume.filename} (similarity {resume.similarity})")
 
     def match_job_to_user_req(
             self,
             job_title: str,
-            job_description: str
-    ) -> float:
+            job_description: str,
+            profile_filename: str = None
+    ) -> dict:
         """
         Matches a specific job to its corresponding requirements by utilizing
         underlying matching algorithms or logic. This method performs the core
         operation of linking or determining compatibility between job entities
         and given requirement criteria from the user.
 
+        :param profile_filename: The profile to match the job to, default is the first of `profiles`.
         :return: Match result or status that indicates the relationship or compatibility
                  between the job and its requirements.
-        :rtype: Any
+        :rtype: dict
         """
         logging.info("Matching user requirements job: %s", job_title)
+        return self.context.llm_client.invoke_request(
+            self.match_job_to_user_req_request(job_title, job_description, profile_filename)
+        )
 
-        # Importing optional components (this is not best practice)
-        user_data_path = Path(USER_DATA_DIR_PATH) / self.context.config_data.get('profile_filename')
-        user_data = load_yaml(user_data_path)
+    def match_job_to_user_req_request(self, job_title: str, job_description: str, profile_filename: str = None) -> LlmRequest:
+        """
+        Builds the LLM request for `match_job_to_user_req`.
+        """
+        user_data = self.load_user_profile(profile_filename)
 
         parser = JsonOutputParser(pydantic_object=UserJobMatchScore)
         prompt = PromptTemplate(
@@ -86,39 +161,286 @@ class JobManager:
             },
         )
 
-        response = self.context.llm_client.invoke_llm(prompt, {"job_title": job_title, "job_description": job_description}, parser)
+        return LlmRequest(
+            'match_job_to_user_req', prompt, {"job_title": job_title, "job_description": job_description}, parser,
+            confidence_check=self.is_confident_user_pref_match
+        )
+
+    def is_confident_user_pref_match(self, response: dict) -> bool:
+        """
+        Confidence check for model cascades: a match score close to `match_job_to_user_pref_limit` decides
+        whether a resume is created, so it is escalated to the next model.
+
+        :param response: The response of `match_job_to_user_req`.
+        :return: False if the score is within `cascade_confidence_margin` (0.1 by default) of the limit.
+        :rtype: bool
+        """
+        limit = self.context.config_data.get("match_job_to_user_pref_limit", 0)
+        margin = self.context.config_data.get("cascade_confidence_margin", 0.1)
+        return abs(response['job_to_req_match_score'] - limit) >= margin
+
+    @property
+    def profiles(self) -> list[str]:
+        """
+        The profiles jobs are matched to: `profiles` of the config, or just `profile_filename`.
+        """
+        return self.context.config_data.get('profiles') or [self.context.config_data.get('profile_filename')]
+
+    def matches_several_profiles(self) -> bool:
+        """
+        True if every job is matched to more than one profile, see `build_profile_match_stages`.
+        """
+        return bool(self.context.config_data.get("match_job_to_user_pref")) and len(self.profiles) > 1
 
-        return response
+    def load_user_profile(self, profile_filename: str = None) -> dict:
+        """
+        Loads a user profile YAML.
 
+        :param profile_filename: File name of the profile in the user data directory, default is the first of `profiles`.
+        """
+        # Importing optional components (this is not best practice)
+        user_data_path = Path(USER_DATA_DIR_PATH) / (profile_filename or self.profiles[0])
+        return load_yaml(user_data_path)
+
+    def analyze_job(self, job_title: str, job_description: str, match_user_pref: bool = None) -> dict:
+        """
+        Produces the job requirements, resume improvements and, if enabled, the job to user requirements
+        match in a single LLM request, instead of the three separate analysis requests.
+
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :param match_user_pref: Include the match to the user profile, default is `match_job_to_user_pref` of the config.
+        :return: The fused analysis, see `split_analysis`.
+        :rtype: dict
+        """
+        logging.info("Analyzing job: %s", job_title)
+        return self.context.llm_client.invoke_request(self.analyze_job_request(job_title, job_description, match_user_pref))
+
+    def analyze_job_request(self, job_title: str, job_description: str, match_user_pref: bool = None) -> LlmRequest:
+        """
+        Builds the LLM request for `analyze_job`.
+        """
+        user_preferences_instructions = ""
+        user_preferences = ""
+        pydantic_object = JobAnalysis
+
+        if match_user_pref is None:
+            match_user_pref = self.context.config_data.get("match_job_to_user_pref")
+
+        if match_user_pref:
+            user_data = self.load_user_profile()
+            user_preferences_instructions = ANALYZE_JOB_USER_PREFERENCES_INSTRUCTIONS
+            user_preferences = ANALYZE_JOB_USER_PREFERENCES.format(
+                personal_info=user_data.get('personal_info'),
+                work_preferences=user_data.get('work_preferences'),
+                job_requirements=user_data.get('job_requirements')
+            )
+            pydantic_object = JobAnalysisWithMatch
+
+        parser = JsonOutputParser(pydantic_object=pydantic_object)
+        prompt = PromptTemplate(
+            template=ANALYZE_JOB_PROMPT,
+            input_variables=["job_title", "job_description"],
+            partial_variables={
+                "user_resume": self.job_resume,
+                "user_preferences_instructions": user_preferences_instructions,
+                "user_preferences": user_preferences,
+                "format_instructions": parser.get_format_instructions()
+            }
+        )
+
+        return LlmRequest('analyze_job', prompt, {"job_title": job_title, "job_description": job_description}, parser)
+
+    @staticmethod
+    def split_analysis(response: dict) -> dict:
+        """
+        Splits a fused analysis into the responses of the separate analysis requests.
+
+        :param response: The response of `analyze_job`.
+        :return: A dictionary with `get_job_req`, `resume_improvements` and, if present,
+            `match_job_to_user_req` keys.
+        :rtype: dict
+        """
+        analysis = {
+            'get_job_req': {key: response.get(key) for key in JobRequirements.model_fields},
+            'resume_improvements': {key: response.get(key) for key in ResumeImprovements.model_fields},
+        }
+        if response.get('job_to_req_match_score') is not None:
+            analysis['match_job_to_user_req'] = {key: response.get(key) for key in UserJobMatchScore.model_fields}
+        return analysis
+
+    def compare_analysis(self, split: dict, fused: dict) -> dict:
+        """
+        Compares the results of the split and the fused analysis and records the comparison.
+
+        :param split: Dictionary with the responses of the separate analysis requests.
+        :param fused: The fused analysis, split with `split_analysis`.
+        :return: The comparison metrics.
+        :rtype: dict
+        """
+        split_keywords = {k.lower().strip() for k in split['get_job_req'].get('sentence_keywords') or []}
+        fused_keywords = {k.lower().strip() for k in fused['get_job_req'].get('sentence_keywords') or []}
+        union = split_keywords | fused_keywords
+
+        comparison = {
+            'keyword_overlap': round(len(split_keywords & fused_keywords) / len(union), 2) if union else 1.0,
+            'split_improvements': len(split['resume_improvements'].get('resume_improvements') or []),
+            'fused_improvements': len(fused['resume_improvements'].get('resume_improvements') or []),
+        }
+        if 'match_job_to_user_req' in split and 'match_job_to_user_req' in fused:
+            comparison['split_match_score'] = split['match_job_to_user_req']['job_to_req_match_score']
+            comparison['fused_match_score'] = fused['match_job_to_user_req']['job_to_req_match_score']
+
+        self.context.write_output(f" - Fused vs split analysis: {comparison}")
+        self.context.db_client.append_llm_text('fused_analysis', fused)
+        self.context.db_client.append_llm_text('fused_analysis_comparison', comparison)
+        return comparison
 
     def match_resumes_to_job(
             self,
             job_title: str,
             job_description: str,
-            new_resume: dict
+            new_resume: dict,
+            job_keywords: list[str] = None
     ) -> None:
         """
         Match current and new resumes to the specified job.
 
+        With `resume_scoring` set to `local` in the config, the resumes are scored with the `KeywordScorer`
+        against the job keywords, and the LLM is only asked for a random `llm_scoring_sample_rate` share of the
+        jobs. The sampled LLM scores are stored in the llm text of the job, next to the local ones.
+
         :param job_title: Title of the job.
         :param job_description: The job description text.
         :param new_resume: Dict representing the newly created resume.
+        :param job_keywords: Keywords of the job from `get_job_req`. Used for local scoring.
         :return: None
         """
         logging.info("Matching current resume and new resume for job: %s", job_title)
+
+        if self.context.config_data.get("resume_scoring", "llm") != "local":
+            response = self.context.llm_client.invoke_request(self.match_resumes_to_job_request(job_title, job_description, new_resume))
+            self.record_resume_match(response)
+            return
+
+        self.record_resume_match(self.score_resumes_locally(job_description, new_resume, job_keywords))
+
+        if random.random() < self.context.config_data.get("llm_scoring_sample_rate", 0):
+            logging.info("Sampling LLM resume scoring for job: %s", job_title)
+            response = self.context.llm_client.invoke_request(self.match_resumes_to_job_request(job_title, job_description, new_resume))
+            self.context.db_client.append_llm_text('llm_resume_match', response)
+
+    def score_resumes_locally(self, job_description: str, new_resume: dict, job_keywords: list[str] = None) -> dict:
+        """
+        Scores the current and the new resume against the job keywords without an LLM call.
+
+        :param job_description: The job description text. Its sentences are used if there are no keywords.
+        :param new_resume: Dict representing the newly created resume.
+        :param job_keywords: Keywords of the job from `get_job_req`.
+        :return: Dictionary in the format of `ResumeJobMatchScore`.
+        :rtype: dict
+        """
+        if not job_keywords:
+            job_keywords = [sentence for sentence in re.split(r"[\n.;]+", job_description) if sentence.strip()]
+
+        return self.keyword_scorer.match_resumes(job_keywords, self.job_resume, new_resume)
+
+    @property
+    def job_clusterer(self) -> JobClusterer:
+        """The clusterer of similar jobs, shared by all jobs of the run."""
+        if self._job_clusterer is None:
+            self._job_clusterer = JobClusterer(self.context.config_data.get("cluster_similarity_threshold", 0.8))
+        return self._job_clusterer
+
+    def create_clustered_resume(
+            self,
+            job_title: str,
+            job_description: str,
+            job_keywords: list[str],
+            resume_improvements: list[str] = None,
+            publish: bool = True,
+    ) -> dict:
+        """
+        Creates a resume for the job, reusing the resume of a cluster of similar jobs if there is one.
+
+        The first job of a cluster gets a resume from `create_resume`. Later members get a copy of it,
+        adapted locally to their keywords. The cluster is recorded in the job data.
+
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :param job_keywords: Keywords of the job from `get_job_req`.
+        :param resume_improvements: a list of resume improvements recommended by the LLM.
+        :param publish: If False, a new resume is not shared with the cluster, for resumes that may still be
+            discarded; it is shared later with `JobClusterer.publish_resume`.
+        :return: Dict representing the new resume.
+        """
+        cluster, _ = self.job_clusterer.assign(job_title, job_keywords)
+        self.context.db_client.add_job_data('cluster_id', cluster.cluster_id)
+
+        if cluster.resume is not None:
+            logging.info("Reusing resume of job cluster %s for job: %s", cluster.cluster_id, job_title)
+            self.context.write_output(f" - Resume reused from job cluster {cluster.cluster_id}")
+            return self.job_clusterer.adapt_resume(cluster.resume, job_keywords)
+
+        new_resume = self.create_resume(job_title, job_description, resume_improvements)
+        if publish:
+            self.job_clusterer.publish_resume(cluster.cluster_id, new_resume)
+        return new_resume
+
+    @property
+    def keyword_scorer(self) -> KeywordScorer:
+        """The local resume scorer, created on first use."""
+        if self._keyword_scorer is None:
+            self._keyword_scorer = KeywordScorer(
+                weights=self.context.config_data.get("local_scoring_weights"),
+                embeddings_model=self.context.config_data.get("local_embeddings_model")
+            )
+        return self._keyword_scorer
+
+    @property
+    def cover_letters(self) -> CoverLetterService:
+        """The background cover letter writer, shared by all jobs of the run."""
+        with self._cover_letters_lock:
+            if self._cover_letters is None:
+                config = self.context.config_data
+                self._cover_letters = CoverLetterService(
+                    CoverLetterCreator(llm_client=self.context.llm_client, user_name=get_clean_user_name(config.get("name"))),
+                    concurrency=config.get("cover_letter_concurrency", 2),
+                    render_workers=config.get("cover_letter_render_workers", 1),
+                    max_queued=config.get("cover_letter_max_queued", 20)
+                )
+            return self._cover_letters
+
+    def finish_background_work(self) -> None:
+        """Waits for the cover letters that are still being written."""
+        if self._cover_letters is not None:
+            self._cover_letters.close()
+
+    def match_resumes_to_job_request(self, job_title: str, job_description: str, new_resume: dict) -> LlmRequest:
+        """
+        Builds the LLM request for `match_resumes_to_job`.
+        """
         parser = JsonOutputParser(pydantic_object=ResumeJobMatchScore)
         prompt = PromptTemplate(
             template=MATCH_RESUMES_PROMPT,
             input_variables=["job_title", "job_description"],
             partial_variables={
-                "current_resume": self.current_resume,
+                "current_resume": self.job_resume,
                 "new_resume": new_resume,
                 "job_title": job_title,
                 "format_instructions": parser.get_format_instructions()
             },
         )
 
-        response = self.context.llm_client.invoke_llm(prompt, {"job_title": job_title, "job_description": job_description}, parser)
+        return LlmRequest('match_resumes_to_job', prompt, {"job_title": job_title, "job_description": job_description}, parser)
+
+    def record_resume_match(self, response: dict) -> None:
+        """
+        Displays the old and new resume match scores and adds them to the job data.
+
+        :param response: The response of the `match_resumes_to_job` request.
+        :return: None
+        """
         display_resumes_to_job_matching_scores(response)
 
         self.context.db_client.add_job_data('resume_match_score', response['old_resume_match_score'])
@@ -128,19 +450,65 @@ class JobManager:
             self,
             job_title: str,
             job_description: str,
-            output_dir: str,
             resume_improvements: list[str] = None,
-    ) -> tuple[bool, dict]:
+    ) -> dict:
         """
         Create a resume tailored to the specified job.
 
         :param job_title: Title of the job.
         :param job_description: The job description text.
-        :param output_dir: directory where to put the resume.
         :param resume_improvements: a list of resume improvements recommended by the LLM.
-        :return: A tuple of (success_flag, new_resume_dict).
+        :return: Dict representing the new resume.
+        """
+        logging.info(f""" {"="*20} Creating resume for job: %s {"="*20} """, job_title)
+
+        if self.context.config_data.get("resume_generation_mode", "full") == "sections":
+            new_resume = self.create_resume_by_sections(job_title, job_description, resume_improvements)
+        else:
+            response = self.context.llm_client.invoke_request(self.create_resume_request(job_title, job_description, resume_improvements))
+            new_resume = self.clean_resume(response)
+
+        return self.repair_resume(new_resume)
+
+    def repair_resume(self, new_resume: dict) -> dict:
+        """
+        Validates a generated resume against the rendercv schema and repairs it, unless `repair_resume`
+        is disabled in the config.
+
+        :param new_resume: Dict representing the newly created resume.
+        :return: Dict representing the repaired resume.
+        """
+        if not self.context.config_data.get("repair_resume", True):
+            return new_resume
+
+        repairer = ResumeRepairer(
+            self.context.llm_client,
+            self.example_yaml,
+            max_attempts=self.context.config_data.get("resume_repair_attempts", 2)
+        )
+        return repairer.repair(new_resume)
+
+    @staticmethod
+    def clean_resume(response: dict) -> dict:
+        """
+        Extracts the CV from a `create_resume` response.
+
+        :param response: The parsed response of the `create_resume` request.
+        :return: Dict representing the new resume.
+        """
+        # LLM has a tendency to add empty items, like `extracurricular_activities: []`. We should remove them as rendercv throws an error.
+        return clean_empty(response["cv"])
+
+    def create_resume_request(
+            self,
+            job_title: str,
+            job_description: str,
+            resume_improvements: list[str] = None,
+    ) -> LlmRequest:
         """
-        custom_instructions_dict = self.context.config_data
+        Builds the LLM request for `create_resume`.
+        """
+        custom_instructions_dict = dict(self.context.config_data)
         if resume_improvements:
             custom_instructions_dict['resume_improvements'] = resume_improvements
 
@@ -149,20 +517,150 @@ class JobManager:
             template=RESUME_TO_JOB_PROMPT,
             input_variables=["job_title", "job_description"],
             partial_variables={
-                "resume": self.current_resume,
+                "resume": self.job_resume,
                 "example": self.example_yaml.get('cv'),
                 "custom_instructions": get_custom_instructions(custom_instructions_dict),
                 "format_instructions": parser.get_format_instructions()
             },
         )
 
-        logging.info(f""" {"="*20} Creating resume for job: %s {"="*20} """, job_title)
-        job_file_name_without_extension = get_job_dir(job_title)
+        return LlmRequest('create_resume', prompt, {"job_title": job_title, "job_description": job_description}, parser)
+
+    def create_resume_by_sections(
+            self,
+            job_title: str,
+            job_description: str,
+            resume_improvements: list[str] = None,
+    ) -> dict:
+        """
+        Create a resume tailored to the specified job by rewriting only the tailorable sections.
+
+        The invariant parts of the CV (name, contact details, education, publications...) are copied from
+        the structured base resume, and each tailorable section is requested from the LLM separately and in parallel.
 
-        response = self.context.llm_client.invoke_llm(prompt, {"job_title": job_title, "job_description": job_description}, parser)
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :param resume_improvements: a list of resume improvements recommended by the LLM.
+        :return: Dict representing the new resume.
+        """
+        requests = self.create_resume_section_requests(job_title, job_description, resume_improvements)
+
+        def section_stage(section, request):
+            return Stage(name=section, func=lambda results: self.context.llm_client.invoke_request(request))
+
+        scheduler = StageScheduler([section_stage(section, request) for section, request in requests.items()])
+        return self.merge_resume_sections(scheduler.run())
+
+    def create_resume_section_requests(
+            self,
+            job_title: str,
+            job_description: str,
+            resume_improvements: list[str] = None,
+    ) -> dict[str, LlmRequest]:
+        """
+        Builds one LLM request per tailorable section of the base resume.
+
+        :return: A dictionary with section names as keys and the requests as values.
+        :rtype: dict[str, LlmRequest]
+        """
+        custom_instructions_dict = dict(self.context.config_data)
+        if resume_improvements:
+            custom_instructions_dict['resume_improvements'] = resume_improvements
+        custom_instructions = get_custom_instructions(custom_instructions_dict)
+
+        base_sections = self.get_base_cv().get('sections', {})
+        tailored_sections = self.context.config_data.get("tailored_sections", self.TAILORED_SECTIONS)
+
+        requests = {}
+        for section in tailored_sections:
+            if not base_sections.get(section) or section not in ResumeSections.model_fields:
+                continue
+
+            section_model = create_model(
+                f"Tailored_{section}",
+                **{section: (ResumeSections.model_fields[section].annotation, ...)}
+            )
+            parser = JsonOutputParser(pydantic_object=section_model)
+            prompt = PromptTemplate(
+                template=RESUME_SECTION_TO_JOB_PROMPT,
+                input_variables=["job_title", "job_description"],
+                partial_variables={
+                    "section": section,
+                    "section_content": base_sections[section],
+                    "custom_instructions": custom_instructions,
+                    "format_instructions": parser.get_format_instructions()
+                },
+            )
+            requests[section] = LlmRequest(
+                'create_resume', prompt, {"job_title": job_title, "job_description": job_description}, parser
+            )
+
+        return requests
+
+    def merge_resume_sections(self, section_responses: dict) -> dict:
+        """
+        Merges tailored sections into a copy of the base resume.
+
+        :param section_responses: Dictionary with section names as keys and the parsed section responses as values.
+            Sections without a response keep the content of the base resume.
+        :return: Dict representing the new resume.
+        """
+        base_cv = self.get_base_cv()
+        new_cv = {**base_cv, 'sections': dict(base_cv.get('sections', {}))}
+
+        for section, response in section_responses.items():
+            if response and response.get(section):
+                new_cv['sections'][section] = response[section]
 
         # LLM has a tendency to add empty items, like `extracurricular_activities: []`. We should remove them as rendercv throws an error.
-        new_cv_dict = clean_empty(response["cv"])
+        return clean_empty(new_cv)
+
+    def get_base_cv(self) -> dict:
+        """
+        Returns the base resume of the current job as a structured CV dict.
+
+        The PDF resume is converted into the CV structure once with the LLM and cached in
+        BASE_RESUMES_DIR_PATH, keyed by a hash of the resume text, so it can be reused across runs.
+
+        :return: The `cv` part of the structured base resume.
+        :rtype: dict
+        """
+        resume_hash = hashlib.sha256(str(self.job_resume).encode("utf-8")).hexdigest()[:16]
+        with self._base_cv_lock:
+            if resume_hash in self._base_cvs:
+                return self._base_cvs[resume_hash]
+
+            cache_file = BASE_RESUMES_DIR_PATH / f"{resume_hash}.yaml"
+
+            base_cv = load_yaml(cache_file) if cache_file.exists() else None
+            if not base_cv:
+                logging.info("Converting base resume into a structured CV.")
+                parser = JsonOutputParser(pydantic_object=CVRoot)
+                prompt = PromptTemplate(
+                    template=PARSE_RESUME_PROMPT,
+                    input_variables=[],
+                    partial_variables={
+                        "resume": self.job_resume,
+                        "format_instructions": parser.get_format_instructions()
+                    },
+                )
+                base_cv = self.clean_resume(self.context.llm_client.invoke_request(LlmRequest('parse_resume', prompt, {}, parser)))
+
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                save_yaml_to_file(base_cv, cache_file)
+
+            self._base_cvs[resume_hash] = base_cv
+            return base_cv
+
+    def save_resume(self, job_title: str, new_cv_dict: dict) -> Path:
+        """
+        Merge a generated CV into the example YAML and save it as a rendercv YAML file.
+
+        :param job_title: Title of the job.
+        :param new_cv_dict: Dict representing the newly created resume.
+        :return: Path to the saved YAML file.
+        """
+        job_file_name_without_extension = get_job_dir(job_title)
 
         # Merge generated CV into the example YAML
         job_specific_yaml = self.example_yaml.copy()
@@ -177,26 +675,33 @@ class JobManager:
         )
         save_yaml_to_file(job_specific_yaml, job_descr_resume_filename)
 
-        # Match the newly created resume to the job
-        self.match_resumes_to_job(job_title, job_description, new_cv_dict)
+        return job_descr_resume_filename
 
+    @staticmethod
+    def render_resume(resume_yaml_filename: Path, output_dir: str) -> None:
+        """
+        Render a resume YAML file into a PDF with rendercv.
 
-        # Attempt to render the new resume
+        :param resume_yaml_filename: Path to the rendercv YAML file.
+        :param output_dir: directory where to put the resume.
+        :return: None
+        """
         render_cmd = (
-            f'rendercv render "{job_descr_resume_filename}" '
+            f'rendercv render "{resume_yaml_filename}" '
             f'--output-folder-name "{output_dir}"'
         )
         logging.info("Running command: %s", render_cmd)
 
         try:
             run_shell_cmd(render_cmd)
-            return True, new_cv_dict
         except Exception as e:
             logging.exception("Error rendering resume: %s", e)
             raise
 
     def get_job_req(self, job_title: str, job_description: str) -> dict:
+        return self.context.llm_client.invoke_request(self.get_job_req_request(job_title, job_description))
 
+    def get_job_req_request(self, job_title: str, job_description: str) -> LlmRequest:
         parser = JsonOutputParser(pydantic_object=JobRequirements)
         prompt = PromptTemplate(
             template=EXAMINE_JOB_REQUIREMENTS,
@@ -206,27 +711,28 @@ class JobManager:
             }
         )
 
-        response = self.context.llm_client.invoke_llm(prompt, {"job_title": job_title, "job_description": job_description}, parser)
-
-        return response
+        return LlmRequest('get_job_req', prompt, {"job_title": job_title, "job_description": job_description}, parser)
 
     def resume_improvements(self, job_title: str, job_description: str) -> dict:
+        return self.context.llm_client.invoke_request(self.resume_improvements_request(job_title, job_description))
 
+    def resume_improvements_request(self, job_title: str, job_description: str) -> LlmRequest:
         parser = JsonOutputParser(pydantic_object=ResumeImprovements)
         prompt = PromptTemplate(
             template=LIST_RESUME_IMPROVEMENTS,
             input_variables=["job_title", "job_description"],
             partial_variables={
-                "user_resume": self.current_resume,
+                "user_resume": self.job_resume,
                 "format_instructions": parser.get_format_instructions()
             }
         )
 
-        response = self.context.llm_client.invoke_llm(prompt, {"job_title": job_title, "job_description": job_description}, parser)
-
-        return response
+        return LlmRequest('resume_improvements', prompt, {"job_title": job_title, "job_description": job_description}, parser)
 
     def check_url_job_active(self, job_link: str, page_title: str, page_content: str):
+        return self.context.llm_client.invoke_request(self.check_url_job_active_request(job_link, page_title, page_content))
+
+    def check_url_job_active_request(self, job_link: str, page_title: str, page_content: str) -> LlmRequest:
         parser = JsonOutputParser(pydantic_object=JobDetails)
         prompt = PromptTemplate(
             template=CHECK_SCRAPED_PAGE,
@@ -237,15 +743,52 @@ class JobManager:
             }
         )
 
-        response = self.context.llm_client.invoke_llm(prompt, {"page_title": page_title, "page_content": page_content}, parser)
+        # an active job without a description is not a usable answer
+        return LlmRequest(
+            'check_url_job_active', prompt, {"page_title": page_title, "page_content": page_content}, parser,
+            confidence_check=lambda response: not response.get('is_active') or bool(response.get('job_description'))
+        )
 
-        return response
+    def process_link_job(self, job_link: str, page_title: str, page_content: str, on_progress: Callable[[str, str], None] = None) -> bool:
+        """
+        Processes a crawled job posting: checks if the page is an active job, takes the job title and description
+        from it and processes the job.
+
+        :param job_link: URL of the job posting.
+        :param page_title: Title of the crawled page.
+        :param page_content: Text of the crawled page.
+        :param on_progress: Optional callback receiving the name and status of every stage, see `process_job`.
+        :return: True if the job was processed without errors, including inactive jobs.
+        :rtype: bool
+        """
+        self.context.db_client.add_job_data('url', job_link)
+        self.context.report.start_job(page_title, job_link)
 
-    def process_job(self, job_identifier: str, job_title: str, job_description: str):
+        # check if job is active
+        try:
+            url_check = self.check_url_job_active(job_link, page_title, page_content)
+        except BudgetExceededError as e:
+            logging.warning(e)
+            self.context.db_client.add_job_data('job_title', page_title)
+            self.context.db_client.insert_job()
+            return False
+
+        if not url_check.get('is_active') == True :
+            self.context.db_client.add_job_data('job_title', page_title)
+            self.context.db_client.add_job_data('status', 'inactive job')
+            self.context.db_client.insert_job()
+            self.context.write_output("\nJob is Inactive")
+            logging.info(f"Job is Inactive: {job_link}")
+            return True
+
+        return self.process_job(job_link, url_check.get('job_title'), url_check.get('job_description'), on_progress)
+
+    def process_job(self, job_identifier: str, job_title: str, job_description: str, on_progress: Callable[[str, str], None] = None):
         """
         Processes a job description, including optional filtering of job preferences and automated resume and cover letter
-        creation. The function uses the provided job manager and cover letter creator to perform these tasks. If configured,
-        the job is evaluated for compatibility with user preferences before proceeding.
+        creation. The work is expressed as a graph of stages (see `build_job_stages`) and every stage runs as soon as
+        the stages it depends on are done. If configured, the job is evaluated for compatibility with user preferences
+        before the resume is created.
 
         :param job_title: Title of the job being processed. Used for matching preferences and generating documents.
         :type job_title: str
@@ -254,104 +797,389 @@ class JobManager:
         :type job_description: str
         :param job_identifier: Job title for text files and URL for links to the job postings
         :type job_identifier: str
+        :param on_progress: Optional callback receiving the name and status of every stage as it starts and finishes.
+        :type on_progress: Callable[[str, str], None]
         :return: Returns a boolean indicating whether the  process was successful.
         :rtype: bool
 
         """
         self.context.db_client.add_job_data('job_title',job_title)
         self.context.db_client.add_job_data('job_description',job_description)
+        self.select_resume(job_title, job_description)
 
-        success = False
-        job_methods = ["get_job_req", "resume_improvements"]
-
-        if self.context.config_data.get("match_job_to_user_pref"):
-            logging.info("Matching job to user preferences")
-            job_methods.append("match_job_to_user_req")
-
-        # Run the async code
-        results = asyncio.run(self.run_async_jobs(job_title, job_description, job_methods))
-
-        # write key job requirements to the log
-        self.context.write_output('\n**Job Key Requirements:** ' + results.get('get_job_req').get('job_requirements'))
+        output_folder_name = get_output_folder_name(job_identifier)
 
-        # write keywords to the log
-        job_keywords = ', '.join(results.get('get_job_req').get('sentence_keywords'))
-        self.context.write_output('\n**Job Keywords:** ' + job_keywords)
-        self.context.db_client.add_job_data('job_keywords', job_keywords)
+        scheduler = StageScheduler(self.build_job_stages(job_title, job_description, output_folder_name), on_status=on_progress)
+        results = scheduler.run()
 
-        #print(f"Resume improvements: {results['resume_improvements']}")
+        if results.get('resume_improvements', None):
+            self.context.db_client.append_llm_text('resume_improvements', results.get('resume_improvements'))
 
-        if self.context.config_data.get("match_job_to_user_pref"):
-            response = results['match_job_to_user_req']
-            display_job_to_user_req_matching_scores(response)
-            score = response['job_to_req_match_score']
-            self.context.write_output(f" - Job match score: {score}")
-
-            self.context.db_client.add_job_data('job_match_score', response['job_to_req_match_score'])
-            self.context.db_client.append_llm_text('job_positives', response['job_positives'])
-            self.context.db_client.append_llm_text('job_negatives', response['job_negatives'])
-
-            if score < self.context.config_data.get("match_job_to_user_pref_limit", 0):
-                msg = f""" - Job match score {score} is below threshold: {self.context.config_data.get("match_job_to_user_pref_limit", 0)}"""
-                logging.info(msg)
-                self.context.write_output(msg)
-                self.context.write_output(response['job_negatives'])
-                self.context.db_client.add_job_data('status', 'job does not match profile')
+        if scheduler.statuses.get('user_pref_gate') == STAGE_DONE and not results.get('user_pref_gate'):
+            self.context.db_client.add_job_data('status', 'job does not match profile')
+            if self.matches_several_profiles():
+                self.insert_profile_jobs(results)
+            else:
                 self.context.db_client.insert_job()
+            return True # we return True for success because processing was error-free
 
-                return True # we return True for success because processing was error-free
-
-        output_folder_name = get_output_folder_name(job_identifier)
-        self.context.db_client.add_job_data('resume_tailored_dir', output_folder_name)
-
-        try:
-            success, new_resume = self.create_resume(job_title, job_description, output_folder_name, results.get('resume_improvements', None))
-            self.context.db_client.add_job_data('resume_tailored_text', new_resume)
-        except Exception as e:
-            logging.exception("Error creating resume: %s", e)
-            self.context.write_output(f" - Error creating resume. Please see logs.")
+        if 'create_resume' in results:
+            self.context.db_client.add_job_data('resume_tailored_dir', output_folder_name)
+            self.context.db_client.add_job_data('resume_tailored_text', results['create_resume'])
 
-        if results.get('resume_improvements', None):
-            self.context.db_client.append_llm_text('resume_improvements', results.get('resume_improvements'))
+        success = scheduler.statuses.get('render_resume') == STAGE_DONE
 
         if success:
             clickable_link = f"[Click here to open the directory](../{output_folder_name})"
 
             self.context.write_output(f" - CV Directory: {clickable_link}")
             self.context.db_client.add_job_data('status', 'resume created')
+        else:
+            self.context.write_output(f" - Error creating resume. Please see logs.")
+
+        if self.matches_several_profiles():
+            self.insert_profile_jobs(results)
+        else:
+            self.context.db_client.insert_job()
+        return success
+
+    def insert_profile_jobs(self, results: dict) -> None:
+        """
+        Inserts one job log entry per profile, when the job was matched to several profiles.
+
+        The entries share the job data and the tailored resume. Profiles the job does not match get the status
+        `job does not match profile` and no resume, and the LLM usage of the job is only counted in the first entry.
 
-            if self.context.config_data.get("write_cover_letter", False):
+        :param results: The stage results of the job, with the matches of `build_profile_match_stages`.
+        :return: None
+        """
+        db_client = self.context.db_client
+        shared = db_client.job_data
+        try:
+            for i, profile_filename in enumerate(self.profiles):
+                job_data = copy.deepcopy(shared)
+                if i > 0:
+                    for key in [key for key in job_data if key.startswith('llm_') and key != 'llm_text']:
+                        del job_data[key]
+                db_client.job_data = job_data
+                db_client.add_job_data('profile_filename', profile_filename)
+
+                response = results.get(self.profile_stage_name(profile_filename))
+                if response is not None:
+                    db_client.add_job_data('job_match_score', response['job_to_req_match_score'])
+                    db_client.append_llm_text('job_positives', response['job_positives'])
+                    db_client.append_llm_text('job_negatives', response['job_negatives'])
+                    if not self.passes_user_pref(response):
+                        db_client.add_job_data('status', 'job does not match profile')
+                        for key in ('resume_tailored_dir', 'resume_tailored_text'):
+                            job_data.pop(key, None)
+
+                db_client.insert_job()
+                if i == 0 and 'job_log_id' in job_data:
+                    # later usage of the job, ex: its cover letter, is added to the entry that has the totals
+                    shared['job_log_id'] = job_data['job_log_id']
+        finally:
+            db_client.job_data = shared
+
+    def build_job_stages(self, job_title: str, job_description: str, output_folder_name: str) -> list[Stage]:
+        """
+        Builds the graph of stages needed to process a single job.
 
-                cover_letter_creator = CoverLetterCreator(
-                    llm_client = self.context.llm_client,
-                    user_name = get_clean_user_name(self.context.config_data.get("name"))
+        The analysis stages run concurrently. Once the new resume exists, scoring it and rendering it
+        also run concurrently, and the cover letter is handed over to the background `cover_letters` writer.
+        In speculative mode (see `use_speculative_resume`) the resume is created alongside the analysis
+        stages, without the recommended improvements, and discarded if the job does not match the user preferences.
+        See `build_analysis_stages` for the fused analysis mode.
+
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :param output_folder_name: directory where to put the resume.
+        :return: A list of stages for the `StageScheduler`.
+        :rtype: list[Stage]
+        """
+        match_user_pref = self.context.config_data.get("match_job_to_user_pref")
+        speculative = match_user_pref and self.use_speculative_resume()
+        cluster_jobs = self.context.config_data.get("cluster_jobs", False)
+
+        def create_resume(results):
+            # a speculative resume starts before the improvements are known
+            improvements = {} if speculative else results.get('resume_improvements') or {}
+            if cluster_jobs:
+                job_keywords = results['get_job_req'].get('sentence_keywords')
+                return self.create_clustered_resume(
+                    job_title, job_description, job_keywords, improvements.get('resume_improvements'), publish=not speculative
                 )
+            return self.create_resume(job_title, job_description, improvements.get('resume_improvements'))
+
+        def match_resumes_to_job(results):
+            job_keywords = (results.get('get_job_req') or {}).get('sentence_keywords')
+            return self.match_resumes_to_job(job_title, job_description, results['create_resume'], job_keywords)
+
+        def publish_cluster_resume(results):
+            # a speculative resume is only shared with its cluster once the job passed the gate
+            self.job_clusterer.publish_resume(self.context.db_client.job_data.get('cluster_id'), results['create_resume'])
+
+        def render_resume(results):
+            resume_yaml_filename = self.save_resume(job_title, results['create_resume'])
+            return self.render_resume(resume_yaml_filename, output_folder_name)
+
+        def create_cover_letter(results):
+            # only queued, the job does not wait for its cover letter
+            job_requirements = CoverLetterCreator.job_requirements_summary(results.get('get_job_req'), job_description)
+            self.cover_letters.submit(job_title, job_requirements, results['create_resume'], output_folder_name)
+
+        several_profiles = self.matches_several_profiles()
+        # the match to several profiles is not part of the shared analysis
+        stages = self.build_analysis_stages(job_title, job_description, match_user_pref=match_user_pref and not several_profiles)
+        resume_deps = ('resume_improvements',)
+        resume_guards = ()
+        post_resume_deps = ('create_resume',)
+        # local scoring needs the job keywords
+        scoring_deps = ('get_job_req',) if self.context.config_data.get("resume_scoring", "llm") == "local" else ()
+
+        if match_user_pref:
+            if several_profiles:
+                logging.info("Matching job to %s user profiles", len(self.profiles))
+                stages += self.build_profile_match_stages(job_title, job_description)
+            else:
+                logging.info("Matching job to user preferences")
+                stages += [
+                    self._stage(
+                        'user_pref_gate',
+                        lambda results: self.check_user_pref_match(results['match_job_to_user_req']),
+                        depends_on=('match_job_to_user_req',),
+                        gate=True
+                    ),
+                ]
+            if speculative:
+                logging.info("Creating resume speculatively, before the job is matched to user preferences")
+                resume_deps = ()
+                resume_guards = ('user_pref_gate',)
+                post_resume_deps += ('user_pref_gate',)
+            else:
+                resume_deps += ('user_pref_gate',)
+
+        if cluster_jobs:
+            # the cluster of the job is found by its keywords
+            resume_deps += ('get_job_req',)
+
+        stages += [
+            self._stage('create_resume', create_resume, depends_on=resume_deps, guarded_by=resume_guards),
+            self._stage('render_resume', render_resume, depends_on=post_resume_deps),
+        ]
+        if cluster_jobs and speculative:
+            stages.append(self._stage('publish_cluster_resume', publish_cluster_resume, depends_on=post_resume_deps))
+
+        # optional stages are skipped once the LLM budget runs low, local scoring costs nothing
+        budget = self.context.llm_client.budget
+        if scoring_deps or budget.allows_stage('match_resumes_to_job'):
+            stages.append(self._stage('match_resumes_to_job', match_resumes_to_job, depends_on=post_resume_deps + scoring_deps))
+
+        if self.context.config_data.get("write_cover_letter", False) and budget.allows_stage('create_cover_letter'):
+            stages.append(self._stage('create_cover_letter', create_cover_letter, depends_on=post_resume_deps + ('get_job_req',)))
+
+        return stages
+
+    def build_profile_match_stages(self, job_title: str, job_description: str) -> list[Stage]:
+        """
+        Builds the stages matching a job to every profile of `profiles`, all running concurrently,
+        and the `user_pref_gate` that lets the job through if it matches at least one of them.
 
-                cover_letter_creator.create_cover_letter(job_title, job_description, new_resume, output_folder_name)
+        The job is crawled, analyzed and tailored only once; only the match depends on the profile.
 
-        self.context.db_client.insert_job()
-        return success
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :return: A list of stages for the `StageScheduler`.
+        :rtype: list[Stage]
+        """
+        def match_stage(profile_filename):
+            return lambda results: self.match_job_to_user_req(job_title, job_description, profile_filename)
+
+        match_stages = {profile_filename: self.profile_stage_name(profile_filename) for profile_filename in self.profiles}
+        stages = [self._stage(name, match_stage(profile_filename)) for profile_filename, name in match_stages.items()]
+
+        def gate(results):
+            return self.check_profile_matches({
+                profile_filename: results[name] for profile_filename, name in match_stages.items()
+            })
+
+        stages.append(self._stage('user_pref_gate', gate, depends_on=tuple(match_stages.values()), gate=True))
+        return stages
 
-    async def run_async_jobs(self, job_title: str, job_description: str, job_methods: list[str]):
+    @staticmethod
+    def profile_stage_name(profile_filename: str) -> str:
+        """Name of the stage matching a job to one of several profiles."""
+        return f"match_job_to_user_req:{profile_filename}"
+
+    def build_analysis_stages(self, job_title: str, job_description: str, match_user_pref: bool = None) -> list[Stage]:
         """
-        Executes asynchronous jobs using specified methods from the job manager based on
-        given job details.
+        Builds the stages producing the `get_job_req`, `resume_improvements` and, if enabled,
+        `match_job_to_user_req` results.
 
-        :param job_title: The title of the job.
-        :type job_title: str
-        :param job_description: The description of the job.
-        :type job_description: str
-        :param job_methods: A list of method names that define the actions
-            to be performed for the job.
-        :type job_methods: list[str]
-        :return: A dictionary with method names as keys and their respective
-            execution results as values.
-        :rtype: dict[str, Any]
+        `analysis_mode` in the config selects how they are produced:
+        - `split` (default): three separate LLM requests running concurrently.
+        - `fused`: a single `analyze_job` request, which sends the job description only once.
+        - `compare`: both, the split results are used and the fused ones are compared to them and logged.
+
+        :param job_title: Title of the job.
+        :param job_description: The job description text.
+        :param match_user_pref: Include the match to the user profile, default is `match_job_to_user_pref` of the config.
+        :return: A list of stages for the `StageScheduler`.
+        :rtype: list[Stage]
+        """
+        if match_user_pref is None:
+            match_user_pref = self.context.config_data.get("match_job_to_user_pref")
+        analysis_mode = self.context.config_data.get("analysis_mode", "split")
+        analysis_methods = ['get_job_req', 'resume_improvements']
+        if match_user_pref:
+            analysis_methods.append('match_job_to_user_req')
+
+        def record(method_name, response):
+            if method_name == 'get_job_req':
+                self.record_job_req(response)
+            return response
+
+        def split_stage(method_name):
+            return lambda results: record(method_name, self.split_analysis(results['analyze_job'])[method_name])
+
+        def method_stage(method_name):
+            return lambda results: record(method_name, getattr(self, method_name)(job_title, job_description))
+
+        if analysis_mode == "fused":
+            stages = [self._stage('analyze_job', lambda results: self.analyze_job(job_title, job_description, match_user_pref))]
+            return stages + [
+                self._stage(method_name, split_stage(method_name), depends_on=('analyze_job',))
+                for method_name in analysis_methods
+            ]
+
+        stages = [self._stage(method_name, method_stage(method_name)) for method_name in analysis_methods]
+
+        if analysis_mode == "compare":
+            def compare(results):
+                split = {method_name: results[method_name] for method_name in analysis_methods}
+                return self.compare_analysis(split, self.split_analysis(results['analyze_job']))
+
+            stages += [
+                self._stage('analyze_job', lambda results: self.analyze_job(job_title, job_description, match_user_pref)),
+                self._stage('compare_analysis', compare, depends_on=tuple(analysis_methods) + ('analyze_job',)),
+            ]
+
+        return stages
+
+    def _stage(
+            self,
+            name: str,
+            func,
+            depends_on: tuple[str, ...] = (),
+            gate: bool = False,
+            guarded_by: tuple[str, ...] = ()
+    ) -> Stage:
+        """
+        Creates a stage with the timeout configured for it in `stage_timeouts` of the config.
+        """
+        # the profile match stages share the timeout of `match_job_to_user_req`
+        timeout = self.context.config_data.get("stage_timeouts", {}).get(name.split(':')[0])
+        return Stage(name=name, func=func, depends_on=depends_on, timeout=timeout, gate=gate, guarded_by=guarded_by)
+
+    def use_speculative_resume(self) -> bool:
+        """
+        Decides if the resume should be created speculatively, in parallel with the user preferences match.
+
+        `speculative_resume` in the config can be `true`, `false` or `"auto"`. In auto mode, the resume is created
+        speculatively when the share of past jobs that passed `match_job_to_user_pref_limit` for the current profile
+        is at least `speculative_min_acceptance_rate` (0.7 by default). Speculation wastes one resume generation
+        for every rejected job, so it only pays off when most jobs pass.
+
+        :return: True if the resume should be created speculatively.
+        :rtype: bool
+        """
+        setting = self.context.config_data.get("speculative_resume", False)
+        if setting != "auto":
+            return bool(setting)
+
+        acceptance_rate = self.context.db_client.get_acceptance_rate(
+            self.context.config_data.get("match_job_to_user_pref_limit", 0),
+            min_jobs=self.context.config_data.get("speculative_min_history", 20)
+        )
+        if acceptance_rate is None:
+            return False
+
+        logging.debug("Historical job acceptance rate: %.2f", acceptance_rate)
+        return acceptance_rate >= self.context.config_data.get("speculative_min_acceptance_rate", 0.7)
+
+    def record_job_req(self, response: dict) -> None:
+        """
+        Writes the key job requirements and keywords to the run log and the job data.
+
+        :param response: The response of `get_job_req`.
+        :return: None
+        """
+        # write key job requirements to the log
+        self.context.write_output('\n**Job Key Requirements:** ' + response.get('job_requirements'))
+
+        # write keywords to the log
+        job_keywords = ', '.join(response.get('sentence_keywords'))
+        self.context.write_output('\n**Job Keywords:** ' + job_keywords)
+        self.context.db_client.add_job_data('job_keywords', job_keywords)
+
+    def check_user_pref_match(self, response: dict) -> bool:
+        """
+        Records the job to user preferences match and checks it against `match_job_to_user_pref_limit`.
+
+        :param response: The response of `match_job_to_user_req`.
+        :return: True if the job matches the user preferences well enough to create a resume.
+        :rtype: bool
+        """
+        display_job_to_user_req_matching_scores(response)
+        score = response['job_to_req_match_score']
+        self.context.write_output(f" - Job match score: {score}")
+
+        self.context.db_client.add_job_data('job_match_score', response['job_to_req_match_score'])
+        self.context.db_client.append_llm_text('job_positives', response['job_positives'])
+        self.context.db_client.append_llm_text('job_negatives', response['job_negatives'])
+
+        if not self.passes_user_pref(response):
+            msg = f""" - Job match score {score} is below threshold: {self.context.config_data.get("match_job_to_user_pref_limit", 0)}"""
+            logging.info(msg)
+            self.context.write_output(msg)
+            self.context.write_output(response['job_negatives'])
+            return False
+
+        return True
+
+    def check_profile_matches(self, responses: dict[str, dict]) -> bool:
+        """
+        Writes the match of a job to each of several profiles to the run log.
+        The matches are stored per profile by `insert_profile_jobs`.
+
+        :param responses: The responses of `match_job_to_user_req` by profile file name.
+        :return: True if the job matches at least one profile well enough to create a resume.
+        :rtype: bool
         """
-        async def run_job(method_name: str):
-            result = await asyncio.to_thread(getattr(self, method_name), job_title, job_description)
-            return {method_name: result}
+        limit = self.context.config_data.get("match_job_to_user_pref_limit", 0)
+        matched = []
+        for profile_filename, response in responses.items():
+            display_job_to_user_req_matching_scores(response)
+            score = response['job_to_req_match_score']
+            if self.passes_user_pref(response):
+                matched.append(profile_filename)
+                self.context.write_output(f" - Job match score for {profile_filename}: {score}")
+            else:
+                self.context.write_output(f" - Job match score for {profile_filename}: {score} is below threshold: {limit}")
+
+        if not matched:
+            logging.info("Job does not match any of the %s profiles", len(responses))
+            return False
 
-        results = await asyncio.gather(*(run_job(method) for method in job_methods))
+        self.context.write_output(f" - Creating resume for: {', '.join(matched)}")
+        return True
 
-        return {k: v for d in results for k, v in d.items()}
\ No newline at end of file
+    def passes_user_pref(self, response: dict) -> bool:
+        """
+        Checks the job to user preferences match score against `match_job_to_user_pref_limit`.
+
+        :param response: The response of `match_job_to_user_req`.
+        :return: True if the score is at or above the limit.
+        :rtype: bool
+        """
+        return response['job_to_req_match_score'] >= self.context.config_data.get("match_job_to_user_pref_limit", 0)
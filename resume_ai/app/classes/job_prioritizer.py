@@ -0,0 +1,158 @@
+import json
+import time
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from resume_ai.app.classes.job_clusterer import JobClusterer
+from resume_ai.app.classes.keyword_scorer import KeywordScorer
+
+
+class JobPrioritizer:
+    """
+    Ranks pending jobs by a cheap pre-score, so the most promising jobs are processed first
+    when a run is limited by time or budget.
+
+    The pre-score is a weighted sum of:
+    - profile: cosine similarity of the hashed words of the job and of the user profile and resume,
+    - recency: halves every `recency_half_life_days` since the job was added (file time, or first seen for links),
+    - source: weight of the site the job was found on, from `source_weights`, ex: `{"linkedin.com": 1.0}`.
+
+    The ranking is stored in `queue_file`, so an interrupted run continues in the same order
+    and a job keeps its score until it is processed. Processed jobs are written to it at most every
+    `save_interval` seconds and when the run ends; jobs that were processed but not yet written are dropped
+    by the next `rank` anyway, as they are not pending anymore.
+    """
+
+    DEFAULT_WEIGHTS = {"profile": 0.6, "recency": 0.25, "source": 0.15}
+
+    def __init__(
+            self,
+            profile,
+            queue_file: Path,
+            weights: Optional[dict] = None,
+            source_weights: Optional[dict] = None,
+            recency_half_life_days: float = 7,
+            save_interval: float = 10
+    ) -> None:
+        """
+        :param profile: The user profile and current resume, as text or dicts.
+        :param queue_file: JSON file where the ranking is stored.
+        :param weights: Weights of the `profile`, `recency` and `source` scores.
+        :param source_weights: Weight per domain. Files and unlisted domains get `default`, or 0.5.
+        :param recency_half_life_days: Number of days after which the recency score of a job halves.
+        :param save_interval: Minimum number of seconds between two writes of the queue for processed jobs.
+        """
+        self.profile_vector = JobClusterer.vectorize(KeywordScorer.resume_to_text(profile), [])
+        self.queue_file = Path(queue_file)
+        self.weights = weights or self.DEFAULT_WEIGHTS
+        self.source_weights = source_weights or {}
+        self.recency_half_life_days = recency_half_life_days
+        self.save_interval = save_interval
+        self.queue = self._load()
+        self._unsaved = False
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _load(self) -> dict:
+        if not self.queue_file.exists():
+            return {}
+        try:
+            with open(self.queue_file) as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning("Could not read job queue %s, ranking all jobs again: %s", self.queue_file, e)
+            return {}
+
+    def _save(self) -> None:
+        self.queue_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.queue_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.queue, f, indent=2)
+        tmp_file.replace(self.queue_file)
+        self._unsaved = False
+        self._last_save = time.monotonic()
+
+    def source_weight(self, source: Optional[str]) -> float:
+        """Returns the weight of the site a job URL belongs to."""
+        default = self.source_weights.get("default", 0.5)
+        domain = urlparse(source).netloc.lower() if source else ""
+        if not domain:
+            return default
+        for site, weight in self.source_weights.items():
+            if domain == site or domain.endswith("." + site):
+                return weight
+        return default
+
+    def pre_score(self, text: str, source: Optional[str], added_ts: float) -> dict:
+        """
+        Scores a single job.
+
+        :param text: Title and description of the job.
+        :param source: URL of the job, or None for job files.
+        :param added_ts: Unix time the job was added.
+        :return: Dictionary with the total `score` and its parts.
+        :rtype: dict
+        """
+        age_days = max(0.0, time.time() - added_ts) / 86400
+        components = {
+            "profile": float(JobClusterer.vectorize(text, []) @ self.profile_vector),
+            "recency": 0.5 ** (age_days / self.recency_half_life_days),
+            "source": self.source_weight(source),
+        }
+        total_weight = sum(self.weights.get(name, 0) for name in components) or 1
+        score = sum(self.weights.get(name, 0) * value for name, value in components.items()) / total_weight
+        return {"score": round(score, 4), **{name: round(value, 4) for name, value in components.items()}}
+
+    def rank(self, mode: str, jobs: dict[str, dict]) -> list[str]:
+        """
+        Ranks pending jobs best first. Jobs that were ranked in an earlier run keep their score,
+        new jobs are scored and added, and jobs that are not pending anymore are removed from the queue.
+
+        :param mode: `files` or `links`, each mode has its own queue.
+        :param jobs: Dictionary with the job ids (file names or URLs) as keys and dictionaries with the
+            job `text` and, optionally, `source` URL and `added_ts` as values. `text` can also be a function
+            returning the text, so only jobs that were not ranked before are read.
+        :return: The job ids in the order they should be processed.
+        :rtype: list[str]
+        """
+        queue = {job_id: entry for job_id, entry in self.queue.get(mode, {}).items() if job_id in jobs}
+        now = time.time()
+
+        for job_id, job in jobs.items():
+            if job_id in queue:
+                continue
+            added_ts = job.get("added_ts") or now
+            text = job["text"]() if callable(job["text"]) else job["text"]
+            queue[job_id] = {"added_ts": added_ts, **self.pre_score(text, job.get("source"), added_ts)}
+
+        with self._lock:
+            self.queue[mode] = queue
+            self._save()
+
+        ranking = sorted(queue, key=lambda job_id: queue[job_id]["score"], reverse=True)
+        logging.info("Processing %s jobs by priority, best match: %s", len(ranking), ranking[0] if ranking else None)
+        return ranking
+
+    def mark_done(self, mode: str, job_id: str) -> None:
+        """
+        Removes a processed job from the queue. The queue file is only rewritten every `save_interval` seconds.
+        """
+        with self._lock:
+            if self.queue.get(mode, {}).pop(job_id, None) is None:
+                return
+            self._unsaved = True
+            if time.monotonic() - self._last_save >= self.save_interval:
+                self._save()
+
+    def flush(self) -> None:
+        """
+        Writes the processed jobs that are not in the queue file yet.
+        """
+        with self._lock:
+            if self._unsaved:
+                self._save()
@@ -0,0 +1,95 @@
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class JobWatcher:
+    """
+    Watches job directories and files and calls back whenever their content changes.
+
+    Changes are detected by comparing the names, sizes and modification times of the watched files.
+    If watchdog is installed, file system events (inotify on Linux) trigger the comparison right away,
+    otherwise it runs every `poll_interval` seconds.
+    """
+
+    def __init__(self, paths: list[Path], poll_interval: float = 5, debounce: float = 1) -> None:
+        """
+        :param paths: Directories (their top level files are watched) and files to watch.
+        :param poll_interval: Maximum number of seconds between two checks for changes.
+        :param debounce: Number of seconds to wait after a change, so files being written are complete.
+        """
+        self.paths = [Path(path) for path in paths]
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._changed = threading.Event()
+        self._observer = None
+
+    def snapshot(self) -> dict:
+        """Returns the size and modification time of every watched file."""
+        files = {}
+        for path in self.paths:
+            if path.is_dir():
+                candidates = [Path(entry.path) for entry in os.scandir(path) if entry.is_file()]
+            elif path.exists():
+                candidates = [path]
+            else:
+                continue
+            for candidate in candidates:
+                try:
+                    stat = candidate.stat()
+                except FileNotFoundError:
+                    # moved while scanning
+                    continue
+                files[str(candidate)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _start_observer(self) -> None:
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logging.info("watchdog is not installed, checking for new jobs every %s seconds.", self.poll_interval)
+            return
+
+        changed = self._changed
+
+        class ChangeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                changed.set()
+
+        self._observer = Observer()
+        for directory in {path if path.is_dir() else path.parent for path in self.paths}:
+            self._observer.schedule(ChangeHandler(), str(directory), recursive=False)
+        self._observer.start()
+
+    def run(self, callback: Callable[[], None], stop: Optional[threading.Event] = None) -> None:
+        """
+        Calls back once at the start and then after every change, until `stop` is set.
+
+        :param callback: Function that processes the new jobs.
+        :param stop: Optional event to stop watching.
+        """
+        stop = stop or threading.Event()
+        self._start_observer()
+        last = None
+
+        try:
+            while not stop.is_set():
+                current = self.snapshot()
+                if current != last:
+                    if last is not None:
+                        time.sleep(self.debounce)
+                    callback()
+                    # processing moves jobs, which is not a new change
+                    last = self.snapshot()
+                    continue
+
+                self._changed.wait(self.poll_interval)
+                self._changed.clear()
+        finally:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer.join()
@@ -0,0 +1,149 @@
+import re
+import logging
+from typing import Optional
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+
+class KeywordScorer:
+    """
+    Scores how well resumes match a job locally, without an LLM call.
+
+    The score combines:
+    - keyword coverage: the share of each job keyword/phrase found in the resume, averaged over all keywords,
+    - BM25: the relevance of the resume for the job keywords used as a query, normalized to 0..1,
+    - optional embeddings: the cosine similarity of local sentence embeddings of the keywords and the resume.
+    """
+
+    def __init__(self, weights: Optional[dict] = None, embeddings_model: Optional[str] = None) -> None:
+        """
+        :param weights: Weights of the `coverage`, `bm25` and `embeddings` scores.
+        :param embeddings_model: Name of a sentence-transformers model for the embeddings score.
+            Embeddings are only used if the model is set and sentence-transformers is installed.
+        """
+        self.weights = weights or {"coverage": 0.6, "bm25": 0.4, "embeddings": 0.0}
+        self.embedder = None
+
+        if embeddings_model:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self.embedder = SentenceTransformer(embeddings_model)
+            except ImportError:
+                logging.warning("sentence-transformers is not installed, scoring resumes without embeddings.")
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """Splits text into lowercase word tokens, keeping terms like `c++`, `c#` or `node.js` intact."""
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @classmethod
+    def resume_to_text(cls, resume) -> str:
+        """Flattens a resume dict (or list) into plain text. Strings are returned unchanged."""
+        if isinstance(resume, dict):
+            return " ".join(cls.resume_to_text(v) for v in resume.values())
+        if isinstance(resume, list):
+            return " ".join(cls.resume_to_text(v) for v in resume)
+        return "" if resume is None else str(resume)
+
+    def score(self, keywords: list[str], resumes: list) -> dict:
+        """
+        Scores resumes against job keywords.
+
+        :param keywords: Keywords and key sentences of the job (`sentence_keywords` of `get_job_req`).
+        :param resumes: Resumes as text or dicts.
+        :return: A dictionary with a list of `scores` (one per resume), the score components and,
+            per resume, the keywords that are not covered at all.
+        :rtype: dict
+        """
+        keyword_tokens = [self.tokenize(k) for k in keywords]
+        keyword_tokens = [tokens for tokens in keyword_tokens if tokens]
+        resume_tokens = [self.tokenize(self.resume_to_text(resume)) for resume in resumes]
+
+        if not keyword_tokens:
+            return {"scores": [0.0] * len(resumes), "coverage": [0.0] * len(resumes), "bm25": [0.0] * len(resumes), "missing": [[] for _ in resumes]}
+
+        vocab = {term: i for i, term in enumerate(sorted({t for tokens in keyword_tokens for t in tokens}))}
+
+        # keyword x term matrix, each row sums to 1
+        keyword_matrix = np.zeros((len(keyword_tokens), len(vocab)))
+        for row, tokens in enumerate(keyword_tokens):
+            for token in tokens:
+                keyword_matrix[row, vocab[token]] = 1
+        keyword_matrix /= keyword_matrix.sum(axis=1, keepdims=True)
+
+        # resume x term counts
+        counts = np.zeros((len(resumes), len(vocab)))
+        for row, tokens in enumerate(resume_tokens):
+            for token in tokens:
+                if token in vocab:
+                    counts[row, vocab[token]] += 1
+
+        # coverage of each keyword by each resume
+        keyword_coverage = (counts > 0).astype(float) @ keyword_matrix.T
+        coverage = keyword_coverage.mean(axis=1)
+        bm25 = self._bm25(counts, np.array([len(tokens) for tokens in resume_tokens], dtype=float))
+
+        components = {"coverage": coverage, "bm25": bm25}
+        if self.embedder is not None and self.weights.get("embeddings", 0) > 0:
+            components["embeddings"] = self._embeddings_similarity(keywords, resumes)
+
+        total_weight = sum(self.weights.get(name, 0) for name in components) or 1
+        scores = sum(self.weights.get(name, 0) * values for name, values in components.items()) / total_weight
+
+        original_keywords = [k for k in keywords if self.tokenize(k)]
+        return {
+            "scores": [round(float(s), 3) for s in scores],
+            **{name: [round(float(v), 3) for v in values] for name, values in components.items()},
+            "missing": [
+                [original_keywords[i] for i in np.flatnonzero(row == 0)] for row in keyword_coverage
+            ],
+        }
+
+    @staticmethod
+    def _bm25(counts: np.ndarray, lengths: np.ndarray, k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+        """
+        BM25 of every resume for the keyword terms as a query, divided by its upper bound so it lies in 0..1.
+        """
+        avg_length = lengths.mean() if lengths.mean() > 0 else 1
+        n_docs = counts.shape[0]
+        doc_freq = (counts > 0).sum(axis=0)
+
+        # idf + 1 keeps terms present in every resume from scoring zero
+        idf = np.log((n_docs - doc_freq + 0.5) / (doc_freq + 0.5) + 1) + 1
+        norm = k1 * (1 - b + b * lengths[:, None] / avg_length)
+        bm25 = (idf * counts * (k1 + 1) / (counts + norm)).sum(axis=1)
+
+        return bm25 / (idf * (k1 + 1)).sum()
+
+    def _embeddings_similarity(self, keywords: list[str], resumes: list) -> np.ndarray:
+        """Cosine similarity of the embeddings of the keywords and of each resume."""
+        texts = ["; ".join(keywords)] + [self.resume_to_text(resume) for resume in resumes]
+        vectors = np.asarray(self.embedder.encode(texts, normalize_embeddings=True))
+        return np.clip(vectors[1:] @ vectors[0], 0, 1)
+
+    def match_resumes(self, keywords: list[str], current_resume, new_resume) -> dict:
+        """
+        Scores the current and the new resume in the same format as the LLM resume match.
+
+        :param keywords: Keywords and key sentences of the job.
+        :param current_resume: The current resume as text or dict.
+        :param new_resume: The new resume as dict.
+        :return: Dictionary with `old_resume_match_score`, `new_resume_match_score` and `description`.
+        :rtype: dict
+        """
+        result = self.score(keywords, [current_resume, new_resume])
+        components = ", ".join(
+            f"{name} {result[name][0]:.2f} -> {result[name][1]:.2f}"
+            for name in ("coverage", "bm25", "embeddings") if name in result
+        )
+        description = f"Local keyword scoring ({components})."
+        if result["missing"][1]:
+            description += f" Keywords missing in the new resume: {', '.join(result['missing'][1])}."
+
+        return {
+            "old_resume_match_score": result["scores"][0],
+            "new_resume_match_score": result["scores"][1],
+            "description": description,
+        }
@@ -0,0 +1,119 @@
+import os
+import time
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+
+from resume_ai.app.classes.job_manager import JobManager
+from resume_ai.app.classes.work_queue import BaseWorkQueue, WorkItem
+
+
+class QueueWorker:
+    """
+    Processes jobs from a shared work queue until it is empty. Any number of workers can run at once,
+    in several processes or on several machines, each claiming one job at a time. Results are written
+    to the job log like in a regular run.
+    """
+
+    def __init__(
+            self,
+            job_mgr: JobManager,
+            queue: BaseWorkQueue,
+            lease_seconds: float = 900,
+            poll_interval: float = 10,
+            exit_when_empty: bool = True
+    ) -> None:
+        """
+        :param job_mgr: Job manager that processes the claimed jobs.
+        :param queue: The shared work queue.
+        :param lease_seconds: How long a claimed job stays reserved without a heartbeat.
+        :param poll_interval: Number of seconds to wait for new jobs when the queue is empty.
+        :param exit_when_empty: Stop once the queue is empty, instead of waiting for new jobs.
+        """
+        self.job_mgr = job_mgr
+        self.context = job_mgr.context
+        self.queue = queue
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.exit_when_empty = exit_when_empty
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    def run(self) -> int:
+        """
+        Claims and processes jobs until the queue is empty or the LLM budget is used up.
+
+        :return: Number of jobs processed successfully.
+        :rtype: int
+        """
+        logging.info("Worker %s started.", self.worker_id)
+        processed = 0
+
+        while not self.context.llm_client.budget.is_exhausted():
+            item = self.queue.claim(self.worker_id, self.lease_seconds)
+            if item is None:
+                if self.exit_when_empty:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            logging.info("Worker %s processing %s (attempt %s).", self.worker_id, item.job_key, item.attempts)
+            try:
+                with self.heartbeat(item):
+                    success = self.process(item)
+            except Exception as e:
+                logging.error("Job %s failed: %s", item.job_key, e)
+                self.queue.fail(item.id, self.worker_id, str(e))
+                continue
+
+            if success:
+                self.queue.complete(item.id, self.worker_id)
+                processed += 1
+            else:
+                self.queue.fail(item.id, self.worker_id, "job processing failed")
+
+        logging.info("Worker %s stopped after %s jobs. Queue: %s", self.worker_id, processed, self.queue.counts())
+        return processed
+
+    @contextmanager
+    def heartbeat(self, item: WorkItem):
+        """
+        Extends the lease of a job in the background while it is being processed.
+        """
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(item.id, self.worker_id, self.lease_seconds):
+                    logging.warning("Worker %s lost the lease of %s.", self.worker_id, item.job_key)
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def process(self, item: WorkItem) -> bool:
+        """
+        Processes a single claimed job.
+        """
+        self.context.db_client.clear_job_data()
+        self.context.llm_client.budget.start_job()
+
+        try:
+            if item.mode == "files":
+                self.context.report.start_job(item.title)
+                return self.job_mgr.process_job(item.title, item.title, item.payload)
+
+            from resume_ai.app.classes.url_crawler import URLCrawler
+            docs = URLCrawler(self.context.llm_client, self.context.config_data).crawl_urls([item.job_key])
+            if not docs:
+                raise RuntimeError(f"Could not crawl {item.job_key}")
+
+            job_title = docs[0].metadata.get("title", "No Title Found")
+            return self.job_mgr.process_link_job(item.job_key, job_title, docs[0].page_content)
+        finally:
+            self.context.report.end_job(self.context.db_client.job_data.get("status"))
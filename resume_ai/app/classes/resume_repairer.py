@@ -0,0 +1,246 @@
+import re
+import copy
+import logging
+from datetime import datetime
+from typing import Optional
+
+# Third-party imports
+from langchain_core.output_parsers import JsonOutputParser
+from langchain.prompts import PromptTemplate
+
+# Local imports
+from resume_ai.app.clients.base_llm_client import BaseLlm, LlmRequest
+from resume_ai.app.prompts import REPAIR_RESUME_FRAGMENT_PROMPT
+from resume_ai.app.funcs import clean_empty
+from resume_ai.app.models import CVRoot
+
+DATE_FIELDS = ("start_date", "end_date", "date")
+PRESENT_WORDS = ("present", "current", "now", "today", "ongoing")
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m", "%Y/%m", "%m/%Y", "%m-%Y", "%b %Y", "%B %Y", "%b. %Y", "%Y")
+# Control characters break the typst output of rendercv
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+PHONE_PATTERN = re.compile(r"^\+?[0-9 ()\-.]{7,}$")
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class ResumeRepairer:
+    """
+    Validates a generated CV against the rendercv schema and repairs it, so a render failure does not
+    cost a full regeneration of the resume.
+
+    Repairs are done in order of cost:
+    1. deterministic local fixes of common issues (dates, empty fields, wrong types, control characters),
+    2. a small LLM prompt per invalid fragment, with only that fragment and its validation errors,
+    3. dropping fragments that are still invalid.
+    """
+
+    def __init__(self, llm_client: BaseLlm, example_yaml: dict, max_attempts: int = 2) -> None:
+        """
+        :param llm_client: LLM client for the targeted repair prompts.
+        :param example_yaml: The rendercv YAML template. Its design settings are validated together with the CV.
+        :param max_attempts: Maximum number of LLM repair rounds.
+        """
+        self.llm_client = llm_client
+        self.example_yaml = example_yaml
+        self.max_attempts = max_attempts
+
+    def repair(self, cv: dict) -> dict:
+        """
+        Returns a valid version of the CV.
+
+        :param cv: The generated `cv` dict.
+        :return: The repaired `cv` dict.
+        :rtype: dict
+        """
+        cv = self.fix_locally(cv)
+        errors = self.validate(cv)
+
+        attempt = 0
+        while errors and attempt < self.max_attempts:
+            attempt += 1
+            logging.info("Repairing %s invalid resume fragment(s), attempt %s.", len(errors), attempt)
+            for path, messages in errors.items():
+                cv = self.repair_fragment(cv, path, messages)
+            cv = self.fix_locally(cv)
+            errors = self.validate(cv)
+
+        # highest indices first, so dropping an entry does not shift the others
+        for path in sorted(errors, reverse=True):
+            logging.warning("Dropping invalid resume fragment %s: %s", path, errors[path])
+            cv = self._drop(cv, path)
+
+        return cv
+
+    def fix_locally(self, cv: dict) -> dict:
+        """
+        Fixes common issues of generated CVs without an LLM call.
+        """
+        cv = self._fix_value(copy.deepcopy(cv), None)
+
+        for field_name, pattern in (("phone", PHONE_PATTERN), ("email", EMAIL_PATTERN)):
+            value = cv.get(field_name)
+            if value is not None and not pattern.match(str(value)):
+                logging.info("Removing invalid %s from resume: %s", field_name, value)
+                cv.pop(field_name)
+
+        sections = cv.get("sections")
+        if isinstance(sections, dict):
+            for name, section in sections.items():
+                # rendercv sections are lists of entries
+                if isinstance(section, (str, dict)):
+                    sections[name] = [section]
+
+        # LLM has a tendency to add empty items, like `extracurricular_activities: []`. We should remove them as rendercv throws an error.
+        return clean_empty(cv)
+
+    def _fix_value(self, value, key: Optional[str]):
+        if isinstance(value, dict):
+            return {k: self._fix_value(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._fix_value(v, None) for v in value]
+        if isinstance(value, str):
+            value = CONTROL_CHARS.sub("", value).replace("\t", " ").strip()
+            if key in DATE_FIELDS:
+                return self.normalize_date(value)
+            if key == "highlights":
+                # a single highlight given as a string
+                return [line.strip(" -•*") for line in value.splitlines() if line.strip(" -•*")]
+            return value
+        if key in DATE_FIELDS and isinstance(value, int):
+            return str(value)
+        return value
+
+    @staticmethod
+    def normalize_date(value: str) -> Optional[str]:
+        """
+        Converts a date into a format rendercv accepts: YYYY-MM-DD, YYYY-MM, YYYY or `present`.
+        Values that are not dates are returned unchanged.
+        """
+        if not value:
+            return None
+        if value.lower() in PRESENT_WORDS:
+            return "present"
+
+        for date_format in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            if date_format == "%Y":
+                return parsed.strftime("%Y")
+            if date_format == "%Y-%m-%d":
+                return parsed.strftime("%Y-%m-%d")
+            return parsed.strftime("%Y-%m")
+
+        return value
+
+    def validate(self, cv: dict) -> dict[tuple, list[str]]:
+        """
+        Validates a CV with the rendercv data model, or with `CVRoot` if rendercv is not importable.
+
+        :return: A dictionary with the paths of the invalid fragments as keys and their error messages as values.
+        """
+        try:
+            from rendercv.data import validate_input_dictionary_and_return_the_data_model
+
+            def validate_model(document):
+                validate_input_dictionary_and_return_the_data_model(document)
+        except ImportError:
+            def validate_model(document):
+                CVRoot.model_validate({"cv": document["cv"]})
+
+        document = {**self.example_yaml, "cv": cv}
+        try:
+            validate_model(document)
+            return {}
+        except Exception as e:
+            if not hasattr(e, "errors"):
+                logging.error("Resume validation failed: %s", e)
+                return {}
+
+            errors = {}
+            for error in e.errors():
+                path = self._fragment_path(cv, tuple(error.get("loc", ())))
+                if path:
+                    errors.setdefault(path, []).append(error.get("msg", ""))
+            return errors
+
+    @staticmethod
+    def _fragment_path(cv: dict, loc: tuple) -> tuple:
+        """
+        Finds the fragment of the CV an error belongs to: an entry of a section, or a top level field.
+        """
+        if loc and loc[0] == "cv":
+            loc = loc[1:]
+
+        path = []
+        node = cv
+        for part in loc:
+            if isinstance(node, dict) and part in node:
+                node = node[part]
+            elif isinstance(node, list) and isinstance(part, int) and part < len(node):
+                node = node[part]
+            else:
+                # union type names and other schema parts in the location
+                continue
+            path.append(part)
+
+        if path and path[0] == "sections":
+            # never the whole sections dict, at most a whole section
+            return tuple(path[:3]) if len(path) > 1 else ()
+        return tuple(path[:1])
+
+    def repair_fragment(self, cv: dict, path: tuple, messages: list[str]) -> dict:
+        """
+        Asks the LLM to fix a single invalid fragment of the CV and puts the fixed fragment back.
+        """
+        fragment = self._get(cv, path)
+        request = self.repair_fragment_request(path, fragment, messages)
+        try:
+            fixed = self.llm_client.invoke_request(request)
+        except Exception as e:
+            logging.error("Could not repair resume fragment %s: %s", path, e)
+            return cv
+
+        if isinstance(fixed, dict) and "fragment" in fixed:
+            cv = copy.deepcopy(cv)
+            self._set(cv, path, fixed["fragment"])
+        return cv
+
+    @staticmethod
+    def repair_fragment_request(path: tuple, fragment, messages: list[str]) -> LlmRequest:
+        """
+        Builds the LLM request for a fragment repair.
+        """
+        parser = JsonOutputParser()
+        prompt = PromptTemplate(
+            template=REPAIR_RESUME_FRAGMENT_PROMPT,
+            input_variables=[],
+            partial_variables={
+                "path": ".".join(str(p) for p in path),
+                "fragment": fragment,
+                "errors": "\n".join(f"- {message}" for message in messages),
+            },
+        )
+        return LlmRequest('repair_resume', prompt, {}, parser)
+
+    @staticmethod
+    def _get(cv: dict, path: tuple):
+        node = cv
+        for part in path:
+            node = node[part]
+        return node
+
+    @classmethod
+    def _set(cls, cv: dict, path: tuple, value) -> None:
+        cls._get(cv, path[:-1])[path[-1]] = value
+
+    @classmethod
+    def _drop(cls, cv: dict, path: tuple) -> dict:
+        cv = copy.deepcopy(cv)
+        try:
+            parent = cls._get(cv, path[:-1])
+            del parent[path[-1]]
+        except (KeyError, IndexError, TypeError):
+            pass
+        return clean_empty(cv)
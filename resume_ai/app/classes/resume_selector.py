@@ -0,0 +1,192 @@
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from resume_ai.app.funcs import load_pdf
+from resume_ai.app.classes.job_clusterer import VECTOR_SIZE
+from resume_ai.app.classes.keyword_scorer import KeywordScorer
+
+# Files of the resumes directory that are indexed
+RESUME_SUFFIXES = (".pdf", ".txt", ".md")
+
+
+@dataclass
+class IndexedResume:
+    """A resume of the resumes directory with its extracted text."""
+    filename: str
+    text: str
+    # similarity to the job it was selected for
+    similarity: float = 0.0
+
+
+class ResumeSelector:
+    """
+    Picks the best base resume for each job among all resumes in the resumes directory.
+
+    Every resume is indexed once: its text is extracted and turned into a hashed bag-of-words vector, both cached in
+    `index_dir` and only rebuilt when the file changes. Jobs are compared to the resumes by the cosine similarity
+    of TF-IDF weighted vectors, so the words that set the resumes apart count the most. The default resume
+    is kept unless another one is more similar to the job by at least `margin`.
+    """
+
+    def __init__(self, resumes_dir: Path, index_dir: Path, default_filename: str, margin: float = 0.02) -> None:
+        """
+        :param resumes_dir: Directory of the resumes.
+        :param index_dir: Directory of the cached texts and vectors.
+        :param default_filename: File name of the resume used when no other resume is clearly better.
+        :param margin: How much more similar to the job another resume must be to replace the default one.
+        """
+        self.resumes_dir = Path(resumes_dir)
+        self.index_file = Path(index_dir) / "resume_index.json"
+        self.vectors_file = Path(index_dir) / "resume_vectors.npz"
+        self.default_filename = default_filename
+        self.margin = margin
+        self.resumes: list[IndexedResume] = []
+        self._idf = np.ones(VECTOR_SIZE)
+        self._matrix = np.zeros((0, VECTOR_SIZE))
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @staticmethod
+    def term_vector(text: str) -> np.ndarray:
+        """
+        Turns a text into a hashed bag-of-words vector of sublinear term frequencies.
+        """
+        vector = np.zeros(VECTOR_SIZE)
+        for token in KeywordScorer.tokenize(text):
+            vector[zlib.crc32(token.encode("utf-8")) % VECTOR_SIZE] += 1
+        nonzero = vector > 0
+        vector[nonzero] = 1 + np.log(vector[nonzero])
+        return vector
+
+    @staticmethod
+    def extract_text(path: Path) -> Optional[str]:
+        """
+        Extracts the text of a PDF, text or markdown resume.
+
+        :return: The text, None if the file cannot be read.
+        """
+        if path.suffix.lower() == ".pdf":
+            return load_pdf(path)
+        try:
+            return path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logging.debug("Could not read resume %s: %s", path, e)
+            return None
+
+    def _load_index(self) -> tuple[dict, dict]:
+        entries, vectors = {}, {}
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, encoding="utf-8") as f:
+                    entries = json.load(f)
+            if self.vectors_file.exists():
+                with np.load(self.vectors_file) as data:
+                    vectors = {key: data[key] for key in data.files}
+        except (OSError, ValueError) as e:
+            logging.warning("Could not read the resume index, rebuilding it: %s", e)
+            return {}, {}
+        return entries, vectors
+
+    def _save_index(self, entries: dict, vectors: dict) -> None:
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        tmp_file.replace(self.index_file)
+
+        tmp_file = self.vectors_file.with_suffix(".tmp")
+        with open(tmp_file, "wb") as f:
+            np.savez(f, **vectors)
+        tmp_file.replace(self.vectors_file)
+
+    def refresh(self) -> None:
+        """
+        Indexes new and changed resumes and drops the deleted ones from the index.
+        """
+        cached_entries, cached_vectors = self._load_index()
+        entries, vectors, resumes = {}, {}, []
+
+        paths = sorted(self.resumes_dir.iterdir()) if self.resumes_dir.is_dir() else []
+        for path in paths:
+            if not path.is_file() or path.suffix.lower() not in RESUME_SUFFIXES:
+                continue
+            stat = path.stat()
+            version = f"{stat.st_mtime_ns}:{stat.st_size}"
+
+            entry = cached_entries.get(path.name)
+            if entry is None or entry["version"] != version or entry["hash"] not in cached_vectors:
+                text = self.extract_text(path)
+                if not text:
+                    logging.warning("Could not extract the text of resume %s, it is not used.", path.name)
+                    continue
+                logging.info("Indexing resume %s", path.name)
+                entry = {"version": version, "hash": hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], "text": text}
+                cached_vectors[entry["hash"]] = self.term_vector(text)
+
+            entries[path.name] = entry
+            vectors[entry["hash"]] = cached_vectors[entry["hash"]]
+            resumes.append(IndexedResume(path.name, entry["text"]))
+
+        if entries != cached_entries:
+            self._save_index(entries, vectors)
+
+        matrix = np.array([vectors[entries[resume.filename]["hash"]] for resume in resumes]).reshape(len(resumes), VECTOR_SIZE)
+        # words found in every resume say little about which one fits a job
+        document_frequency = (matrix > 0).sum(axis=0)
+        idf = np.log((1 + len(resumes)) / (1 + document_frequency)) + 1
+        matrix = matrix * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+        with self._lock:
+            self.resumes, self._idf, self._matrix = resumes, idf, matrix
+        logging.info("Indexed %s resumes.", len(resumes))
+
+    def similarities(self, job_text: str) -> dict[str, float]:
+        """
+        Returns the similarity of a job to every indexed resume, from 0 to 1.
+
+        :param job_text: Title and description or requirements of the job.
+        :return: Dictionary with the resume file names as keys and the similarities as values.
+        :rtype: dict[str, float]
+        """
+        with self._lock:
+            resumes, idf, matrix = self.resumes, self._idf, self._matrix
+        vector = self.term_vector(job_text) * idf
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return {resume.filename: 0.0 for resume in resumes}
+        scores = matrix @ (vector / norm)
+        return {resume.filename: float(score) for resume, score in zip(resumes, scores)}
+
+    def select(self, job_text: str) -> Optional[IndexedResume]:
+        """
+        Picks the base resume for a job.
+
+        :param job_text: Title and description or requirements of the job.
+        :return: The most similar resume, the default one unless another is better by `margin`.
+            None if no resume is indexed.
+        :rtype: Optional[IndexedResume]
+        """
+        similarities = self.similarities(job_text)
+        if not similarities:
+            return None
+
+        best = max(similarities, key=similarities.get)
+        default = self.default_filename if self.default_filename in similarities else best
+        if similarities[best] - similarities[default] < self.margin:
+            best = default
+        logging.debug("Resume similarities: %s", similarities)
+
+        resume = next((resume for resume in self.resumes if resume.filename == best), None)
+        if resume is None:
+            return None
+        return IndexedResume(resume.filename, resume.text, similarity=round(similarities[best], 4))
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+from pathlib import Path
+from contextvars import ContextVar
+from typing import Optional
+
+# Report section of the job being processed. Jobs processed at the same time in different threads each have their own.
+_current_job: ContextVar[Optional[str]] = ContextVar("report_job", default=None)
+
+
+class RunReport:
+    """
+    Writes the report of a run: every event as a line of JSON, and a markdown report with one section per job.
+
+    Writing is cheap for the callers, events are put on a queue and a single background thread writes them to
+    buffered files. The lines of a job are collected until the job ends and then rendered as one section,
+    so jobs processed at the same time never interleave in the markdown report. Files are flushed every
+    `flush_interval` seconds and synced to disk every `fsync_interval` seconds, and once more when the report is closed.
+    """
+
+    def __init__(
+            self,
+            markdown_file: Path,
+            events_file: Optional[Path] = None,
+            flush_interval: float = 2,
+            fsync_interval: float = 10
+    ) -> None:
+        """
+        :param markdown_file: Path of the markdown report.
+        :param events_file: Path of the JSON lines events, default is the markdown file with a `.jsonl` suffix.
+        :param flush_interval: Maximum number of seconds events stay in memory.
+        :param fsync_interval: Maximum number of seconds written events stay in the OS cache.
+        """
+        self.markdown_file = Path(markdown_file)
+        self.events_file = Path(events_file) if events_file else self.markdown_file.with_suffix(".jsonl")
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_events, name="run-report", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def write(self, msg: str) -> None:
+        """
+        Adds a line to the section of the current job, or to the report directly outside of a job.
+        """
+        self._put({"event": "line", "job": _current_job.get(), "text": msg})
+
+    def start_job(self, title: str, url: Optional[str] = None) -> str:
+        """
+        Starts the report section of a job in the current thread or task. A job that was still open in it is ended.
+
+        :param title: Title of the job, the heading of the section.
+        :param url: Link to the job posting.
+        :return: The id of the section.
+        :rtype: str
+        """
+        if _current_job.get() is not None:
+            self.end_job()
+        job_id = uuid.uuid4().hex[:12]
+        _current_job.set(job_id)
+        self._put({"event": "job_started", "job": job_id, "title": title, "url": url})
+        return job_id
+
+    def end_job(self, status: Optional[str] = None) -> None:
+        """
+        Ends the report section of the current job, which is then written to the markdown report.
+
+        :param status: Optional final status of the job, only recorded in the events.
+        """
+        job_id = _current_job.get()
+        if job_id is None:
+            return
+        _current_job.set(None)
+        self._put({"event": "job_finished", "job": job_id, "status": status})
+
+    def flush(self, timeout: float = 10) -> None:
+        """
+        Blocks until all events written so far are in the files.
+        """
+        done = threading.Event()
+        self._events.put(done)
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Writes the sections of unfinished jobs and all remaining events, and syncs the files to disk.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._events.put(None)
+        self._writer.join()
+
+    def _put(self, event: dict) -> None:
+        if self._closed:
+            logging.warning("Run report is closed, dropping %s", event)
+            return
+        self._events.put({"ts": time.time(), **event})
+
+    @staticmethod
+    def _render(section: dict) -> str:
+        lines = [f"## Title: {section['title']}"]
+        if section["url"]:
+            lines.append(f" - [{section['url']}]({section['url']})")
+        return "\n".join(lines + section["lines"]) + "\n"
+
+    def _write_events(self) -> None:
+        """Writes events until the report is closed. Runs on the writer thread only."""
+        sections = {}
+        files = {}
+        last_flush = last_fsync = time.monotonic()
+
+        def open_file(path: Path):
+            if path not in files:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                files[path] = open(path, "a", encoding="utf-8", buffering=1 << 16)
+            return files[path]
+
+        def sync(fsync: bool) -> None:
+            for f in files.values():
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+        while True:
+            try:
+                event = self._events.get(timeout=self.flush_interval)
+            except queue.Empty:
+                event = {}
+
+            if event is None:
+                break
+            if isinstance(event, threading.Event):
+                sync(fsync=False)
+                event.set()
+                continue
+
+            if event:
+                try:
+                    open_file(self.events_file).write(json.dumps(event) + "\n")
+                    job_id = event["job"]
+                    if event["event"] == "job_started":
+                        sections[job_id] = {"title": event["title"], "url": event["url"], "lines": []}
+                    elif event["event"] == "job_finished":
+                        if job_id in sections:
+                            open_file(self.markdown_file).write(self._render(sections.pop(job_id)))
+                    elif job_id in sections:
+                        sections[job_id]["lines"].append(event["text"])
+                    else:
+                        open_file(self.markdown_file).write(event["text"] + "\n")
+                except Exception as e:
+                    logging.error("Could not write to the run report: %s", e)
+
+            now = time.monotonic()
+            if now - last_flush >= self.flush_interval:
+                fsync = now - last_fsync >= self.fsync_interval
+                sync(fsync)
+                last_flush = now
+                if fsync:
+                    last_fsync = now
+
+        # sections of jobs that did not end, ex: after an error
+        for section in sections.values():
+            open_file(self.markdown_file).write(self._render(section))
+        sync(fsync=True)
+        for f in files.values():
+            f.close()
@@ -1,12 +1,26 @@
 import sqlite3
+import threading
 import uuid
 import json
+import logging
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Iterator, Optional, Dict
 from pydantic import BaseModel, Field
 
+from resume_ai.app.classes.blob_store import BlobStore
+
 DB_FILE = "jobs.db"
 
+# Scores of the job log with a histogram in `score_histogram`, all between 0 and 1
+SCORE_COLUMNS = ("job_match_score", "resume_match_score", "resume_tailored_match_score")
+
+# Large text columns of the job log, stored in the blob store and referenced by the hash in `<column>_hash`
+BLOB_COLUMNS = ("job_description", "resume_tailored_text", "llm_text")
+
+# Data of the job being processed. Jobs processed at the same time in different threads each have their own.
+_job_data: ContextVar[Optional[dict]] = ContextVar("job_data", default=None)
+
 # ---- Pydantic Models ---- #
 
 class JobBatchConfig(BaseModel):
@@ -30,6 +44,13 @@ class JobLogEntry(JobBatchConfig):
     resume_tailored_dir: Optional[str] = None
     resume_tailored_text: Optional[str] = None
     llm_text: Optional[str] = None
+    cluster_id: Optional[str] = None
+    llm_input_tokens: Optional[int] = None
+    llm_output_tokens: Optional[int] = None
+    llm_cost_usd: Optional[float] = None
+    job_description_hash: Optional[str] = None
+    resume_tailored_text_hash: Optional[str] = None
+    llm_text_hash: Optional[str] = None
     status: str = 'Error'
 
 
@@ -41,16 +62,37 @@ class JobLogger:
         Initialize JobLogger with batch-wide configuration.
 
         :param config: Dictionary containing mode, profile_filename, and resume_filename.
+            Large texts are stored compressed in the blob store unless `compress_job_log` is false.
         """
         self.db_path = db_path
         self.connection = self._get_connection()
+        # stages and concurrent jobs write from several threads
+        self._write_lock = threading.Lock()
+        # the stages of a job update its job data from several threads
+        self._job_data_lock = threading.Lock()
+        self.blobs = BlobStore(self.connection, level=config.get("job_log_compression_level", 9))
+        self.compress_text = config.get("compress_job_log", True)
         self._create_table()
         self.batch_config = JobBatchConfig(**config)  # Store batch-wide settings
         self.job_data = {}
 
+    @property
+    def job_data(self) -> dict:
+        """Data of the current job, collected until it is inserted with `insert_job`."""
+        job_data = _job_data.get()
+        if job_data is None:
+            job_data = {}
+            _job_data.set(job_data)
+        return job_data
+
+    @job_data.setter
+    def job_data(self, value: dict) -> None:
+        _job_data.set(value)
+
     def _get_connection(self):
         """Ensures a single-threaded SQLite connection is reused."""
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # several worker processes may write to the same database
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
         return conn
 
     def _create_table(self):
@@ -73,18 +115,194 @@ class JobLogger:
             resume_tailored_match_score REAL,
             resume_tailored_text TEXT,
             resume_tailored_dir TEXT,
-            llm_text JSONB
+            llm_text JSONB,
+            cluster_id TEXT,
+            llm_input_tokens INTEGER,
+            llm_output_tokens INTEGER,
+            llm_cost_usd REAL,
+            job_description_hash TEXT,
+            resume_tailored_text_hash TEXT,
+            llm_text_hash TEXT
+        );
+        """
+        usage_query = """
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            created_ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            stage TEXT,
+            model TEXT,
+            input_tokens INTEGER,
+            output_tokens INTEGER,
+            cost_usd REAL
         );
         """
         cursor = self.connection.cursor()
         cursor.execute(query)
+        cursor.execute(usage_query)
+        self.connection.commit()
+        self._add_missing_columns()
+        self._create_stats_tables()
+
+    def _add_missing_columns(self):
+        """Adds columns introduced after the job log table was first created."""
+        new_columns = {
+            "cluster_id": "TEXT",
+            "llm_input_tokens": "INTEGER",
+            "llm_output_tokens": "INTEGER",
+            "llm_cost_usd": "REAL",
+            "job_description_hash": "TEXT",
+            "resume_tailored_text_hash": "TEXT",
+            "llm_text_hash": "TEXT",
+        }
+        cursor = self.connection.cursor()
+        cursor.execute("PRAGMA table_info(job_log)")
+        existing = {row[1] for row in cursor.fetchall()}
+
+        for column, column_type in new_columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE job_log ADD COLUMN {column} {column_type}")
+        self.connection.commit()
+
+    def _create_stats_tables(self):
+        """
+        Creates the aggregate tables of the job log, kept up to date by a trigger on every insert,
+        and fills them from the existing job log when they are new.
+        """
+        cursor = self.connection.cursor()
+        is_new = not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'job_stats'").fetchone()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_stats (
+            batch_id TEXT NOT NULL,
+            profile_filename TEXT NOT NULL,
+            status TEXT NOT NULL,
+            jobs INTEGER NOT NULL DEFAULT 0,
+            scored_jobs INTEGER NOT NULL DEFAULT 0,
+            job_match_score_sum REAL NOT NULL DEFAULT 0,
+            llm_cost_usd REAL NOT NULL DEFAULT 0,
+            first_ts TEXT,
+            PRIMARY KEY (batch_id, profile_filename, status)
+        );
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS score_histogram (
+            batch_id TEXT NOT NULL,
+            profile_filename TEXT NOT NULL,
+            score TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            jobs INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (batch_id, profile_filename, score, bucket)
+        );
+        """)
+
+        # ten buckets per score: 0 = [0, 0.1), ..., 9 = [0.9, 1]
+        histogram_inserts = "\n".join(f"""
+            INSERT INTO score_histogram (batch_id, profile_filename, score, bucket, jobs)
+            SELECT NEW.batch_id, COALESCE(NEW.profile_filename, ''), '{score}',
+                   MAX(0, MIN(CAST(NEW.{score} * 10 AS INTEGER), 9)), 1
+            WHERE NEW.{score} IS NOT NULL
+            ON CONFLICT (batch_id, profile_filename, score, bucket) DO UPDATE SET jobs = jobs + 1;"""
+            for score in SCORE_COLUMNS
+        )
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS job_log_stats AFTER INSERT ON job_log
+        BEGIN
+            INSERT INTO job_stats (batch_id, profile_filename, status, jobs, scored_jobs, job_match_score_sum, llm_cost_usd, first_ts)
+            VALUES (
+                NEW.batch_id, COALESCE(NEW.profile_filename, ''), NEW.status, 1,
+                NEW.job_match_score IS NOT NULL, COALESCE(NEW.job_match_score, 0), COALESCE(NEW.llm_cost_usd, 0),
+                NEW.created_ts
+            )
+            ON CONFLICT (batch_id, profile_filename, status) DO UPDATE SET
+                jobs = jobs + 1,
+                scored_jobs = scored_jobs + excluded.scored_jobs,
+                job_match_score_sum = job_match_score_sum + excluded.job_match_score_sum,
+                llm_cost_usd = llm_cost_usd + excluded.llm_cost_usd,
+                first_ts = MIN(first_ts, excluded.first_ts);
+            {histogram_inserts}
+        END;
+        """)
+        # LLM usage that comes in after the job was inserted, ex: its cover letter
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_log_stats_cost AFTER UPDATE OF llm_cost_usd ON job_log
+        BEGIN
+            UPDATE job_stats SET llm_cost_usd = llm_cost_usd + COALESCE(NEW.llm_cost_usd, 0) - COALESCE(OLD.llm_cost_usd, 0)
+            WHERE batch_id = NEW.batch_id AND profile_filename = COALESCE(NEW.profile_filename, '') AND status = NEW.status;
+        END;
+        """)
+
+        if is_new:
+            cursor.execute("""
+            INSERT INTO job_stats (batch_id, profile_filename, status, jobs, scored_jobs, job_match_score_sum, llm_cost_usd, first_ts)
+            SELECT batch_id, COALESCE(profile_filename, ''), status, COUNT(*), COUNT(job_match_score),
+                   COALESCE(SUM(job_match_score), 0), COALESCE(SUM(llm_cost_usd), 0), MIN(created_ts)
+            FROM job_log GROUP BY 1, 2, 3
+            """)
+            for score in SCORE_COLUMNS:
+                cursor.execute(f"""
+                INSERT INTO score_histogram (batch_id, profile_filename, score, bucket, jobs)
+                SELECT batch_id, COALESCE(profile_filename, ''), '{score}', MAX(0, MIN(CAST({score} * 10 AS INTEGER), 9)), COUNT(*)
+                FROM job_log WHERE {score} IS NOT NULL GROUP BY 1, 2, 3, 4
+                """)
         self.connection.commit()
 
+        self.search_enabled = self._create_search_index()
+
+    def _create_search_index(self) -> bool:
+        """
+        Creates the full-text index of job titles, descriptions and keywords.
+        The index does not keep a copy of the texts, matches are joined with the job log by id.
+
+        :return: False if the SQLite library has no FTS5 support.
+        """
+        cursor = self.connection.cursor()
+        is_new = not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'job_search'").fetchone()
+        try:
+            cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5(
+                job_title, job_description, job_keywords, content='', tokenize='porter unicode61'
+            )
+            """)
+        except sqlite3.OperationalError as e:
+            logging.warning("Full-text search of the job log is not available: %s", e)
+            return False
+        self.connection.commit()
+
+        if is_new:
+            self.rebuild_search_index()
+        return True
+
+    def rebuild_search_index(self) -> None:
+        """
+        Indexes all jobs of the job log again.
+        """
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            cursor.execute("INSERT INTO job_search (job_search) VALUES ('delete-all')")
+            self.connection.commit()
+
+        count = 0
+        jobs = self.iter_jobs()
+        while chunk := [job for _, job in zip(range(500), jobs)]:
+            with self._write_lock:
+                self.connection.executemany(
+                    "INSERT INTO job_search (rowid, job_title, job_description, job_keywords) VALUES (?, ?, ?, ?)",
+                    [(job["id"], job["job_title"], job["job_description"], job["job_keywords"]) for job in chunk]
+                )
+                self.connection.commit()
+            count += len(chunk)
+        if count:
+            logging.info("Indexed %s jobs for full-text search.", count)
+
     def insert_job(self):
         """
         Inserts a new job log entry, merging batch-wide and job-specific data.
+        The id of the entry is kept in `job_log_id` of the job data, so LLM usage of the job that comes in
+        later is added to it, see `log_llm_usage`.
         """
         job_data = self.job_data
+        # usage logged while the entry is written must not be lost between the totals and the entry
+        self._write_lock.acquire()
         try:
             full_job_data = {**self.batch_config.model_dump(), **job_data}  # Merge batch settings
 
@@ -95,17 +313,33 @@ class JobLogger:
                     full_job_data[col] = json.dumps(full_job_data[col])
 
             job_entry = JobLogEntry(**full_job_data)  # Validate with Pydantic
+            row = job_entry.model_dump()
 
-            columns = ', '.join(job_entry.model_dump().keys())
-            placeholders = ', '.join(['?' for _ in job_entry.model_dump()])
-            values = tuple(job_entry.model_dump().values())
+            columns = ', '.join(row.keys())
+            placeholders = ', '.join(['?' for _ in row])
 
             query = f"INSERT INTO job_log ({columns}) VALUES ({placeholders})"
+            search_values = (row["job_title"], row["job_description"], row["job_keywords"])
             cursor = self.connection.cursor()
-            cursor.execute(query, values)
+            if self.compress_text:
+                # large texts go to the blob store in the same transaction
+                for col in BLOB_COLUMNS:
+                    row[f"{col}_hash"] = self.blobs.put(row[col], cursor)
+                    row[col] = None
+            cursor.execute(query, tuple(row.values()))
+            job_log_id = cursor.lastrowid
+            if self.search_enabled:
+                cursor.execute(
+                    "INSERT INTO job_search (rowid, job_title, job_description, job_keywords) VALUES (?, ?, ?, ?)",
+                    (job_log_id, *search_values)
+                )
             self.connection.commit()
+            job_data['job_log_id'] = job_log_id
         except Exception as e:
+            self.connection.rollback()
             print(f"Error inserting job log: {e}")
+        finally:
+            self._write_lock.release()
 
     def get_distinct_links(self) -> list:
         """
@@ -121,6 +355,264 @@ class JobLogger:
         cursor.execute(query)
         return [row[0] for row in cursor.fetchall() if row[0]]
 
+    def get_acceptance_rate(self, match_limit: float, min_jobs: int = 20) -> Optional[float]:
+        """
+        Calculates the share of past jobs for the current profile whose job_match_score was at or above
+        the given limit.
+
+        :param match_limit: The minimum job_match_score for a job to be accepted.
+        :type match_limit: float
+        :param min_jobs: The minimum number of scored jobs needed for the rate to be meaningful.
+        :type min_jobs: int
+        :return: The acceptance rate between 0 and 1, or None if there are not enough scored jobs.
+        :rtype: Optional[float]
+        """
+        query = """
+        SELECT COUNT(*), SUM(CASE WHEN job_match_score >= ? THEN 1 ELSE 0 END)
+        FROM job_log
+        WHERE profile_filename = ? AND job_match_score IS NOT NULL
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(query, (match_limit, self.batch_config.profile_filename))
+        total, accepted = cursor.fetchone()
+
+        if total < min_jobs:
+            return None
+        return accepted / total
+
+    def log_llm_usage(self, usage: dict) -> None:
+        """
+        Stores the token usage of a single LLM call for the current batch and adds it to the totals of the current job,
+        or to its job log entry if it was inserted already, ex: for cover letters written in the background.
+
+        :param usage: Dictionary with `stage`, `model`, `input_tokens`, `output_tokens` and `cost_usd`.
+        :type usage: dict
+        """
+        query = """
+        INSERT INTO llm_usage (batch_id, stage, model, input_tokens, output_tokens, cost_usd)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        keys = ("input_tokens", "output_tokens", "cost_usd")
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            job_log_id = self.job_data.get('job_log_id')
+            if job_log_id is None:
+                for key in keys:
+                    self.job_data[f"llm_{key}"] = (self.job_data.get(f"llm_{key}") or 0) + usage[key]
+            else:
+                cursor.execute(
+                    f"UPDATE job_log SET {', '.join(f'llm_{key} = COALESCE(llm_{key}, 0) + ?' for key in keys)} WHERE id = ?",
+                    (*(usage[key] for key in keys), job_log_id)
+                )
+            cursor.execute(query, (
+                self.batch_config.batch_id, usage["stage"], usage["model"],
+                usage["input_tokens"], usage["output_tokens"], usage["cost_usd"]
+            ))
+            self.connection.commit()
+
+    def get_batch_usage(self, batch_id: Optional[str] = None) -> dict:
+        """
+        Sums up the LLM token usage and estimated cost of a batch.
+
+        :param batch_id: The batch to sum up, the current batch if not given.
+        :type batch_id: Optional[str]
+        :return: Dictionary with `input_tokens`, `output_tokens` and `cost_usd`.
+        :rtype: dict
+        """
+        query = "SELECT SUM(input_tokens), SUM(output_tokens), SUM(cost_usd) FROM llm_usage WHERE batch_id = ?"
+        cursor = self.connection.cursor()
+        cursor.execute(query, (batch_id or self.batch_config.batch_id,))
+        input_tokens, output_tokens, cost_usd = cursor.fetchone()
+        return {"input_tokens": input_tokens or 0, "output_tokens": output_tokens or 0, "cost_usd": cost_usd or 0.0}
+
+    def search_jobs(
+            self,
+            query: str,
+            min_score: Optional[float] = None,
+            score: str = "job_match_score",
+            batch_id: Optional[str] = None,
+            limit: int = 50
+    ) -> list[dict]:
+        """
+        Finds jobs by the words in their title, description or keywords, best matches first.
+
+        :param query: FTS5 query, ex: `kubernetes`, `"data engineer" AND remote` or `job_keywords:spark`.
+        :param min_score: Only jobs with at least this score.
+        :param score: The score `min_score` applies to, one of `SCORE_COLUMNS`.
+        :param batch_id: Only jobs of this batch.
+        :param limit: Maximum number of jobs.
+        :return: Dictionaries with the id, title, URL, status, batch and scores of the jobs.
+        :rtype: list[dict]
+        """
+        if score not in SCORE_COLUMNS:
+            raise ValueError(f"Unknown score {score}, use one of {SCORE_COLUMNS}")
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search needs SQLite with FTS5 support.")
+
+        conditions, params = ["job_search MATCH ?"], [query]
+        if min_score is not None:
+            conditions.append(f"j.{score} >= ?")
+            params.append(min_score)
+        if batch_id:
+            conditions.append("j.batch_id = ?")
+            params.append(batch_id)
+
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+        SELECT j.id, j.job_title, j.url, j.status, j.batch_id, j.created_ts, {', '.join(f'j.{col}' for col in SCORE_COLUMNS)}
+        FROM job_search JOIN job_log j ON j.id = job_search.rowid
+        WHERE {' AND '.join(conditions)}
+        ORDER BY job_search.rank
+        LIMIT ?
+        """, (*params, limit))
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_job_stats(self, batch_id: Optional[str] = None, profile_filename: Optional[str] = None) -> list[dict]:
+        """
+        Returns the number of jobs per batch, profile and status, with the average job match score and the LLM cost.
+        Read from the aggregate table, so it takes no time however long the job log is.
+
+        :param batch_id: Only this batch.
+        :param profile_filename: Only this profile.
+        :rtype: list[dict]
+        """
+        conditions, params = self._stats_filter(batch_id, profile_filename)
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+        SELECT batch_id, profile_filename, status, jobs,
+               CASE WHEN scored_jobs > 0 THEN job_match_score_sum / scored_jobs END AS avg_job_match_score,
+               llm_cost_usd, MIN(first_ts) OVER (PARTITION BY batch_id) AS started_ts
+        FROM job_stats
+        {conditions}
+        ORDER BY started_ts, batch_id, profile_filename, status
+        """, params)
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_score_histogram(
+            self,
+            score: str = "job_match_score",
+            batch_id: Optional[str] = None,
+            profile_filename: Optional[str] = None
+    ) -> list[int]:
+        """
+        Returns the distribution of a score in ten buckets: jobs with scores in [0, 0.1), [0.1, 0.2), ..., [0.9, 1].
+
+        :param score: One of `SCORE_COLUMNS`.
+        :param batch_id: Only this batch.
+        :param profile_filename: Only this profile.
+        :return: The number of jobs per bucket.
+        :rtype: list[int]
+        """
+        if score not in SCORE_COLUMNS:
+            raise ValueError(f"Unknown score {score}, use one of {SCORE_COLUMNS}")
+        conditions, params = self._stats_filter(batch_id, profile_filename)
+        conditions = f"{conditions} {'AND' if conditions else 'WHERE'} score = ?"
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT bucket, SUM(jobs) FROM score_histogram {conditions} GROUP BY bucket", (*params, score))
+        histogram = [0] * 10
+        for bucket, jobs in cursor.fetchall():
+            histogram[bucket] = jobs
+        return histogram
+
+    @staticmethod
+    def _stats_filter(batch_id: Optional[str], profile_filename: Optional[str]) -> tuple[str, tuple]:
+        conditions, params = [], []
+        if batch_id:
+            conditions.append("batch_id = ?")
+            params.append(batch_id)
+        if profile_filename:
+            conditions.append("profile_filename = ?")
+            params.append(profile_filename)
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
+
+    def get_job(self, job_id: int) -> Optional[dict]:
+        """
+        Returns a job log entry with its large texts, wherever they are stored.
+
+        :param job_id: The id of the job log entry.
+        :return: Dictionary with the columns of the entry, None if there is no such entry.
+        :rtype: Optional[dict]
+        """
+        return next(self.iter_jobs("id = ?", (job_id,)), None)
+
+    def iter_jobs(self, where: str = "", params: tuple = (), chunk_size: int = 500) -> Iterator[dict]:
+        """
+        Iterates over job log entries, in chunks, with their large texts read from the blob store.
+
+        :param where: Optional SQL condition, ex: `"batch_id = ?"`.
+        :param params: Parameters of the condition.
+        :param chunk_size: Number of entries read at a time.
+        :return: Iterator over dictionaries with the columns of the entries.
+        """
+        query = f"SELECT * FROM job_log {'WHERE ' + where if where else ''} ORDER BY id"
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+
+        while rows := cursor.fetchmany(chunk_size):
+            rows = [dict(zip(columns, row)) for row in rows]
+            texts = self.blobs.get_many(row.get(f"{col}_hash") for row in rows for col in BLOB_COLUMNS)
+            for row in rows:
+                yield self.resolve_texts(row, texts)
+
+    def resolve_texts(self, row: dict, texts: Optional[dict] = None) -> dict:
+        """
+        Fills in the large texts of a job log row that are stored in the blob store.
+
+        :param row: Dictionary with the columns of the row.
+        :param texts: Texts already read from the blob store, by hash.
+        :return: The row with the texts, without the hash columns.
+        :rtype: dict
+        """
+        for col in BLOB_COLUMNS:
+            digest = row.pop(f"{col}_hash", None)
+            if row.get(col) is None and digest is not None:
+                row[col] = texts[digest] if texts and digest in texts else self.blobs.get(digest)
+        return row
+
+    def compact(self, train_dictionary: bool = False, dictionary_samples: int = 2000) -> dict:
+        """
+        Moves the large texts that are still stored in the job log rows into the blob store, and reclaims the space.
+
+        :param train_dictionary: First train a zstd dictionary on recent job descriptions.
+        :param dictionary_samples: Number of job descriptions to train the dictionary on.
+        :return: The statistics of the blob store.
+        :rtype: dict
+        """
+        if train_dictionary:
+            samples = [row["job_description"] for row in self.iter_jobs(
+                "id IN (SELECT id FROM job_log WHERE job_description IS NOT NULL OR job_description_hash IS NOT NULL"
+                " ORDER BY id DESC LIMIT ?)", (dictionary_samples,)
+            )]
+            self.blobs.train_dictionary(samples)
+
+        condition = " OR ".join(f"{col} IS NOT NULL" for col in BLOB_COLUMNS)
+        moved = 0
+        while True:
+            with self._write_lock:
+                cursor = self.connection.cursor()
+                rows = cursor.execute(
+                    f"SELECT id, {', '.join(BLOB_COLUMNS)} FROM job_log WHERE {condition} LIMIT 500"
+                ).fetchall()
+                if not rows:
+                    break
+                for job_id, *values in rows:
+                    hashes = [self.blobs.put(value, cursor) for value in values]
+                    assignments = ", ".join(
+                        f"{col} = NULL, {col}_hash = COALESCE(?, {col}_hash)" for col in BLOB_COLUMNS
+                    )
+                    cursor.execute(f"UPDATE job_log SET {assignments} WHERE id = ?", (*hashes, job_id))
+                self.connection.commit()
+                moved += len(rows)
+
+        with self._write_lock:
+            self.connection.execute("VACUUM")
+        stats = self.blobs.stats()
+        logging.info("Moved the texts of %s jobs to the blob store. Blobs: %s", moved, stats)
+        return stats
+
     def close_connection(self):
         """Closes the database connection."""
         self.connection.close()
@@ -151,10 +643,12 @@ class JobLogger:
         :param value: The value to be associated with the key in the `llm_text` dictionary.
         :type value: str
         """
-        if not self.job_data.get('llm_text'):
-            self.job_data['llm_text'] = {}
+        job_data = self.job_data
+        with self._job_data_lock:
+            if not job_data.get('llm_text'):
+                job_data['llm_text'] = {}
 
-        self.job_data['llm_text'][key] = value
+            job_data['llm_text'][key] = value
 
     def clear_job_data(self):
         """
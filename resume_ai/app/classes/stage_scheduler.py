@@ -0,0 +1,198 @@
+import logging
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+# Stage statuses
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+STAGE_TIMEOUT = "timeout"
+STAGE_SKIPPED = "skipped"
+STAGE_CANCELLED = "cancelled"
+
+
+@dataclass
+class Stage:
+    """
+    A single unit of work in a job pipeline.
+
+    :param name: Unique name of the stage. Used as the key in the results.
+    :param func: Callable receiving the results of the finished stages (dict name -> result).
+    :param depends_on: Names of the stages that must finish successfully before this one starts.
+    :param timeout: Maximum number of seconds the stage may run. None means no limit.
+    :param gate: If True, a falsy result of the stage skips every stage that depends on it.
+    :param guarded_by: Names of gate stages that do not have to finish before this stage starts,
+        but cancel it (or discard its result) if they close. Used for speculative execution.
+    """
+    name: str
+    func: Callable[[dict], Any]
+    depends_on: tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    gate: bool = False
+    guarded_by: tuple[str, ...] = ()
+
+
+@dataclass
+class StageScheduler:
+    """
+    Executes a DAG of stages, starting every stage as soon as all of its dependencies are done.
+    Blocking stage functions are run in worker threads, so independent LLM calls overlap.
+    The optional `on_status` callback is called with the stage name and its new status, `started` or
+    one of the final statuses, ex: to report progress.
+    """
+    stages: list[Stage]
+    results: dict = field(default_factory=dict)
+    statuses: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    on_status: Optional[Callable[[str, str], None]] = None
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        names = [stage.name for stage in self.stages]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Stage names must be unique: {names}")
+
+        for stage in self.stages:
+            unknown = set(stage.depends_on + stage.guarded_by) - set(names)
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {sorted(unknown)}")
+
+    def run(self) -> dict:
+        """
+        Runs all stages and blocks until they are finished.
+
+        Returns as soon as every stage has finished, timed out or been cancelled. The worker threads of stages
+        that timed out or were cancelled are not waited for (`asyncio.run` would join them).
+
+        :return: A dictionary with stage names as keys and their results as values.
+        """
+        self._executor = ThreadPoolExecutor(max(len(self.stages), 1), thread_name_prefix="stage")
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.run_async())
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def run_async(self) -> dict:
+        """
+        Runs all stages in dependency order, with every ready stage started concurrently.
+
+        A cancelled or timed out stage keeps running in its worker thread until the blocking call returns,
+        but its result is discarded and the job does not wait for it.
+
+        :return: A dictionary with stage names as keys and their results as values.
+        :rtype: dict[str, Any]
+        """
+        pending = {stage.name: stage for stage in self.stages}
+        running = {}
+
+        while pending or running:
+            # Skip stages that can never run because a dependency did not succeed
+            for name, stage in list(pending.items()):
+                if any(self._blocks(dep) for dep in stage.depends_on + stage.guarded_by):
+                    logging.info("Skipping stage '%s': a dependency did not succeed.", name)
+                    self._set_status(name, STAGE_SKIPPED)
+                    del pending[name]
+
+            # Cancel speculative stages whose gate has closed
+            self._cancel_speculative(running)
+
+            # Start every stage whose dependencies are done
+            for name, stage in list(pending.items()):
+                if all(self.statuses.get(dep) == STAGE_DONE for dep in stage.depends_on):
+                    running[asyncio.create_task(self._run_stage(stage))] = stage
+                    del pending[name]
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency cycle between stages: {sorted(pending)}")
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = running.pop(task)
+                if task.cancelled():
+                    self._set_status(stage.name, STAGE_CANCELLED)
+
+        self._cancel_speculative(running)
+        return self.results
+
+    def _cancel_speculative(self, running: dict) -> None:
+        """
+        Cancels running stages guarded by a closed gate and discards the results of finished ones.
+
+        The scheduler stops waiting for a cancelled stage right away, but the blocking call in its worker thread
+        cannot be interrupted: it runs to the end in the background, ex: the tokens of an LLM request are still spent.
+        """
+        for stage in self.stages:
+            if not any(self._blocks(gate) for gate in stage.guarded_by):
+                continue
+            for task, running_stage in running.items():
+                if running_stage is stage and not task.done():
+                    logging.info("Cancelling speculative stage '%s': its gate is closed.", stage.name)
+                    task.cancel()
+            if self.statuses.get(stage.name) == STAGE_DONE:
+                logging.info("Discarding result of speculative stage '%s'.", stage.name)
+                self.results.pop(stage.name, None)
+                self._set_status(stage.name, STAGE_CANCELLED)
+
+    async def _run_stage(self, stage: Stage) -> None:
+        """
+        Runs a single stage in a worker thread and records its result, status and error.
+        """
+        logging.debug("Starting stage '%s'", stage.name)
+        self._notify(stage.name, "started")
+        # the stage runs with the context variables of the job, ex: its job data
+        call = functools.partial(contextvars.copy_context().run, stage.func, self.results)
+        try:
+            result = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(self._executor, call),
+                timeout=stage.timeout
+            )
+        except asyncio.TimeoutError:
+            # The worker thread cannot be killed, its result is simply ignored.
+            logging.error("Stage '%s' timed out after %s seconds.", stage.name, stage.timeout)
+            self._set_status(stage.name, STAGE_TIMEOUT)
+            return
+        except Exception as e:
+            logging.exception("Stage '%s' failed: %s", stage.name, e)
+            self.errors[stage.name] = e
+            self._set_status(stage.name, STAGE_FAILED)
+            return
+
+        self.results[stage.name] = result
+        self._set_status(stage.name, STAGE_DONE)
+
+        if stage.gate and not result:
+            logging.info("Gate stage '%s' is closed.", stage.name)
+
+    def _set_status(self, name: str, status: str) -> None:
+        self.statuses[name] = status
+        self._notify(name, status)
+
+    def _notify(self, name: str, status: str) -> None:
+        if self.on_status is None:
+            return
+        try:
+            self.on_status(name, status)
+        except Exception as e:
+            logging.error("Stage status callback failed: %s", e)
+
+    def _blocks(self, name: str) -> bool:
+        """
+        Checks if a finished stage prevents its dependents from running.
+        """
+        status = self.statuses.get(name)
+        if status is None:
+            return False
+        if status != STAGE_DONE:
+            return True
+
+        stage = next(s for s in self.stages if s.name == name)
+        return stage.gate and not self.results.get(name)
@@ -1,28 +1,51 @@
-from langchain_community.document_loaders import AsyncHtmlLoader
+import re
+import html
+import logging
+
+from langchain_core.documents import Document
 from langchain_community.document_transformers import Html2TextTransformer
 
+from resume_ai.app.classes.crawler_transport import CrawlerTransport
+from resume_ai.app.classes.content_extractor import ContentExtractor
+
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
 
 class URLCrawler:
     """
     URLCrawler is responsible for asynchronously loading HTML content from a list of URLs
     and transforming it into plain text using a provided LangChain LLM object.
 
+    Pages are fetched through a `CrawlerTransport`, configured with the `crawler_*` keys of the config.
+    Only the main content of a page is kept if `content_extraction` is enabled, the full page text otherwise.
+
     Attributes:
         llm (object): An instance of a LangChain LLM-related object, used for transformations.
     """
 
-    def __init__(self, llm) -> None:
+    def __init__(self, llm, config: dict = None) -> None:
         """
         Initialize the URLCrawler with the necessary LLM object.
 
         Args:
             llm: An object holding LLM client.
+            config: The app config with the optional crawler settings.
         """
         self.llm = llm
+        config = config or {}
+        self.transport = CrawlerTransport(
+            concurrency=config.get("crawler_concurrency", 16),
+            domain_concurrency=config.get("crawler_domain_concurrency", 2),
+            domain_delay=config.get("crawler_domain_delay_seconds", 1.0),
+            domain_limits=config.get("crawler_domain_limits"),
+            timeout=config.get("crawler_timeout_seconds", 30),
+        )
+        self.extractor = ContentExtractor() if config.get("content_extraction", True) else None
 
     def crawl_urls(self, urls: list[str]) -> list:
         """
         Asynchronously loads HTML content from a list of URLs and transforms it into plain text.
+        URLs that cannot be fetched are left out.
 
         Args:
             urls (list[str]): A list of URLs to crawl.
@@ -31,11 +54,32 @@ class URLCrawler:
             list: A list of transformed documents, where each document's content is plain text.
         """
         # Load HTML documents from the URLs
-        loader = AsyncHtmlLoader(urls)
-        docs = loader.load()
+        pages = self.transport.fetch_all(urls)
+
+        docs = []
+        full_pages = []
+        for url, page in pages.items():
+            extracted = self.extractor.extract(page) if self.extractor else None
+            if extracted is None:
+                full_pages.append(Document(page_content=page, metadata={"source": url, "title": self.page_title(page)}))
+                continue
+            logging.info("Extracted the main content of %s (%s, %.0f%% of the page).", url, extracted.method, extracted.ratio * 100)
+            docs.append(Document(
+                page_content=extracted.text,
+                metadata={"source": url, "title": extracted.title or self.page_title(page), "extraction": extracted.method},
+            ))
+
+        # Transform the remaining documents to plain text
+        if full_pages:
+            html2text = Html2TextTransformer()
+            docs.extend(html2text.transform_documents(full_pages))
 
-        # Transform the documents to plain text
-        html2text = Html2TextTransformer()
-        docs_transformed = html2text.transform_documents(docs)
+        # keep the order of the fetched pages
+        order = {url: i for i, url in enumerate(pages)}
+        return sorted(docs, key=lambda doc: order[doc.metadata["source"]])
 
-        return docs_transformed
+    @staticmethod
+    def page_title(page: str) -> str:
+        """Returns the text of the title tag of a page."""
+        match = TITLE_PATTERN.search(page)
+        return html.unescape(match.group(1)).strip() if match else "No Title Found"
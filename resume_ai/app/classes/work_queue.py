@@ -0,0 +1,228 @@
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+QUEUE_PENDING = "pending"
+QUEUE_LEASED = "leased"
+QUEUE_DONE = "done"
+QUEUE_FAILED = "failed"
+
+
+@dataclass
+class WorkItem:
+    """
+    A job claimed from the work queue. The payload is the job description for job files
+    and empty for links, which are crawled by the worker.
+    """
+    id: int
+    job_key: str
+    mode: str
+    title: str
+    payload: Optional[str]
+    attempts: int
+
+
+class BaseWorkQueue(ABC):
+    """
+    Durable queue of jobs shared by any number of worker processes.
+
+    A worker claims a job with a lease and keeps it by sending heartbeats while it works on it.
+    If the worker dies, the lease expires and the job is claimed again by another worker,
+    until it has been attempted `max_attempts` times.
+    """
+
+    def __init__(self, max_attempts: int = 3) -> None:
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, jobs: Iterable[dict]) -> int:
+        """
+        Adds jobs to the queue. Jobs already in the queue are skipped, but pending ones get the new priority.
+
+        :param jobs: Dictionaries with `job_key` (file name or URL), `mode`, `title`, optional `payload` and `priority`.
+        :return: Number of jobs added.
+        """
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[WorkItem]:
+        """Claims the pending job with the highest priority, or a job whose lease expired. None if there is no work."""
+
+    @abstractmethod
+    def heartbeat(self, item_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Extends the lease of a claimed job. Returns False if the worker lost the lease."""
+
+    @abstractmethod
+    def complete(self, item_id: int, worker_id: str) -> None:
+        """Marks a claimed job as done."""
+
+    @abstractmethod
+    def fail(self, item_id: int, worker_id: str, error: str) -> None:
+        """Returns a claimed job to the queue for a retry, or marks it as failed after `max_attempts`."""
+
+    @abstractmethod
+    def job_keys(self, mode: str, status: str) -> list[str]:
+        """Returns the keys of the jobs of a mode with the given status."""
+
+    @abstractmethod
+    def counts(self) -> dict:
+        """Returns the number of jobs per status."""
+
+
+class SqliteWorkQueue(BaseWorkQueue):
+    """
+    Work queue in a SQLite table. Safe for several worker processes on one machine; SQLite files
+    on network drives are not, so workers on several machines need a queue backed by a database server.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3) -> None:
+        super().__init__(max_attempts)
+        # autocommit mode, transactions are started explicitly
+        self.connection = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # the heartbeat thread shares the connection
+        self._lock = threading.Lock()
+        self._create_table()
+
+    def _create_table(self) -> None:
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS work_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_key TEXT NOT NULL UNIQUE,
+            mode TEXT NOT NULL CHECK(mode IN ('links', 'files')),
+            title TEXT,
+            payload TEXT,
+            priority REAL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'leased', 'done', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            enqueued_ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_ts REAL
+        );
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS work_queue_claim ON work_queue (status, priority DESC)")
+
+    def _transaction(self, statements: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """Runs a function with a cursor in a write transaction and returns its result."""
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(cursor)
+                cursor.execute("COMMIT")
+                return result
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, jobs: Iterable[dict]) -> int:
+        def insert(cursor):
+            added = 0
+            for job in jobs:
+                priority = job.get("priority", 0)
+                if cursor.execute("SELECT 1 FROM work_queue WHERE job_key = ?", (job["job_key"],)).fetchone():
+                    cursor.execute(
+                        "UPDATE work_queue SET priority = ? WHERE job_key = ? AND status = 'pending'",
+                        (priority, job["job_key"])
+                    )
+                    continue
+
+                cursor.execute(
+                    "INSERT INTO work_queue (job_key, mode, title, payload, priority, updated_ts) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job["job_key"], job["mode"], job.get("title"), job.get("payload"), priority, time.time())
+                )
+                added += 1
+            return added
+
+        return self._transaction(insert)
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[WorkItem]:
+        def claim_next(cursor):
+            now = time.time()
+            # jobs whose workers died too often are given up
+            cursor.execute(
+                """
+                UPDATE work_queue SET status = 'failed', last_error = COALESCE(last_error, 'lease expired'), updated_ts = ?
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+                """,
+                (now, now, self.max_attempts)
+            )
+            row = cursor.execute(
+                """
+                SELECT id, job_key, mode, title, payload, attempts FROM work_queue
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY priority DESC, id LIMIT 1
+                """,
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            cursor.execute(
+                """
+                UPDATE work_queue SET status = 'leased', worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated_ts = ?
+                WHERE id = ?
+                """,
+                (worker_id, now + lease_seconds, now, row[0])
+            )
+            return WorkItem(*row[:5], attempts=row[5] + 1)
+
+        return self._transaction(claim_next)
+
+    def heartbeat(self, item_id: int, worker_id: str, lease_seconds: float) -> bool:
+        def extend(cursor):
+            now = time.time()
+            cursor.execute(
+                "UPDATE work_queue SET lease_expires = ?, updated_ts = ? WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (now + lease_seconds, now, item_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(extend)
+
+    def complete(self, item_id: int, worker_id: str) -> None:
+        self._transaction(lambda cursor: cursor.execute(
+            "UPDATE work_queue SET status = 'done', lease_expires = NULL, updated_ts = ? WHERE id = ? AND worker_id = ?",
+            (time.time(), item_id, worker_id)
+        ))
+
+    def fail(self, item_id: int, worker_id: str, error: str) -> None:
+        self._transaction(lambda cursor: cursor.execute(
+            """
+            UPDATE work_queue
+            SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END,
+                lease_expires = NULL, last_error = ?, updated_ts = ?
+            WHERE id = ? AND worker_id = ?
+            """,
+            (self.max_attempts, error, time.time(), item_id, worker_id)
+        ))
+
+    def job_keys(self, mode: str, status: str) -> list[str]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT job_key FROM work_queue WHERE mode = ? AND status = ?", (mode, status)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM work_queue GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def get_work_queue(config: dict, db_path: str) -> BaseWorkQueue:
+    """
+    Creates the work queue for the `work_queue_backend` set in the config. Only `sqlite` is built in,
+    other backends subclass `BaseWorkQueue`.
+    """
+    backend = config.get("work_queue_backend", "sqlite")
+    if backend == "sqlite":
+        return SqliteWorkQueue(config.get("work_queue_db", db_path), config.get("work_queue_max_attempts", 3))
+    raise ValueError(f"Unknown work queue backend: {backend}")
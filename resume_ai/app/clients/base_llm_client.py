@@ -1,30 +1,95 @@
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Optional
+from dataclasses import dataclass
 import base64
 from mimetypes import guess_type
+from langchain_core.exceptions import OutputParserException
 from langchain_core.prompts import (
     ChatPromptTemplate,
     HumanMessagePromptTemplate
 )
 
+from resume_ai.app.clients.budget_governor import BudgetGovernor
+
+# Replaces the schema in the prompt when the schema is sent to the provider as structured output
+NATIVE_FORMAT_INSTRUCTIONS = "Respond using the provided response schema."
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LlmRequest:
+    """
+    A prompt together with its input parameters and output parser, ready to be sent to an LLM.
+    The stage names the pipeline step the request belongs to.
+    The optional confidence check returns False for a parsed response that should be escalated
+    to the next model of a cascade.
+    """
+    stage: str
+    prompt: Any
+    params: dict
+    parser: Any = None
+    confidence_check: Optional[Callable[[Any], bool]] = None
+
+    def to_text(self) -> str:
+        """Renders the prompt with its parameters into the text sent to the LLM."""
+        return self.prompt.format(**self.params)
+
+
 class BaseLlm(ABC):
     """
     Base class for utilizing an LLM model abstraction, allowing flexible integration of different
     language learning models (LLMs) for processing input data, images, and generating outputs or responses.
+
+    Requests can be routed to a different model per stage with `llm_models` in the config, ex:
+    `{"check_url_job_active": "gpt-4o-mini"}`, and sent through a cascade of models with `llm_cascade`, ex:
+    `{"get_job_req": ["gpt-4o-mini", "gpt-4o"]}`. In a cascade, the next model is only used when the
+    response of the previous one fails validation or its confidence check.
+
+    The token usage and estimated cost of every call are tracked by a `BudgetGovernor`, which
+    switches to a cheaper model or stops calling the LLM once the configured budget runs out.
     """
+    # Default model of the client, overridden by subclasses
+    model = None
 
-    def __init__(self):
+    def __init__(self, config: dict = None):
+        self.config = config or {}
+        self._llms = {}
+        self._llms_lock = threading.Lock()
+        self.budget = BudgetGovernor(self.config)
         self.llm = self.connect()
 
     @abstractmethod
-    def connect(self):
-        """Create and return a connection to the LLM backend."""
+    def connect(self, model: str = None):
+        """Create and return a connection to the LLM backend, for the given model or the default one."""
+
+    def get_llm(self, model: str = None):
+        """
+        Returns the connection for a model, creating it on first use.
+        """
+        if model is None or model == self.model:
+            return self.llm
+
+        with self._llms_lock:
+            if model not in self._llms:
+                self._llms[model] = self.connect(model)
+            return self._llms[model]
+
+    def models_for_stage(self, stage: str) -> list[str]:
+        """
+        Returns the models a request of the given stage is sent to, in order.
+
+        :param stage: Name of the stage.
+        :return: The cascade of the stage, or its single routed model, or the default model.
+        """
+        cascade = self.config.get("llm_cascade", {}).get(stage)
+        if cascade:
+            return list(cascade)
+        return [self.config.get("llm_models", {}).get(stage, self.model)]
 
     @staticmethod
     def image_binary_to_data_url(image_binary, mime_type='image/png'):
@@ -81,16 +146,25 @@ class BaseLlm(ABC):
             logger.error("Error during image processing: %s", e)
             raise
 
-    def invoke_llm(self, prompt: Any, params_dic: dict, parser: Any = None):
+    def invoke_llm(self, prompt: Any, params_dic: dict, parser: Any = None, llm: Any = None, stage: str = None):
         # {"job_title": job_title, "job_description": job_descr}
+        llm = llm or self.llm
+        model = getattr(llm, "model_name", None) or getattr(llm, "model_id", None) or self.model
+        run_config = {"callbacks": [self.budget.callback(stage or "unknown", model)]}
+
+        if self.config.get("structured_output", True) and getattr(parser, "pydantic_object", None) is not None:
+            response = self.invoke_structured(prompt, params_dic, parser.pydantic_object, llm, run_config)
+            if response is not None:
+                return response
+
         try:
             # Check if the parser is provided
             if parser:
-                table_chain = prompt | self.llm | parser
+                table_chain = prompt | llm | parser
             else:
-                table_chain = prompt | self.llm
+                table_chain = prompt | llm
 
-            response = table_chain.invoke(params_dic)
+            response = table_chain.invoke(params_dic, config=run_config)
             logger.info("LLM invocation successful.")
 
             return response
@@ -98,3 +172,87 @@ class BaseLlm(ABC):
             logger.error("Error during LLM invocation: %s", e)
             raise
 
+    def invoke_structured(self, prompt: Any, params_dic: dict, pydantic_object: Any, llm: Any, run_config: dict = None):
+        """
+        Invokes the LLM with provider-native structured output for the given schema.
+
+        The JSON schema is passed to the provider with its default structured output method (a JSON schema
+        response format or a tool definition, depending on the provider), so the verbose format instructions
+        are replaced in the prompt by a short note.
+
+        :return: The response as a dict, or None if the model does not support structured output,
+            so the caller falls back to the output parser.
+        :raises OutputParserException: If the model answered without a usable structured response.
+        """
+        try:
+            structured_llm = llm.with_structured_output(pydantic_object)
+        except (AttributeError, NotImplementedError):
+            return None
+
+        if "format_instructions" in getattr(prompt, "partial_variables", {}):
+            prompt = prompt.partial(format_instructions=NATIVE_FORMAT_INSTRUCTIONS)
+
+        # the response is paid for at this point, so a failure is raised rather than retried with the output parser;
+        # a model cascade escalates it to the next model
+        try:
+            response = (prompt | structured_llm).invoke(params_dic, config=run_config)
+        except Exception as e:
+            logger.error("Error during structured LLM invocation: %s", e)
+            raise
+
+        if response is None:
+            logger.error("The LLM returned no structured response.")
+            raise OutputParserException("The LLM returned no structured response.")
+
+        logger.info("LLM invocation successful.")
+        return response.model_dump() if hasattr(response, "model_dump") else response
+
+    def invoke_request(self, request: LlmRequest):
+        """
+        Invokes the LLM with a prepared request, using the model or cascade of models configured for its stage.
+        Once the budget runs low, every stage uses the cheaper fallback model of the budget instead.
+
+        :param request: The request to send.
+        :return: The parsed response if the request has a parser, otherwise the raw LLM message.
+        :raises BudgetExceededError: If the run or job budget is used up.
+        """
+        fallback_model = self.budget.model_override()
+        models = [fallback_model] if fallback_model else self.models_for_stage(request.stage)
+
+        for i, model in enumerate(models):
+            is_last = i == len(models) - 1
+            self.budget.check(request.stage)
+            try:
+                response = self.invoke_llm(request.prompt, request.params, request.parser, llm=self.get_llm(model), stage=request.stage)
+            except Exception:
+                if is_last:
+                    raise
+                logger.warning("Stage '%s' failed on model %s, escalating to %s.", request.stage, model, models[i + 1])
+                continue
+
+            if is_last or self.is_confident(request, response):
+                return response
+
+            logger.info("Low confidence for stage '%s' on model %s, escalating to %s.", request.stage, model, models[i + 1])
+
+    @staticmethod
+    def is_confident(request: LlmRequest, response: Any) -> bool:
+        """
+        Checks a response against the schema of the request parser and the confidence check of the request.
+
+        :param request: The request the response belongs to.
+        :param response: The parsed response.
+        :return: True if the response can be used without escalating to a larger model.
+        """
+        pydantic_object = getattr(request.parser, "pydantic_object", None)
+        if pydantic_object is not None:
+            try:
+                pydantic_object.model_validate(response)
+            except Exception as e:
+                logger.info("Response for stage '%s' failed validation: %s", request.stage, e)
+                return False
+
+        if request.confidence_check is not None:
+            return bool(request.confidence_check(response))
+
+        return True
@@ -0,0 +1,194 @@
+import json
+import time
+import uuid
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from resume_ai.app.clients.base_llm_client import BaseLlm, LlmRequest
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BaseBatchClient(ABC):
+    """
+    Base class for submitting many LLM requests at once through a provider batch interface.
+    Batch files use the OpenAI batch JSONL format for both requests and results.
+    """
+
+    def __init__(self, model: str, poll_interval: float = 60, stage_models: dict = None):
+        """
+        :param model: Name of the model the requests are sent to.
+        :param poll_interval: Number of seconds between status checks while waiting for a batch.
+        :param stage_models: Optional models per stage, overriding the default model.
+        """
+        self.model = model
+        self.poll_interval = poll_interval
+        self.stage_models = stage_models or {}
+
+    @abstractmethod
+    def submit(self, batch_file: Path) -> str:
+        """Submit a JSONL batch file and return the id of the batch."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Return the status of the batch, one of BATCH_FINAL_STATUSES once it is finished."""
+
+    @abstractmethod
+    def fetch_output(self, batch_id: str) -> list[dict]:
+        """Return the result lines of a finished batch."""
+
+    def write_batch_file(self, requests: dict[str, LlmRequest], batch_file: Path) -> Path:
+        """
+        Writes requests to a JSONL batch file.
+
+        :param requests: Dictionary with a unique custom id for every request.
+        :param batch_file: Path of the file to write.
+        :return: Path of the written file.
+        """
+        batch_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(batch_file, "w") as f:
+            for custom_id, request in requests.items():
+                line = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": self.stage_models.get(request.stage, self.model),
+                        "temperature": 0,
+                        "messages": [{"role": "user", "content": request.to_text()}],
+                    },
+                }
+                f.write(json.dumps(line) + "\n")
+
+        return batch_file
+
+    def run(self, requests: dict[str, LlmRequest], batch_file: Path) -> dict:
+        """
+        Submits requests as one batch, waits for it to finish and parses the results.
+
+        :param requests: Dictionary with a unique custom id for every request.
+        :param batch_file: Path of the JSONL file to write the requests to.
+        :return: Dictionary with the custom ids of the successful requests as keys and the parsed
+            responses (or raw text for requests without a parser) as values.
+        :rtype: dict
+        """
+        if not requests:
+            return {}
+
+        batch_id = self.submit(self.write_batch_file(requests, batch_file))
+        logger.info("Submitted batch %s with %s requests.", batch_id, len(requests))
+
+        status = self.status(batch_id)
+        while status not in BATCH_FINAL_STATUSES:
+            logger.info("Batch %s is %s, checking again in %s seconds.", batch_id, status, self.poll_interval)
+            time.sleep(self.poll_interval)
+            status = self.status(batch_id)
+
+        if status != "completed":
+            logger.error("Batch %s finished with status: %s", batch_id, status)
+
+        results = {}
+        for line in self.fetch_output(batch_id):
+            custom_id = line.get("custom_id")
+            request = requests.get(custom_id)
+            response = line.get("response") or {}
+            if request is None or line.get("error") or response.get("status_code") != 200:
+                logger.error("Batch request %s failed: %s", custom_id, line.get("error"))
+                continue
+
+            text = response["body"]["choices"][0]["message"]["content"]
+            try:
+                results[custom_id] = request.parser.parse(text) if request.parser else text
+            except Exception as e:
+                logger.error("Could not parse response of batch request %s: %s", custom_id, e)
+
+        return results
+
+
+class OpenAIBatchClient(BaseBatchClient):
+    """Batch client for the OpenAI Batch API."""
+
+    def __init__(self, model: str, poll_interval: float = 60, stage_models: dict = None):
+        super().__init__(model, poll_interval, stage_models)
+        from openai import OpenAI
+        self.client = OpenAI()
+
+    def submit(self, batch_file: Path) -> str:
+        with open(batch_file, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def fetch_output(self, batch_id: str) -> list[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = self.client.files.content(file_id).text
+                lines += [json.loads(line) for line in content.splitlines() if line.strip()]
+        return lines
+
+
+class LocalBatchClient(BaseBatchClient):
+    """
+    File based stand-in for a provider batch API, used for testing batch mode.
+    A submitted batch is copied into its own directory and executed with a regular LLM client
+    the first time its status is checked. The results are written in the same format as OpenAI's.
+    """
+
+    def __init__(self, llm_client: BaseLlm, batch_dir: Path, poll_interval: float = 0):
+        """
+        :param llm_client: LLM client that executes the requests.
+        :param batch_dir: Directory where the batches are stored.
+        """
+        super().__init__(getattr(llm_client, "model", "local"), poll_interval)
+        self.llm_client = llm_client
+        self.batch_dir = Path(batch_dir)
+
+    def submit(self, batch_file: Path) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batch_path = self.batch_dir / batch_id
+        batch_path.mkdir(parents=True, exist_ok=True)
+        (batch_path / "input.jsonl").write_text(Path(batch_file).read_text())
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch_path = self.batch_dir / batch_id
+        if not (batch_path / "output.jsonl").exists():
+            self._execute(batch_path)
+        return "completed"
+
+    def fetch_output(self, batch_id: str) -> list[dict]:
+        with open(self.batch_dir / batch_id / "output.jsonl") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _execute(self, batch_path: Path) -> None:
+        """Runs every request of the batch and writes the results to output.jsonl."""
+        with open(batch_path / "input.jsonl") as f_in, open(batch_path / "output.jsonl", "w") as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                result = {"id": uuid.uuid4().hex, "custom_id": request["custom_id"], "response": None, "error": None}
+                try:
+                    content = request["body"]["messages"][0]["content"]
+                    message = self.llm_client.get_llm(request["body"]["model"]).invoke(content)
+                    result["response"] = {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"role": "assistant", "content": message.content}}]},
+                    }
+                except Exception as e:
+                    result["error"] = {"message": str(e)}
+                f_out.write(json.dumps(result) + "\n")
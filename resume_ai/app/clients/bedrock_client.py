@@ -5,8 +5,9 @@ from resume_ai.clients.base_llm_client import BaseLlm
 
 class BedrockClient(BaseLlm):
     """Wrapper for Large language models."""
+    model = 'anthropic.claude-3-5-sonnet-20240620-v1:0'
 
-    def connect(self):
+    def connect(self, model: str = None):
         region = 'eu-central-1'
 
         client = boto3.client(
@@ -18,7 +19,7 @@ class BedrockClient(BaseLlm):
             client=client,
             region_name=region,
             provider='anthropic',
-            model_id='anthropic.claude-3-5-sonnet-20240620-v1:0',
+            model_id=model or self.model,
             model_kwargs={
                 "temperature": 0,
                 "max_tokens": 16000,
@@ -0,0 +1,156 @@
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M input and output tokens
+DEFAULT_MODEL_PRICES = {
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "anthropic.claude-3-5-sonnet-20240620-v1:0": (3.0, 15.0),
+}
+
+# Stages that can be skipped without losing the tailored resume
+OPTIONAL_STAGES = ("create_cover_letter", "match_resumes_to_job")
+
+# Spend of the current job, shared by the threads of its stages
+_job_usage: ContextVar[Optional[dict]] = ContextVar("job_usage", default=None)
+
+
+class BudgetExceededError(Exception):
+    """Raised when an LLM call would exceed the run or job budget."""
+
+
+class BudgetGovernor:
+    """
+    Tracks the tokens and estimated cost of all LLM calls of a run and enforces a spend ceiling.
+
+    Config keys:
+    - `budget_run_usd`: ceiling for the whole run. No ceiling if not set.
+    - `budget_job_usd`: ceiling per job. No ceiling if not set.
+    - `budget_skip_optional_at`: share of the run budget after which optional stages (cover letter,
+      resume scoring) are skipped. Default 0.7.
+    - `budget_fallback_model_at`: share of the run budget after which every stage uses `budget_fallback_model`.
+      Default 0.85.
+    - `model_prices`: USD per 1M input and output tokens per model, ex: `{"gpt-4o": [2.5, 10]}`.
+
+    Once the run budget is used up, every further call raises `BudgetExceededError`.
+    """
+
+    def __init__(self, config: dict = None) -> None:
+        config = config or {}
+        self.run_limit = config.get("budget_run_usd")
+        self.job_limit = config.get("budget_job_usd")
+        self.skip_optional_at = config.get("budget_skip_optional_at", 0.7)
+        self.fallback_model_at = config.get("budget_fallback_model_at", 0.85)
+        self.fallback_model = config.get("budget_fallback_model", "gpt-4o-mini")
+        self.prices = {**DEFAULT_MODEL_PRICES, **{k: tuple(v) for k, v in config.get("model_prices", {}).items()}}
+
+        self.usage = {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+        # Called with every recorded usage, ex: to store it in the database
+        self.usage_sink: Optional[Callable[[dict], None]] = None
+        self._lock = threading.Lock()
+
+    def start_job(self) -> None:
+        """Starts tracking the spend of a new job in the current context."""
+        _job_usage.set({"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+
+    def job_usage(self) -> dict:
+        """Returns the tokens and cost of the current job."""
+        return dict(_job_usage.get() or {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+
+    def run_share(self) -> float:
+        """Share of the run budget that is spent, 0 if there is no run budget."""
+        if not self.run_limit:
+            return 0.0
+        return self.usage["cost_usd"] / self.run_limit
+
+    def is_exhausted(self) -> bool:
+        """True once the run budget is used up."""
+        return bool(self.run_limit) and self.run_share() >= 1
+
+    def allows_stage(self, stage: str) -> bool:
+        """
+        Checks if a stage should run at the current spend. Optional stages are skipped when
+        the run budget is nearly used up.
+        """
+        if stage in OPTIONAL_STAGES and self.run_share() >= self.skip_optional_at:
+            logger.info("Skipping optional stage '%s' to stay within budget.", stage)
+            return False
+        return not self.is_exhausted()
+
+    def model_override(self) -> Optional[str]:
+        """Returns the cheaper model every stage should use once the budget runs low, otherwise None."""
+        if self.run_limit and self.run_share() >= self.fallback_model_at:
+            return self.fallback_model
+        return None
+
+    def check(self, stage: str) -> None:
+        """
+        Raises `BudgetExceededError` if a call for the stage is not allowed anymore.
+        """
+        if self.is_exhausted():
+            raise BudgetExceededError(f"Run budget of ${self.run_limit} is used up, not running stage '{stage}'.")
+
+        job_usage = _job_usage.get()
+        if self.job_limit and job_usage and job_usage["cost_usd"] >= self.job_limit:
+            raise BudgetExceededError(f"Job budget of ${self.job_limit} is used up, not running stage '{stage}'.")
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Estimates the cost of a call in USD. Unknown models are priced like the most expensive known one."""
+        input_price, output_price = self.prices.get(model) or max(self.prices.values())
+        return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def record(self, stage: str, model: str, input_tokens: int, output_tokens: int) -> None:
+        """
+        Records the token usage of a call for the run and the current job.
+        """
+        cost = self.cost(model, input_tokens, output_tokens)
+        entry = {"stage": stage, "model": model, "input_tokens": input_tokens, "output_tokens": output_tokens, "cost_usd": cost}
+
+        with self._lock:
+            for usage in (self.usage, _job_usage.get()):
+                if usage is None:
+                    continue
+                usage["input_tokens"] += input_tokens
+                usage["output_tokens"] += output_tokens
+                usage["cost_usd"] += cost
+
+        logger.debug("LLM usage: %s", entry)
+        if self.usage_sink:
+            try:
+                self.usage_sink(entry)
+            except Exception as e:
+                logger.error("Could not store LLM usage: %s", e)
+
+    def callback(self, stage: str, model: str) -> "UsageCallback":
+        """Returns a LangChain callback recording the usage of a call."""
+        return UsageCallback(self, stage, model)
+
+
+class UsageCallback(BaseCallbackHandler):
+    """LangChain callback that reports the token usage of a finished LLM call to the budget governor."""
+
+    def __init__(self, governor: BudgetGovernor, stage: str, model: str) -> None:
+        self.governor = governor
+        self.stage = stage
+        self.model = model
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        input_tokens, output_tokens = 0, 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+
+        if not input_tokens and not output_tokens:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = token_usage.get("prompt_tokens", 0)
+            output_tokens = token_usage.get("completion_tokens", 0)
+
+        self.governor.record(self.stage, self.model, input_tokens, output_tokens)
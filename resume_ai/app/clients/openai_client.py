@@ -4,9 +4,10 @@ from resume_ai.app.clients.base_llm_client import BaseLlm
 
 class OpenAIClient(BaseLlm):
     """Wrapper for Large language models."""
+    model = "gpt-4o"
 
-    def connect(self):
+    def connect(self, model: str = None):
 
-        client = ChatOpenAI(temperature=0, model="gpt-4o")
-        logging.info(f"LLM is set to OpenAI")
+        client = ChatOpenAI(temperature=0, model=model or self.model)
+        logging.info(f"LLM is set to OpenAI {model or self.model}")
         return client
@@ -8,4 +8,9 @@ JOBS_DIR_PATH = USER_DATA_DIR_PATH / "jobs"
 JOBS_FILE = "jobs.json"
 JOBS_PROCESSED_DIR_PATH = JOBS_DIR_PATH / "processed"
 RESUMES_OLD_DIR_PATH = USER_DATA_DIR_PATH / "resumes"
+EXPORTS_DIR_PATH = USER_DATA_DIR_PATH / "exports"
 RESUMES_NEW_YAML_DIR_PATH = APP_DATA_DIR_PATH / "resumes_yaml"
+BATCHES_DIR_PATH = APP_DATA_DIR_PATH / "batches"
+BASE_RESUMES_DIR_PATH = APP_DATA_DIR_PATH / "base_resumes"
+RESUME_INDEX_DIR_PATH = APP_DATA_DIR_PATH / "resume_index"
+JOB_QUEUE_FILE = APP_DATA_DIR_PATH / "job_queue.json"
@@ -1,11 +1,15 @@
 import os
 import re
+import queue
+import hashlib
+import threading
 import yaml
 import json
 import subprocess
 import shutil
 import logging
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 from langchain_community.document_loaders import PyPDFLoader
 from rich.console import Console
 from rich.table import Table
@@ -122,24 +126,102 @@ def load_txt_files_from_directory(directory_path):
     Returns:
         list: A list of dictionaries, each containing 'file_name' and 'content' keys.
     """
-    parsed_files = []
+    return list(stream_txt_files(directory_path, dedupe=False))
 
-    # Iterate through all files in the directory
-    for file_name in os.listdir(directory_path):
-        if file_name.endswith(".txt"):
-            file_path = os.path.join(directory_path, file_name)
 
-            # Open and read the file content
-            with open(file_path, 'r') as file:
-                content = file.read()
+def iter_txt_files(directory_path) -> Iterator[str]:
+    """
+    Lazily lists the names of the .txt files in a directory, without reading them.
+
+    :param directory_path: Path to the directory containing .txt files.
+    :return: Iterator over the file names.
+    """
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".txt") and entry.is_file():
+                yield entry.name
 
-            # Add parsed content and file name to the list
-            parsed_files.append({
-                'file_name': file_name,
-                'content': content
-            })
 
-    return parsed_files
+def read_txt_file(directory_path, file_name: str) -> dict:
+    """
+    Reads a single job description file.
+
+    :return: Dictionary with the 'file_name' and 'content' keys.
+    """
+    with open(os.path.join(directory_path, file_name), 'r') as file:
+        return {'file_name': file_name, 'content': file.read()}
+
+
+def stream_txt_files(
+        directory_path,
+        file_names: Iterable[str] = None,
+        prefetch: int = 8,
+        dedupe: bool = True,
+        on_duplicate: Callable[[dict, str], None] = None
+) -> Iterator[dict]:
+    """
+    Reads .txt files lazily, in order, while the caller works on the previous ones.
+    A background thread reads ahead at most `prefetch` files, so memory stays the same however many files there are.
+    Files that were moved or deleted in the meantime are skipped.
+
+    :param directory_path: Path to the directory containing .txt files.
+    :param file_names: The files to read, in this order. Default is all .txt files of the directory.
+    :param prefetch: Maximum number of files read ahead.
+    :param dedupe: Skip files with the same content as an earlier file.
+    :param on_duplicate: Called with a skipped file and the name of the earlier file with the same content,
+        ex: to move it out of the way so it is not read again by the next run.
+    :return: Iterator over dictionaries with the 'file_name' and 'content' keys.
+    """
+    if file_names is None:
+        file_names = iter_txt_files(directory_path)
+
+    files = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                files.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read_ahead():
+        try:
+            for file_name in file_names:
+                try:
+                    job_data = read_txt_file(directory_path, file_name)
+                except FileNotFoundError:
+                    continue
+                if not put(job_data):
+                    return
+        except Exception as e:
+            put(e)
+        put(done)
+
+    reader = threading.Thread(target=read_ahead, daemon=True)
+    reader.start()
+
+    seen = {}
+    try:
+        while (job_data := files.get()) is not done:
+            if isinstance(job_data, Exception):
+                raise job_data
+            if dedupe:
+                digest = hashlib.sha1(job_data['content'].strip().encode('utf-8')).digest()
+                if digest in seen:
+                    logging.info("Skipping %s, it has the same content as %s.", job_data['file_name'], seen[digest])
+                    if on_duplicate is not None:
+                        on_duplicate(job_data, seen[digest])
+                    continue
+                seen[digest] = job_data['file_name']
+            yield job_data
+    finally:
+        # also stops the reader when the caller stops early
+        stop.set()
+
 
 def run_shell_cmd(cmd):
     """
@@ -384,6 +466,59 @@ def display_job_to_user_req_matching_scores(response):
     # Print everything with some spacing
     console.print(score_table, justify="left")
 
+def display_job_report(stats: list[dict], histogram: list[int], score: str, matches: list[dict] = None):
+    """
+    Displays the job counts per batch and status, the distribution of a score and, optionally, the jobs found by a search.
+
+    :param stats: Rows as returned by `JobLogger.get_job_stats`.
+    :param histogram: Number of jobs per score bucket as returned by `JobLogger.get_score_histogram`.
+    :param score: Name of the score of the histogram and of the matching jobs. The job counts always show the
+        average `job_match_score`, the only score kept per batch.
+    :param matches: Jobs as returned by `JobLogger.search_jobs`.
+    :return: None
+    """
+    console = Console()
+
+    stats_table = Table(title="Jobs per Batch", box=box.ROUNDED, show_header=True, header_style="bold cyan")
+    for column in ("Started", "Batch", "Profile", "Status", "Jobs", "Avg job_match_score", "LLM Cost"):
+        stats_table.add_column(column, style="cyan" if column in ("Started", "Batch") else "magenta")
+    for row in stats:
+        avg_score = row['avg_job_match_score']
+        stats_table.add_row(
+            (row['started_ts'] or "")[:16],
+            row['batch_id'][:8],
+            row['profile_filename'],
+            row['status'],
+            str(row['jobs']),
+            f"{avg_score * 100:.1f}%" if avg_score is not None else "-",
+            f"${row['llm_cost_usd']:.2f}",
+        )
+    console.print(stats_table, justify="left")
+
+    histogram_table = Table(title=f"Distribution of {score}", box=box.ROUNDED, show_header=True, header_style="bold cyan")
+    histogram_table.add_column("Score", style="cyan")
+    histogram_table.add_column("Jobs", style="magenta")
+    histogram_table.add_column("", style="green")
+    most = max(histogram) or 1
+    for bucket, jobs in enumerate(histogram):
+        histogram_table.add_row(f"{bucket / 10:.1f} - {(bucket + 1) / 10:.1f}", str(jobs), "#" * round(40 * jobs / most))
+    console.print(histogram_table, justify="left")
+
+    if matches is not None:
+        matches_table = Table(title="Matching Jobs", box=box.ROUNDED, show_header=True, header_style="bold cyan")
+        for column in ("Id", "Title", "Status", score, "URL"):
+            matches_table.add_column(column, style="cyan" if column == "Id" else "magenta")
+        for job in matches:
+            job_score = job[score]
+            matches_table.add_row(
+                str(job['id']),
+                job['job_title'],
+                job['status'],
+                f"{job_score * 100:.1f}%" if job_score is not None else "-",
+                job['url'] or "",
+            )
+        console.print(matches_table, justify="left")
+
 def display_resumes_to_job_matching_scores(response):
     """
     Displays a comparison of matching scores between an old and a new resume,
@@ -66,7 +66,7 @@ class CVRoot(BaseModel):
 class ResumeJobMatchScore(BaseModel):
     old_resume_match_score: float = Field(..., description="Score indicating how well the old resume matches the job description, ranging from 0 to 1 as a float.")
     new_resume_match_score: float = Field(..., description="Score indicating how well the new resume matches the job description, ranging from 0 to 1 as a float.")
-    description: float = Field(..., description="Add here any evaluation text that you feel is important.")
+    description: str = Field(..., description="Add here any evaluation text that you feel is important.")
 
 class UserJobMatchScore(BaseModel):
     job_positives: str = Field(..., description="Short list of explicitly mentioned job properties that match users requirements. Do not include ")
@@ -83,4 +83,10 @@ class ResumeImprovements(BaseModel):
 class JobDetails(BaseModel):
     is_active: bool = Field(..., description="True or False indicating whether the job is active or not.")
     job_title: Optional[str] = Field(..., description="The title of the job.")
-    job_description: Optional[str] = Field(..., description="The full text of the job description.")
\ No newline at end of file
+    job_description: Optional[str] = Field(..., description="The full text of the job description.")
+
+class JobAnalysis(JobRequirements, ResumeImprovements):
+    """Job requirements and resume improvements produced by a single fused analysis request."""
+
+class JobAnalysisWithMatch(JobAnalysis, UserJobMatchScore):
+    """Fused analysis that also matches the job to the user requirements."""
@@ -42,9 +42,9 @@ Add 2 new line breaks between paragraphs
 {resume}
 ```
 
-## Job Description:
+## Key requirements of the job:
 ```
-{job_description}
+{job_requirements}
 ```
 """
 
@@ -172,3 +172,108 @@ If you find that this is not a valid job description, return "False" in the resp
 ## Format instructions:
 {format_instructions}
 """
+
+ANALYZE_JOB_PROMPT = """
+Act as a critical recruiter for the position of {job_title}.
+Examine the Job Description below and provide back all of the following in a single response.
+
+1. The key requirements for the job as well as a list of keywords or key sentences that should exist in a successful candidate's resume.
+Look for elements that are explicitly mentioned in the job description in multiple places or are strongly implied.
+Keep this part short and concise.
+
+2. A list of improvements to the User Resume that would make it more relevant to the job description.
+Use the same verbiage and keywords in your recommendation as in the job description.
+{user_preferences_instructions}
+Your response must adhere to the format stated below in the section "Format instructions".
+
+## User Resume:
+```
+{user_resume}
+```
+{user_preferences}
+## Job Description:
+```
+{job_description}
+```
+
+## Format instructions:
+{format_instructions}
+"""
+
+ANALYZE_JOB_USER_PREFERENCES_INSTRUCTIONS = """
+3. The overall score of how well the Job Description matches the User Personal Information, User Work Preferences and User Job Preferences.
+- Do not make assumptions for something that is not explicitly present in the the job description.
+- If user requirement or preference is not explicitly defined in the job description, and you cannot extrapolate it with a high degree of certainty, there is no impact the match score.
+- If some requirements of the job are not explicitly mentioned by the user in preferences, there is no impact the match score.
+- Consider user description in evaluating the match score. For example, a junior role is unlikely to fit a user with many years of experience.
+- Only include explicitly mentioned parameters, or strongly implied parameters, in your evaluation and your response.
+"""
+
+ANALYZE_JOB_USER_PREFERENCES = """
+## User Personal Information:
+```
+{personal_info}
+```
+
+## User Work Preferences:
+```
+{work_preferences}
+```
+
+## User Job Preferences:
+```
+{job_requirements}
+```
+"""
+
+PARSE_RESUME_PROMPT = """
+Convert my resume below into the structure described in the format instructions.
+Copy the content as it is. Do not add, rewrite or summarize anything.
+You can omit any attributes that are not applicable to my resume.
+
+## My resume:
+```
+{resume}
+```
+
+## Format instructions:
+{format_instructions}
+"""
+
+RESUME_SECTION_TO_JOB_PROMPT = """
+I would like you to adapt the `{section}` section of my resume to a job description for a job: {job_title}.
+You can only re-use the elements that exist in my current resume.
+Do not invent skills or knowledge that is not strongly implied from my current resume.
+Keep the same structure of each entry. You can reorder, shorten or reword entries to match the job description.
+{custom_instructions}
+
+## My current `{section}` section:
+```
+{section_content}
+```
+
+## Job Description:
+```
+{job_description}
+```
+
+## Format instructions:
+{format_instructions}
+"""
+
+REPAIR_RESUME_FRAGMENT_PROMPT = """
+A part of my resume failed validation. Fix only the problems listed below and keep everything else as it is.
+Do not add content that is not already in the fragment.
+Dates must be in YYYY-MM-DD, YYYY-MM or YYYY format, or "present" for an end date.
+
+## Fragment `{path}`:
+```
+{fragment}
+```
+
+## Validation errors:
+{errors}
+
+## Format instructions:
+Return a JSON object with a single key "fragment" containing the fixed fragment, with the same structure as the original.
+"""
@@ -1,8 +1,11 @@
 import logging
 import os
+import argparse
 import datetime
+import itertools
 
 from pathlib import Path
+from typing import Iterable
 
 # Third-party imports
 from langchain.globals import set_verbose
@@ -11,47 +14,100 @@ from langchain.globals import set_verbose
 from resume_ai.app.classes.context import RunContext
 from resume_ai.app.clients.openai_client import OpenAIClient
 from resume_ai.app.classes.job_manager import JobManager
-from resume_ai.app.classes.sqlite_logger import JobLogger
+from resume_ai.app.classes.sqlite_logger import JobLogger, SCORE_COLUMNS
+from resume_ai.app.classes.batch_runner import BatchRunner, BatchJob
+from resume_ai.app.classes.job_prioritizer import JobPrioritizer
+from resume_ai.app.classes.work_queue import get_work_queue, QUEUE_DONE
+from resume_ai.app.classes.queue_worker import QueueWorker
+from resume_ai.app.classes.job_watcher import JobWatcher
+from resume_ai.app.classes.job_exporter import JobExporter, EXPORT_TABLES, EXPORT_FORMATS
+from resume_ai.app.classes.resume_selector import ResumeSelector
+from resume_ai.app.clients.batch_client import BaseBatchClient, OpenAIBatchClient, LocalBatchClient
 from resume_ai.app.funcs import (
     load_yaml,
     load_pdf,
     load_json,
-    load_txt_files_from_directory,
+    iter_txt_files,
+    read_txt_file,
+    stream_txt_files,
     move_processed_job,
     run_shell_cmd,
     update_key_in_place,
     filter_unprocessed_jobs,
-    get_clean_user_name
+    get_clean_user_name,
+    display_job_report
 )
 from resume_ai.app.constants import (
     JOBS_DIR_PATH,
     RESUMES_OLD_DIR_PATH,
     JOBS_FILE,
+    BATCHES_DIR_PATH,
+    JOB_QUEUE_FILE,
+    EXPORTS_DIR_PATH,
+    RESUME_INDEX_DIR_PATH,
 )
 
 
-def main() -> None:
+def main(args: argparse.Namespace = None) -> None:
     """
     Main entry point for processing the user's resumes/jobs based on configuration.
+
+    :param args: Command line arguments, see `parse_args`. Without a command, all pending jobs are processed.
     """
+    command = getattr(args, "command", None) or "run"
     config_data = load_json("config.json")
+    if config_data.get("profiles"):
+        # the first profile is the default, ex: for the batch settings of the job log
+        config_data.setdefault("profile_filename", config_data["profiles"][0])
 
     context = RunContext(
         db_client=JobLogger(config_data),
-        llm_client = OpenAIClient(),
+        llm_client = OpenAIClient(config_data),
         run_log_file = Path(f"""logs/run_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.md"""),
         config_data = config_data
     )
 
-    base_cv_cmd = (
-        f'rendercv new "{context.config_data.get("name")}" '
-        f'--theme "{context.config_data.get("theme")}"'
-    )
-    run_shell_cmd(base_cv_cmd)
+    # Store the token usage of every LLM call with the batch and the current job
+    context.llm_client.budget.usage_sink = context.db_client.log_llm_usage
+
+    if command == 'compact':
+        context.db_client.compact(train_dictionary=args.train_dictionary)
+        return
+
+    if command == 'export':
+        exporter = JobExporter(context.db_client, EXPORTS_DIR_PATH)
+        for table in [args.table] if args.table else EXPORT_TABLES:
+            exporter.export(
+                table,
+                file_format=args.format,
+                # columns of the job log only
+                columns=args.columns.split(",") if args.columns and table == "job_log" else None,
+                incremental=not args.full
+            )
+        return
+
+    if command == 'report':
+        db_client = context.db_client
+        display_job_report(
+            db_client.get_job_stats(batch_id=args.batch, profile_filename=args.profile),
+            db_client.get_score_histogram(args.score, batch_id=args.batch, profile_filename=args.profile),
+            args.score,
+            db_client.search_jobs(args.search, args.min_score, args.score, args.batch, args.limit) if args.search else None
+        )
+        return
 
     # Prepare the username & load the template YAML
     user_name = get_clean_user_name(context.config_data.get("name"))
     yaml_template_cv = f"{user_name}_CV.yaml"
+
+    # the template only has to be created again when the theme changes
+    if not os.path.exists(yaml_template_cv) or load_yaml(yaml_template_cv).get('design', {}).get('theme') != context.config_data.get("theme"):
+        base_cv_cmd = (
+            f'rendercv new "{context.config_data.get("name")}" '
+            f'--theme "{context.config_data.get("theme")}"'
+        )
+        run_shell_cmd(base_cv_cmd)
+
     example_yaml = load_yaml(yaml_template_cv)
 
     # Fix up 'welcome_to_RenderCV!' section if it exists
@@ -70,6 +126,16 @@ def main() -> None:
     # Load the old resume
     current_resume = load_pdf(RESUMES_OLD_DIR_PATH / context.config_data.get('resume_filename'))
 
+    # Index all resumes to start every job from the best matching one
+    resume_selector = None
+    if context.config_data.get("select_base_resume", True) and not context.config_data.get("batch_mode", False):
+        resume_selector = ResumeSelector(
+            RESUMES_OLD_DIR_PATH,
+            RESUME_INDEX_DIR_PATH,
+            default_filename=context.config_data.get('resume_filename'),
+            margin=context.config_data.get("resume_selection_margin", 0.02)
+        )
+
     # Set up an LLM client
 
     logging.info("Running in '%s' mode.", context.config_data.get('mode'))
@@ -78,28 +144,68 @@ def main() -> None:
     job_mgr = JobManager(
         context=context,
         current_resume=current_resume,
-        example_yaml=example_yaml
+        example_yaml=example_yaml,
+        resume_selector=resume_selector
     )
 
+    batch_runner = None
+    if context.config_data.get("batch_mode", False):
+        batch_runner = BatchRunner(job_mgr, get_batch_client(context), BATCHES_DIR_PATH)
+
+    prioritizer = None
+    # ranking reads every new job file before the first job starts, so files are streamed unranked by default
+    if context.config_data.get("prioritize_jobs", context.config_data.get("mode") != "files"):
+        prioritizer = JobPrioritizer(
+            profile=[*(job_mgr.load_user_profile(profile_filename) for profile_filename in job_mgr.profiles), current_resume],
+            queue_file=JOB_QUEUE_FILE,
+            weights=context.config_data.get("priority_weights"),
+            source_weights=context.config_data.get("priority_sources"),
+            recency_half_life_days=context.config_data.get("priority_recency_half_life_days", 7)
+        )
+
+    if command == 'enqueue':
+        enqueue_jobs(context, prioritizer)
+        return
+
+    if command == 'worker':
+        worker = QueueWorker(
+            job_mgr,
+            get_work_queue(context.config_data, context.db_client.db_path),
+            lease_seconds=context.config_data.get("work_queue_lease_seconds", 900),
+            poll_interval=context.config_data.get("work_queue_poll_interval_seconds", 10),
+            exit_when_empty=not args.wait
+        )
+        worker.run()
+        job_mgr.finish_background_work()
+        return
+
+    if command == 'watch':
+        watch_jobs(context, job_mgr, batch_runner)
+        return
+
+    if command == 'serve':
+        from resume_ai.app.classes.api_server import run_api
+        run_api(
+            job_mgr,
+            host=args.host or context.config_data.get("api_host", "127.0.0.1"),
+            port=args.port or context.config_data.get("api_port", 8000),
+            concurrency=context.config_data.get("api_concurrency", 2),
+            max_queue=context.config_data.get("api_max_queued_jobs", 100),
+            finished_ttl=context.config_data.get("api_job_ttl_seconds", 3600),
+            max_finished=context.config_data.get("api_max_finished_jobs", 1000)
+        )
+        return
+
     # Process job descriptions
     if context.config_data.get("mode") == 'files':
-        job_descriptions = load_txt_files_from_directory(JOBS_DIR_PATH)
+        file_names = iter_txt_files(JOBS_DIR_PATH)
+        first_file = next(file_names, None)
 
-        if not job_descriptions:
+        if first_file is None:
             logging.error("No job descriptions found in the job_descriptions directory.")
             raise SystemExit(1)
 
-        for job_data in job_descriptions:
-            context.db_client.clear_job_data()
-            job_title = os.path.splitext(job_data['file_name'])[0]
-            job_description = job_data['content']
-            context.write_output(f"""## Title: {job_title}""")
-
-            success = job_mgr.process_job(job_title, job_title, job_description)
-
-            # Move the processed file
-            if success:
-                move_processed_job(context.config_data.get("mode"), job_data['file_name'])
+        process_files(context, job_mgr, itertools.chain([first_file], file_names), prioritizer, batch_runner)
 
     elif context.config_data.get("mode") == 'links':
         links = load_json(JOBS_DIR_PATH / JOBS_FILE)
@@ -118,43 +224,335 @@ def main() -> None:
             logging.error("All urls on the list have been processed before.")
             raise SystemExit(1)
 
-        # If useragent is not set, set it
-        user_agent = os.environ.get('USER_AGENT', None)
-        if not user_agent:
-            os.environ['USER_AGENT'] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        process_links(context, job_mgr, unprocessed_unique_links, prioritizer, batch_runner)
+
+    # cover letters are written in the background
+    job_mgr.finish_background_work()
+    if prioritizer:
+        prioritizer.flush()
+
+    usage = context.db_client.get_batch_usage()
+    logging.info(
+        "LLM usage: %s input tokens, %s output tokens, estimated cost $%.2f",
+        usage['input_tokens'], usage['output_tokens'], usage['cost_usd']
+    )
+    context.report.close()
+    logging.info(f"Output saved to {context.run_log_file}")
+
+
+def process_files(
+        context: RunContext,
+        job_mgr: JobManager,
+        file_names: Iterable[str],
+        prioritizer: JobPrioritizer = None,
+        batch_runner: BatchRunner = None
+) -> list[str]:
+    """
+    Processes job description files and moves the successful ones to processed.
+    Files are read lazily while the jobs are processed, at most `files_prefetch` (default 8) ahead,
+    and files with the same content as an earlier one are skipped.
+
+    :param file_names: Names of the job files in the jobs directory.
+    :return: The file names of the jobs that were processed successfully.
+    """
+    mode = context.config_data.get("mode")
+    processed = []
+
+    if prioritizer:
+        # only the names are kept, new files are read one at a time to score them
+        file_names = prioritizer.rank(mode, {
+            file_name: {
+                'text': lambda file_name=file_name: job_text(read_txt_file(JOBS_DIR_PATH, file_name)),
+                'added_ts': os.path.getmtime(JOBS_DIR_PATH / file_name),
+            }
+            for file_name in file_names
+        })
+
+    job_descriptions = stream_txt_files(
+        JOBS_DIR_PATH,
+        file_names,
+        prefetch=context.config_data.get("files_prefetch", 8),
+        on_duplicate=lambda job_data, original: skip_duplicate_job(context, job_data, original, prioritizer)
+    )
+
+    if batch_runner:
+        # a batch holds all jobs anyway
+        batch_jobs = []
+        for job_data in job_descriptions:
+            job_title = os.path.splitext(job_data['file_name'])[0]
+            batch_jobs.append(BatchJob(job_data['file_name'], job_title, job_title, job_data['content']))
+
+        for file_name in batch_runner.run(batch_jobs):
+            move_processed_job(mode, file_name)
+            processed.append(file_name)
+            if prioritizer:
+                prioritizer.mark_done(mode, file_name)
+    else:
+        for job_data in job_descriptions:
+            if context.llm_client.budget.is_exhausted():
+                logging.warning("LLM budget is used up, stopping before %s.", job_data['file_name'])
+                break
+
+            context.db_client.clear_job_data()
+            context.llm_client.budget.start_job()
+            job_title = os.path.splitext(job_data['file_name'])[0]
+            job_description = job_data['content']
+            context.report.start_job(job_title)
+
+            success = job_mgr.process_job(job_title, job_title, job_description)
+            context.report.end_job(context.db_client.job_data.get('status'))
+
+            # Move the processed file
+            if success:
+                move_processed_job(mode, job_data['file_name'])
+                processed.append(job_data['file_name'])
+                if prioritizer:
+                    prioritizer.mark_done(mode, job_data['file_name'])
+
+    return processed
+
+
+def skip_duplicate_job(context: RunContext, job_data: dict, original: str, prioritizer: JobPrioritizer = None) -> None:
+    """
+    Records a job file with the same content as an earlier one in the run report and moves it to processed,
+    so it is not read again by every run.
+
+    :param job_data: The skipped job file, see `stream_txt_files`.
+    :param original: Name of the earlier file with the same content.
+    """
+    file_name = job_data['file_name']
+    job_title = os.path.splitext(file_name)[0]
+
+    context.report.start_job(job_title)
+    context.write_output(f" - Skipped, the job description is the same as in {original}")
+    context.report.end_job('duplicate job')
+
+    move_processed_job('files', file_name)
+    if prioritizer:
+        prioritizer.mark_done('files', file_name)
+
+
+def job_text(job_data: dict) -> str:
+    """Returns the title and description of a job file, as used for ranking."""
+    return f"{os.path.splitext(job_data['file_name'])[0]}\n{job_data['content']}"
 
-        from resume_ai.app.classes.url_crawler import URLCrawler
-        crawler = URLCrawler(context.llm_client)
-        crawled_descriptions = crawler.crawl_urls(unprocessed_unique_links)
 
+def process_links(
+        context: RunContext,
+        job_mgr: JobManager,
+        links: list[str],
+        prioritizer: JobPrioritizer = None,
+        batch_runner: BatchRunner = None
+) -> list[str]:
+    """
+    Crawls and processes job links and moves the successful ones to processed.
+
+    :param links: Links that have not been processed yet.
+    :return: The links of the jobs that were processed successfully.
+    """
+    processed = []
+
+    # If useragent is not set, set it
+    user_agent = os.environ.get('USER_AGENT', None)
+    if not user_agent:
+        os.environ['USER_AGENT'] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+    from resume_ai.app.classes.url_crawler import URLCrawler
+    crawler = URLCrawler(context.llm_client, context.config_data)
+    crawled_descriptions = crawler.crawl_urls(links)
+
+    if prioritizer:
+        ranking = prioritizer.rank(context.config_data.get("mode"), {
+            job.metadata.get("source"): {
+                'text': f"{job.metadata.get('title', '')}\n{job.page_content}",
+                'source': job.metadata.get("source"),
+            }
+            for job in crawled_descriptions
+        })
+        position = {job_id: i for i, job_id in enumerate(ranking)}
+        crawled_descriptions.sort(key=lambda job: position[job.metadata.get("source")])
+
+    if batch_runner:
+        batch_jobs = []
         for job in crawled_descriptions:
+            job_link = job.metadata.get("source")
+            job_title = job.metadata.get("title", "No Title Found")
+            batch_jobs.append(BatchJob(job_link, job_link, job_title, page_content=job.page_content))
+
+        for job_link in batch_runner.run(batch_jobs):
+            move_processed_job(context.config_data.get("mode"), job_link)
+            processed.append(job_link)
+            if prioritizer:
+                prioritizer.mark_done(context.config_data.get("mode"), job_link)
+    else:
+        for job in crawled_descriptions:
+            if context.llm_client.budget.is_exhausted():
+                logging.warning("LLM budget is used up, stopping before %s.", job.metadata.get("source"))
+                break
+
             context.db_client.clear_job_data()
+            context.llm_client.budget.start_job()
             job_link = job.metadata.get("source")
-            context.db_client.add_job_data('url', job_link)
             job_title = job.metadata.get("title", "No Title Found")
-            context.write_output(f"""## Title: {job_title}""")
-            context.write_output(f""" - [{job_link}]({job_link})""")
-
-            # check if job is active
-            url_check = job_mgr.check_url_job_active(job_link, job_title, job.page_content)
-            if not url_check.get('is_active') == True :
-                context.db_client.add_job_data('job_title', job_title)
-                context.db_client.add_job_data('status', 'inactive job')
-                context.db_client.insert_job()
-                context.write_output("\nJob is Inactive")
-                logging.info(f"Job is Inactive: {job_link}")
-                continue
-            else:
-                job_title = url_check.get('job_title')
-                job_description = url_check.get('job_description')
-
-            success = job_mgr.process_job(job_link, job_title, job_description)
+
+            success = job_mgr.process_link_job(job_link, job_title, job.page_content)
+            context.report.end_job(context.db_client.job_data.get('status'))
 
             # Move the processed job link
             if success:
                 move_processed_job(context.config_data.get("mode"), job_link)
+                processed.append(job_link)
+                if prioritizer:
+                    prioritizer.mark_done(context.config_data.get("mode"), job_link)
+
+    return processed
+
+
+def watch_jobs(context: RunContext, job_mgr: JobManager, batch_runner: BatchRunner = None) -> None:
+    """
+    Keeps running and processes new jobs as soon as they are added to the jobs directory or the jobs file.
+    Clients, the parsed resume and all caches stay loaded between jobs.
+    New jobs are processed in the order they arrive and are not ranked: each check only finds a few of them,
+    and ranking them alone would drop the rest of the ranked backlog from the job queue.
+    """
+    mode = context.config_data.get("mode")
+    # jobs that were attempted, failed jobs are only retried when their file changes
+    attempted = {}
+
+    def process_new_jobs():
+        if context.llm_client.budget.is_exhausted():
+            logging.warning("LLM budget is used up, not processing new jobs.")
+            return
+
+        if mode == 'files':
+            file_names = []
+            for file_name in iter_txt_files(JOBS_DIR_PATH):
+                try:
+                    mtime = os.path.getmtime(JOBS_DIR_PATH / file_name)
+                except FileNotFoundError:
+                    continue
+                if attempted.get(file_name) != mtime:
+                    attempted[file_name] = mtime
+                    file_names.append(file_name)
+            if file_names:
+                process_files(context, job_mgr, file_names, batch_runner=batch_runner)
+        else:
+            links = filter_unprocessed_jobs(list(set(load_json(JOBS_DIR_PATH / JOBS_FILE))), context.db_client.get_distinct_links())
+            links = [link for link in links if link not in attempted]
+            attempted.update(dict.fromkeys(links))
+            if links:
+                process_links(context, job_mgr, links, batch_runner=batch_runner)
+
+    watched_path = JOBS_DIR_PATH if mode == 'files' else JOBS_DIR_PATH / JOBS_FILE
+    watcher = JobWatcher([watched_path], poll_interval=context.config_data.get("watch_poll_interval_seconds", 5))
+    logging.info("Watching %s for new jobs. Press Ctrl+C to stop.", watched_path)
+    try:
+        watcher.run(process_new_jobs)
+    except KeyboardInterrupt:
+        logging.info("Stopped watching for new jobs.")
+    job_mgr.finish_background_work()
+
+
+def enqueue_jobs(context: RunContext, prioritizer: JobPrioritizer = None) -> None:
+    """
+    Adds all pending jobs to the shared work queue for the workers, best matches first.
+    Jobs the workers have finished since the last call are moved to processed first.
+    """
+    mode = context.config_data.get("mode")
+    queue = get_work_queue(context.config_data, context.db_client.db_path)
+
+    if mode == 'files':
+        # the files are only read to rank new jobs and when they are added to the queue
+        pending = {
+            file_name: {
+                'title': os.path.splitext(file_name)[0],
+                'text': lambda file_name=file_name: job_text(read_txt_file(JOBS_DIR_PATH, file_name)),
+                'added_ts': os.path.getmtime(JOBS_DIR_PATH / file_name),
+            }
+            for file_name in iter_txt_files(JOBS_DIR_PATH)
+        }
+    else:
+        links = filter_unprocessed_jobs(list(set(load_json(JOBS_DIR_PATH / JOBS_FILE))), context.db_client.get_distinct_links())
+        # pages are crawled by the workers, so links are ranked without their content
+        pending = {link: {'title': link, 'text': link, 'source': link} for link in links}
+
+    # files still in the jobs directory, or links still in the jobs file
+    unmoved = set(pending) if mode == 'files' else set(load_json(JOBS_DIR_PATH / JOBS_FILE))
+    for job_key in queue.job_keys(mode, QUEUE_DONE):
+        if job_key in unmoved:
+            move_processed_job(mode, job_key)
+            pending.pop(job_key, None)
+        if prioritizer:
+            prioritizer.mark_done(mode, job_key)
+
+    priorities = {}
+    if prioritizer and pending:
+        prioritizer.rank(mode, pending)
+        priorities = {job_key: entry['score'] for job_key, entry in prioritizer.queue[mode].items()}
+
+    if mode == 'files':
+        job_files = stream_txt_files(
+            JOBS_DIR_PATH,
+            list(pending),
+            on_duplicate=lambda job_data, original: skip_duplicate_job(context, job_data, original, prioritizer)
+        )
+        payloads = ((job_data['file_name'], job_data['content']) for job_data in job_files)
+    else:
+        payloads = ((job_key, None) for job_key in pending)
+
+    added = queue.enqueue(
+        {
+            'job_key': job_key,
+            'mode': mode,
+            'title': pending[job_key]['title'],
+            'payload': payload,
+            'priority': priorities.get(job_key, 0),
+        }
+        for job_key, payload in payloads
+    )
+    logging.info("Added %s jobs to the work queue. Queue: %s", added, queue.counts())
+
+
+def get_batch_client(context: RunContext) -> BaseBatchClient:
+    """
+    Creates the batch client for the `batch_provider` set in the config.
+    """
+    poll_interval = context.config_data.get("batch_poll_interval_seconds", 60)
+    if context.config_data.get("batch_provider", "openai") == "local":
+        return LocalBatchClient(context.llm_client, BATCHES_DIR_PATH / "local", poll_interval=0)
+    # batches have no cascade, every stage uses its first model
+    stages = {**context.config_data.get("llm_models", {}), **context.config_data.get("llm_cascade", {})}
+    stage_models = {stage: context.llm_client.models_for_stage(stage)[0] for stage in stages}
+    return OpenAIBatchClient(context.llm_client.model, poll_interval=poll_interval, stage_models=stage_models)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tailor your resume to job descriptions.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="Process all pending jobs (default).")
+    commands.add_parser("watch", help="Keep running and process new jobs as soon as they are added.")
+    serve_parser = commands.add_parser("serve", help="Serve a local HTTP API for submitting jobs.")
+    serve_parser.add_argument("--host", help="Host to listen on, default is 'api_host' of the config or 127.0.0.1.")
+    serve_parser.add_argument("--port", type=int, help="Port to listen on, default is 'api_port' of the config or 8000.")
+    commands.add_parser("enqueue", help="Add all pending jobs to the shared work queue.")
+    worker_parser = commands.add_parser("worker", help="Process jobs from the shared work queue.")
+    worker_parser.add_argument("--wait", action="store_true", help="Wait for new jobs instead of stopping when the queue is empty.")
+    compact_parser = commands.add_parser("compact", help="Move the large texts of older jobs into the compressed blob store.")
+    compact_parser.add_argument("--train-dictionary", action="store_true", help="Train a zstd dictionary on the job descriptions first.")
+    report_parser = commands.add_parser("report", help="Show job counts, score distributions and search the job history.")
+    report_parser.add_argument("--search", help="Full-text query over job titles, descriptions and keywords, ex: kubernetes.")
+    report_parser.add_argument("--min-score", type=float, help="Only list jobs with at least this score.")
+    report_parser.add_argument("--score", default="job_match_score", choices=SCORE_COLUMNS, help="Score to show and filter by.")
+    report_parser.add_argument("--batch", help="Only this batch id.")
+    report_parser.add_argument("--profile", help="Only this profile file.")
+    report_parser.add_argument("--limit", type=int, default=50, help="Maximum number of jobs to list.")
+    export_parser = commands.add_parser("export", help="Export the job history to Parquet or Arrow files for analysis.")
+    export_parser.add_argument("--table", choices=EXPORT_TABLES, help="Table to export, default is all.")
+    export_parser.add_argument("--format", default="parquet", choices=list(EXPORT_FORMATS), help="File format, default is parquet.")
+    export_parser.add_argument("--columns", help="Comma separated columns of the job log to export, default is all but the large texts.")
+    export_parser.add_argument("--full", action="store_true", help="Export all rows to one file instead of the rows added since the last export.")
+    return parser.parse_args()
 
-    logging.info(f"Output saved to {context.run_log_file}")
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
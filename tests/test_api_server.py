@@ -0,0 +1,114 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from resume_ai.app.classes.api_server import ApiJob, JobService, create_app, API_FINISHED, API_FAILED, API_RUNNING
+
+
+def make_service(**kwargs) -> JobService:
+    return JobService(SimpleNamespace(context=None), **kwargs)
+
+
+def add_job(service: JobService, job_id: str, status: str, finished_ago: float = None) -> ApiJob:
+    job = ApiJob(id=job_id, title=job_id, status=status)
+    if finished_ago is not None:
+        job.finished_ts = time.time() - finished_ago
+    service.jobs[job_id] = job
+    return job
+
+
+def test_evict_finished_forgets_expired_jobs():
+    service = make_service(finished_ttl=60)
+    add_job(service, "expired", API_FINISHED, finished_ago=120)
+    add_job(service, "failed_expired", API_FAILED, finished_ago=61)
+    add_job(service, "recent", API_FINISHED, finished_ago=10)
+    add_job(service, "running", API_RUNNING)
+
+    service.evict_finished()
+
+    assert set(service.jobs) == {"recent", "running"}
+
+
+def test_evict_finished_keeps_the_newest_max_finished_jobs():
+    service = make_service(finished_ttl=3600, max_finished=2)
+    for i in range(5):
+        add_job(service, f"job{i}", API_FINISHED, finished_ago=50 - i)
+    add_job(service, "running", API_RUNNING)
+
+    service.evict_finished()
+
+    assert set(service.jobs) == {"job3", "job4", "running"}
+
+
+def test_evict_finished_combines_ttl_and_cap():
+    service = make_service(finished_ttl=60, max_finished=1)
+    add_job(service, "expired", API_FINISHED, finished_ago=100)
+    add_job(service, "older", API_FINISHED, finished_ago=20)
+    add_job(service, "newer", API_FINISHED, finished_ago=10)
+
+    service.evict_finished()
+
+    assert set(service.jobs) == {"newer"}
+
+
+class FakeService:
+    """Stands in for the JobService behind the HTTP handlers."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.submitted = []
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def submit(self, title, url=None, description=None):
+        self.submitted.append((title, url, description))
+        job = ApiJob(id=str(len(self.submitted)), title=title, url=url, description=description)
+        self.jobs[job.id] = job
+        return job
+
+
+async def post_jobs(bodies) -> tuple[list[int], FakeService]:
+    from aiohttp.test_utils import TestClient, TestServer
+
+    service = FakeService()
+    statuses = []
+    async with TestClient(TestServer(create_app(service))) as client:
+        for body in bodies:
+            response = await client.post("/jobs", data=body)
+            statuses.append(response.status)
+    return statuses, service
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"\xff",
+    b"[1, 2]",
+    b'"a job"',
+    b'{"url": 5}',
+    b'{"title": "Data Engineer", "description": ["python"]}',
+    b'{"title": "Data Engineer"}',
+])
+def test_submit_rejects_invalid_bodies(body):
+    statuses, service = asyncio.run(post_jobs([body]))
+
+    assert statuses == [400]
+    assert service.submitted == []
+
+
+def test_submit_queues_valid_jobs():
+    statuses, service = asyncio.run(post_jobs([
+        b'{"url": "https://example.com/job"}',
+        b'{"title": "Data Engineer", "description": "Python and SQL"}',
+    ]))
+
+    assert statuses == [202, 202]
+    assert service.submitted == [
+        ("https://example.com/job", "https://example.com/job", None),
+        ("Data Engineer", None, "Python and SQL"),
+    ]
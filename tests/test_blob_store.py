@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from resume_ai.app.classes.blob_store import BlobStore, MIN_COMPRESS_SIZE
+
+LONG_TEXT = "We are looking for a data engineer with Python, SQL and Spark – München, Zürich. " * 50
+
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = sqlite3.connect(tmp_path / "jobs.db")
+    yield connection
+    connection.close()
+
+
+def stored_codecs(connection) -> dict:
+    return dict(connection.execute("SELECT hash, codec FROM blobs").fetchall())
+
+
+@pytest.mark.parametrize("text", ["", "short text", LONG_TEXT])
+def test_round_trip(connection, text):
+    store = BlobStore(connection)
+
+    digest = store.put(text)
+    connection.commit()
+
+    assert digest == BlobStore.content_hash(text)
+    assert store.get(digest) == text
+
+
+def test_short_texts_are_not_compressed(connection):
+    store = BlobStore(connection)
+    short, long = store.put("x" * (MIN_COMPRESS_SIZE - 1)), store.put(LONG_TEXT)
+
+    codecs = stored_codecs(connection)
+
+    assert codecs[short] == "raw"
+    assert codecs[long] != "raw"
+    stats = store.stats()
+    assert stats["blobs"] == 2 and stats["stored_size"] < stats["size"]
+
+
+def test_same_text_is_stored_once(connection):
+    store = BlobStore(connection)
+
+    assert store.put(LONG_TEXT) == store.put(LONG_TEXT)
+    assert store.stats()["blobs"] == 1
+
+
+def test_missing_texts(connection):
+    store = BlobStore(connection)
+
+    assert store.put(None) is None
+    assert store.get(None) is None
+    assert store.get("unknown") is None
+
+
+def test_get_many_beyond_the_parameter_limit(connection):
+    store = BlobStore(connection)
+    texts = {store.put(f"job description {i} " * 10): f"job description {i} " * 10 for i in range(1200)}
+
+    assert store.get_many(list(texts) + [None]) == texts
+
+
+def test_zlib_is_used_without_zstandard(connection, monkeypatch):
+    monkeypatch.setattr(BlobStore, "_zstd", staticmethod(lambda: None))
+    store = BlobStore(connection)
+
+    digest = store.put(LONG_TEXT)
+
+    assert stored_codecs(connection)[digest] == "zlib"
+    assert store.get(digest) == LONG_TEXT
+
+
+def test_texts_stay_readable_after_training_a_dictionary(connection):
+    pytest.importorskip("zstandard")
+    store = BlobStore(connection)
+    before = store.put(LONG_TEXT)
+
+    samples = [f"Job {i}: data engineer in team {i % 7}, Python, SQL, Airflow, salary {i * 1000}." * 3 for i in range(500)]
+    dict_id = store.train_dictionary(samples, dict_size=4096)
+    after = store.put(samples[0] + " and one more line")
+
+    assert dict_id is not None
+    rows = dict(connection.execute("SELECT hash, dict_id FROM blobs").fetchall())
+    assert rows[before] is None and rows[after] == dict_id
+    # a new store loads the dictionary from the database
+    reopened = BlobStore(connection)
+    assert reopened.get(before) == LONG_TEXT
+    assert reopened.get(after) == samples[0] + " and one more line"
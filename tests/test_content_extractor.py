@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from resume_ai.app.classes.content_extractor import ContentExtractor
+
+PARAGRAPHS = "".join(
+    f"<p>We are looking for a data engineer, with Python, SQL and cloud experience, to build pipeline number {i}.</p>"
+    for i in range(10)
+)
+NAVIGATION = "<nav>" + "".join(f'<a href="/jobs/{i}">Other job {i}</a>' for i in range(30)) + "</nav>"
+SIMILAR_JOBS = '<div class="similar-jobs">' + "".join(
+    f'<div><a href="/jobs/{i}">Similar job {i}</a></div>' for i in range(30)
+) + "</div>"
+
+
+def job_page(head_end: str = "</head>") -> str:
+    return (
+        f"<html><head><title>Data Engineer - Jobs</title><meta charset='utf-8'>{head_end}"
+        f"<body>{NAVIGATION}<h1>Data Engineer</h1>"
+        f'<div class="job-description">{PARAGRAPHS}</div>'
+        f"{SIMILAR_JOBS}<footer>Copyright</footer></body></html>"
+    )
+
+
+@pytest.fixture
+def extractor():
+    return ContentExtractor(min_text_chars=200)
+
+
+def test_main_content_without_navigation(extractor):
+    content = extractor.extract(job_page())
+
+    assert content.method == "dom"
+    assert content.title == "Data Engineer"
+    assert "pipeline number 9" in content.text
+    assert "Other job" not in content.text
+    assert "Similar job" not in content.text
+    assert "Copyright" not in content.text
+    assert 0 < content.ratio < 1
+
+
+def test_page_without_closing_head(extractor):
+    content = extractor.extract(job_page(head_end=""))
+
+    assert content is not None
+    assert "pipeline number 9" in content.text
+
+
+def test_json_ld_job_posting_is_preferred(extractor):
+    posting = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "Organization", "name": "Acme"},
+            {"@type": "JobPosting", "title": "Senior Data Engineer", "description": PARAGRAPHS},
+        ],
+    }
+    page = job_page().replace("</head>", f'<script type="application/ld+json">{json.dumps(posting)}</script></head>')
+
+    content = extractor.extract(page)
+
+    assert content.method == "json_ld"
+    assert content.title == "Senior Data Engineer"
+    assert content.text.startswith("We are looking for a data engineer")
+    assert "<p>" not in content.text
+
+
+def test_invalid_json_ld_is_ignored(extractor):
+    page = job_page().replace("</head>", '<script type="application/ld+json">{not json</script></head>')
+
+    assert extractor.extract(page).method == "dom"
+
+
+def test_page_without_main_content_is_not_trusted(extractor):
+    page = f"<html><body>{NAVIGATION}<p>Short text.</p></body></html>"
+
+    assert extractor.extract(page) is None
+
+
+def test_page_is_parsed_in_chunks(extractor):
+    page = job_page()
+
+    assert extractor.extract(page, chunk_size=7).text == extractor.extract(page).text
+
+
+def test_text_is_cut_off(extractor):
+    extractor.max_text_chars = 100
+
+    assert len(extractor.extract(job_page()).text) == 100
+
+
+def test_html_to_text_keeps_blocks_and_list_items():
+    text = ContentExtractor.html_to_text("<p>Requirements:</p><ul><li>Python</li><li>SQL &amp; dbt</li></ul>")
+
+    assert text == "Requirements:\n- Python\n- SQL & dbt"
@@ -0,0 +1,22 @@
+from resume_ai.app.classes.job_clusterer import JobClusterer
+
+
+def test_similar_jobs_share_a_cluster():
+    clusterer = JobClusterer(similarity_threshold=0.8)
+    first, is_new = clusterer.assign("Data Engineer", ["python", "spark", "airflow"])
+    second, is_second_new = clusterer.assign("Data Engineer", ["python", "spark", "airflow", "sql"])
+    other, _ = clusterer.assign("Pastry Chef", ["baking", "desserts"])
+
+    assert is_new and not is_second_new
+    assert second is first
+    assert other is not first
+
+
+def test_publish_resume_keeps_the_first_resume_of_a_cluster():
+    clusterer = JobClusterer()
+    cluster, _ = clusterer.assign("Data Engineer", ["python"])
+
+    assert clusterer.publish_resume(cluster.cluster_id, {"name": "first"})
+    assert not clusterer.publish_resume(cluster.cluster_id, {"name": "second"})
+    assert not clusterer.publish_resume("unknown", {"name": "third"})
+    assert cluster.resume == {"name": "first"}
@@ -0,0 +1,97 @@
+import pytest
+
+from resume_ai.app.classes.sqlite_logger import JobLogger
+
+CONFIG = {"mode": "files", "profile_filename": "user_profile_1.yaml", "resume_filename": "resume.pdf"}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def insert(db_client: JobLogger, status: str, job_match_score: float = None, cost: float = None, **data) -> int:
+    db_client.clear_job_data()
+    db_client.add_job_data("job_title", "Data Engineer")
+    db_client.add_job_data("status", status)
+    db_client.add_job_data("job_match_score", job_match_score)
+    db_client.add_job_data("llm_cost_usd", cost)
+    for key, value in data.items():
+        db_client.add_job_data(key, value)
+    db_client.insert_job()
+    return db_client.job_data["job_log_id"]
+
+
+def stats_by_status(db_client: JobLogger, **filters) -> dict:
+    return {row["status"]: row for row in db_client.get_job_stats(**filters)}
+
+
+def test_job_stats_are_updated_on_insert(db_path):
+    db_client = JobLogger(CONFIG, db_path=db_path)
+    insert(db_client, "resume created", 0.8, cost=0.10)
+    insert(db_client, "resume created", 0.6, cost=0.05)
+    insert(db_client, "job does not match profile", 0.1, cost=0.01)
+    insert(db_client, "Error")
+
+    stats = stats_by_status(db_client)
+
+    assert stats["resume created"]["jobs"] == 2
+    assert stats["resume created"]["avg_job_match_score"] == pytest.approx(0.7)
+    assert stats["resume created"]["llm_cost_usd"] == pytest.approx(0.15)
+    assert stats["job does not match profile"]["jobs"] == 1
+    assert stats["Error"]["avg_job_match_score"] is None
+    assert {row["batch_id"] for row in stats.values()} == {db_client.batch_config.batch_id}
+
+
+def test_score_histogram_buckets(db_path):
+    db_client = JobLogger(CONFIG, db_path=db_path)
+    for score in (0.0, 0.05, 0.15, 0.95, 1.0, None):
+        insert(db_client, "resume created", score, resume_match_score=0.5)
+
+    assert db_client.get_score_histogram() == [2, 1, 0, 0, 0, 0, 0, 0, 0, 2]
+    assert db_client.get_score_histogram("resume_match_score")[5] == 6
+    assert sum(db_client.get_score_histogram("resume_tailored_match_score")) == 0
+    with pytest.raises(ValueError):
+        db_client.get_score_histogram("unknown_score")
+
+
+def test_stats_are_kept_per_batch_and_profile(db_path):
+    first = JobLogger(CONFIG, db_path=db_path)
+    second = JobLogger({**CONFIG, "profile_filename": "user_profile_2.yaml"}, db_path=db_path)
+    insert(first, "resume created", 0.9)
+    insert(second, "resume created", 0.3)
+    insert(second, "resume created", 0.4)
+
+    assert stats_by_status(first, batch_id=first.batch_config.batch_id)["resume created"]["jobs"] == 1
+    assert stats_by_status(first, profile_filename="user_profile_2.yaml")["resume created"]["jobs"] == 2
+    assert len(first.get_job_stats()) == 2
+    assert first.get_score_histogram(batch_id=second.batch_config.batch_id)[3:5] == [1, 1]
+
+
+def test_late_llm_usage_is_added_to_the_job_and_its_stats(db_path):
+    db_client = JobLogger(CONFIG, db_path=db_path)
+    db_client.log_llm_usage({"stage": "create_resume", "model": "gpt-4o", "input_tokens": 100, "output_tokens": 50, "cost_usd": 0.02})
+    job_log_id = insert(db_client, "resume created", 0.8, cost=db_client.job_data["llm_cost_usd"])
+
+    # ex: a cover letter written in the background after the job was inserted
+    db_client.log_llm_usage({"stage": "create_cover_letter", "model": "gpt-4o", "input_tokens": 10, "output_tokens": 5, "cost_usd": 0.03})
+
+    assert db_client.get_job(job_log_id)["llm_cost_usd"] == pytest.approx(0.05)
+    assert stats_by_status(db_client)["resume created"]["llm_cost_usd"] == pytest.approx(0.05)
+
+
+def test_stats_are_backfilled_for_an_existing_job_log(db_path):
+    db_client = JobLogger(CONFIG, db_path=db_path)
+    insert(db_client, "resume created", 0.8, cost=0.1)
+    insert(db_client, "resume created", 0.45, cost=0.2)
+    for statement in ("DROP TRIGGER job_log_stats", "DROP TRIGGER job_log_stats_cost",
+                      "DROP TABLE job_stats", "DROP TABLE score_histogram"):
+        db_client.connection.execute(statement)
+    db_client.connection.commit()
+    db_client.close_connection()
+
+    reopened = JobLogger(CONFIG, db_path=db_path)
+
+    stats = stats_by_status(reopened)["resume created"]
+    assert stats["jobs"] == 2 and stats["llm_cost_usd"] == pytest.approx(0.3)
+    assert reopened.get_score_histogram()[4] == 1 and reopened.get_score_histogram()[8] == 1
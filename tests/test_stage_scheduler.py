@@ -0,0 +1,163 @@
+import time
+import threading
+
+import pytest
+
+from resume_ai.app.classes.stage_scheduler import (
+    Stage, StageScheduler, STAGE_DONE, STAGE_FAILED, STAGE_TIMEOUT, STAGE_SKIPPED, STAGE_CANCELLED
+)
+
+
+def test_runs_stages_in_dependency_order():
+    scheduler = StageScheduler([
+        Stage('a', lambda results: 1),
+        Stage('b', lambda results: results['a'] + 1, depends_on=('a',)),
+        Stage('c', lambda results: results['a'] + results['b'], depends_on=('a', 'b')),
+    ])
+
+    assert scheduler.run() == {'a': 1, 'b': 2, 'c': 3}
+    assert set(scheduler.statuses.values()) == {STAGE_DONE}
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(3, timeout=2)
+    scheduler = StageScheduler([Stage(name, lambda results: barrier.wait()) for name in ('a', 'b', 'c')])
+
+    scheduler.run()
+
+    assert set(scheduler.statuses.values()) == {STAGE_DONE}
+
+
+def test_closed_gate_skips_dependents():
+    scheduler = StageScheduler([
+        Stage('gate', lambda results: False, gate=True),
+        Stage('after_gate', lambda results: 'never', depends_on=('gate',)),
+        Stage('after_that', lambda results: 'never', depends_on=('after_gate',)),
+        Stage('independent', lambda results: 'ran'),
+    ])
+
+    results = scheduler.run()
+
+    assert results == {'gate': False, 'independent': 'ran'}
+    assert scheduler.statuses['after_gate'] == STAGE_SKIPPED
+    assert scheduler.statuses['after_that'] == STAGE_SKIPPED
+
+
+def test_open_gate_runs_dependents():
+    scheduler = StageScheduler([
+        Stage('gate', lambda results: True, gate=True),
+        Stage('after_gate', lambda results: 'ran', depends_on=('gate',)),
+    ])
+
+    assert scheduler.run()['after_gate'] == 'ran'
+
+
+def test_failed_stage_skips_dependents():
+    def fail(results):
+        raise RuntimeError("boom")
+
+    scheduler = StageScheduler([
+        Stage('a', fail),
+        Stage('b', lambda results: 'never', depends_on=('a',)),
+    ])
+
+    scheduler.run()
+
+    assert scheduler.statuses == {'a': STAGE_FAILED, 'b': STAGE_SKIPPED}
+    assert isinstance(scheduler.errors['a'], RuntimeError)
+
+
+def test_timed_out_stage_is_not_waited_for():
+    release = threading.Event()
+    scheduler = StageScheduler([
+        Stage('slow', lambda results: release.wait(5), timeout=0.1),
+        Stage('after_slow', lambda results: 'never', depends_on=('slow',)),
+    ])
+
+    started = time.monotonic()
+    try:
+        scheduler.run()
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 2
+    assert scheduler.statuses == {'slow': STAGE_TIMEOUT, 'after_slow': STAGE_SKIPPED}
+
+
+def test_status_callback_reports_every_stage():
+    events = []
+    StageScheduler([Stage('a', lambda results: 1)], on_status=lambda name, status: events.append((name, status))).run()
+
+    assert events == [('a', 'started'), ('a', STAGE_DONE)]
+
+
+def test_stages_see_context_variables_of_the_caller():
+    import contextvars
+    job = contextvars.ContextVar('job')
+    job.set('job-1')
+
+    assert StageScheduler([Stage('a', lambda results: job.get())]).run() == {'a': 'job-1'}
+
+
+@pytest.mark.parametrize("stages", [
+    [Stage('a', lambda results: 1), Stage('a', lambda results: 2)],
+    [Stage('a', lambda results: 1, depends_on=('missing',))],
+])
+def test_invalid_graphs_are_rejected(stages):
+    with pytest.raises(ValueError):
+        StageScheduler(stages)
+
+
+def test_dependency_cycle_is_rejected():
+    scheduler = StageScheduler([
+        Stage('a', lambda results: 1, depends_on=('b',)),
+        Stage('b', lambda results: 1, depends_on=('a',)),
+    ])
+
+    with pytest.raises(ValueError):
+        scheduler.run()
+
+
+def test_speculative_stage_is_cancelled_when_its_gate_closes():
+    release = threading.Event()
+    scheduler = StageScheduler([
+        Stage('gate', lambda results: time.sleep(0.05) or False, gate=True),
+        Stage('speculative', lambda results: release.wait(5), guarded_by=('gate',)),
+        Stage('after_speculative', lambda results: 'never', depends_on=('speculative', 'gate')),
+    ])
+
+    started = time.monotonic()
+    try:
+        results = scheduler.run()
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 2
+    assert 'speculative' not in results
+    assert scheduler.statuses['speculative'] == STAGE_CANCELLED
+    assert scheduler.statuses['after_speculative'] == STAGE_SKIPPED
+
+
+def test_speculative_result_is_discarded_when_its_gate_closes_later():
+    scheduler = StageScheduler([
+        Stage('gate', lambda results: time.sleep(0.1) or False, gate=True),
+        Stage('speculative', lambda results: 'resume', guarded_by=('gate',)),
+    ])
+
+    results = scheduler.run()
+
+    assert 'speculative' not in results
+    assert scheduler.statuses['speculative'] == STAGE_CANCELLED
+
+
+def test_speculative_result_is_kept_when_its_gate_opens():
+    scheduler = StageScheduler([
+        Stage('gate', lambda results: time.sleep(0.05) or True, gate=True),
+        Stage('speculative', lambda results: 'resume', guarded_by=('gate',)),
+        Stage('publish', lambda results: results['speculative'], depends_on=('speculative', 'gate')),
+    ])
+
+    results = scheduler.run()
+
+    assert results['publish'] == 'resume'
+    assert scheduler.statuses['speculative'] == STAGE_DONE
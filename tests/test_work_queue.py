@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from resume_ai.app.classes.work_queue import SqliteWorkQueue, get_work_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SqliteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def job(job_key, priority=0):
+    return {"job_key": job_key, "mode": "files", "title": job_key, "payload": f"description of {job_key}", "priority": priority}
+
+
+def test_jobs_are_claimed_by_priority_and_only_once(queue):
+    assert queue.enqueue([job("low.txt", 0.1), job("high.txt", 0.9)]) == 2
+    assert queue.enqueue([job("high.txt", 0.5)]) == 0
+
+    first = queue.claim("worker-1", lease_seconds=60)
+    second = queue.claim("worker-2", lease_seconds=60)
+
+    assert (first.job_key, second.job_key) == ("high.txt", "low.txt")
+    assert first.payload == "description of high.txt" and first.attempts == 1
+    assert queue.claim("worker-3", lease_seconds=60) is None
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    queue.enqueue([job("a.txt")])
+    item = queue.claim("dead-worker", lease_seconds=0.05)
+    assert queue.claim("worker-2", lease_seconds=60) is None
+
+    time.sleep(0.1)
+    reclaimed = queue.claim("worker-2", lease_seconds=60)
+
+    assert reclaimed.id == item.id and reclaimed.attempts == 2
+    # the first worker lost its lease
+    assert not queue.heartbeat(item.id, "dead-worker", lease_seconds=60)
+    assert queue.heartbeat(item.id, "worker-2", lease_seconds=60)
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.enqueue([job("a.txt")])
+    item = queue.claim("worker-1", lease_seconds=0.1)
+
+    time.sleep(0.05)
+    assert queue.heartbeat(item.id, "worker-1", lease_seconds=60)
+    time.sleep(0.1)
+
+    assert queue.claim("worker-2", lease_seconds=60) is None
+
+
+def test_job_fails_after_max_attempts_of_expired_leases(queue):
+    queue.enqueue([job("a.txt")])
+    for worker_id in ("worker-1", "worker-2"):
+        assert queue.claim(worker_id, lease_seconds=0.01) is not None
+        time.sleep(0.05)
+
+    assert queue.claim("worker-3", lease_seconds=60) is None
+    assert queue.counts() == {"failed": 1}
+
+
+def test_failed_job_is_retried_until_max_attempts(queue):
+    queue.enqueue([job("a.txt")])
+
+    item = queue.claim("worker-1", lease_seconds=60)
+    queue.fail(item.id, "worker-1", "error")
+    assert queue.job_keys("files", "pending") == ["a.txt"]
+
+    item = queue.claim("worker-1", lease_seconds=60)
+    queue.fail(item.id, "worker-1", "error")
+    assert queue.job_keys("files", "failed") == ["a.txt"]
+
+
+def test_completed_job_is_not_claimed_again(queue):
+    queue.enqueue([job("a.txt")])
+    item = queue.claim("worker-1", lease_seconds=0.01)
+    queue.complete(item.id, "worker-1")
+    time.sleep(0.05)
+
+    assert queue.claim("worker-2", lease_seconds=60) is None
+    assert queue.counts() == {"done": 1}
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        get_work_queue({"work_queue_backend": "redis"}, str(tmp_path / "queue.db"))